@@ -0,0 +1,514 @@
+"""
+bench_table.py
+Author: Dele Osuma
+
+Benchmarks for the hash table.
+
+Run from terminal: python bench_table.py
+Postal-code benchmark only, with JSON results: python bench_table.py --postal --json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+import numpy as np
+from concurrent_table import ConcurrentTable
+from table import Table, _LIVE, _PROBING
+from typed_table import FixedStrTable, IntTable
+
+DATASETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..",
+                        "C Hash Implementation", "A1", "datasets")
+
+
+def postal_codes(name="postalcodes.in"):
+    """
+    Reads a postal-code dataset shipped with the C hash table assignment.
+
+    Parameters:
+        name (str): The dataset file name.
+
+    Returns:
+        list: (postal code, city) pairs, in file order.
+    """
+    pairs = []
+    with open(os.path.join(DATASETS, name)) as file:
+        for line in file:
+            city, code = line.strip().rsplit(",", 1)
+            pairs.append((code, city))
+    return pairs
+
+
+def string_keys(n, length):
+    """
+    Makes n distinct string keys of the given length.
+
+    Parameters:
+        n (int): The number of keys.
+        length (int): The length of every key.
+
+    Returns:
+        list: The keys.
+    """
+    return [f"{i:0{length}d}" for i in range(n)]
+
+
+def resize_by_add(table):
+    """
+    Resizes a table the way Table._resize() used to: hashing and probing for every
+    entry again through _insert().
+
+    Parameters:
+        table (Table): The table to resize.
+    """
+    slots = table._slots
+    live = np.flatnonzero(slots.states == _LIVE)
+    table._rebuild(table._next_prime(table.size * 2), np.empty(0, dtype=np.int64),
+                   np.empty(0, dtype=object), np.empty(0, dtype=object))
+    for key, value in zip(slots.keys[live], slots.values[live]):
+        table._insert(key, value)
+
+
+def bench_resize(sizes=(10_000, 100_000), lengths=(8, 256)):
+    """
+    Compares resizing with cached hashes against rehashing every key.
+
+    Parameters:
+        sizes (tuple): Numbers of entries to resize.
+        lengths (tuple): Key lengths; longer strings cost more to hash.
+    """
+    print("resize (string keys)")
+    print(f"{'entries':>10} {'key len':>8} {'rehash (s)':>12} {'cached (s)':>12} {'speedup':>8}")
+    for n in sizes:
+        for length in lengths:
+            pairs = [(key, i) for i, key in enumerate(string_keys(n, length))]
+
+            def rehash():
+                table = Table.from_items(pairs)
+                start = time.perf_counter()
+                resize_by_add(table)
+                return time.perf_counter() - start
+
+            def cached():
+                table = Table.from_items(pairs)
+                start = time.perf_counter()
+                table._resize()
+                return time.perf_counter() - start
+
+            before = min(rehash() for _ in range(3))
+            after = min(cached() for _ in range(3))
+            print(f"{n:>10} {length:>8} {before:>12.4f} {after:>12.4f} {before / after:>7.1f}x")
+
+
+def bench_probing(workloads=None):
+    """
+    Compares the probing strategies on probe lengths and operation throughput.
+
+    Parameters:
+        workloads (dict): Workload name -> list of (key, value) pairs. Defaults to the
+                          full postal-code dataset and the same number of sequential ints.
+    """
+    if workloads is None:
+        codes = postal_codes()
+        workloads = {"postal codes": codes, "sequential ints": [(i, i) for i in range(len(codes))]}
+
+    print("probing strategies")
+    print(f"{'workload':>16} {'probing':>11} {'mean probe':>11} {'max probe':>10} "
+          f"{'add/s':>10} {'hit/s':>10} {'miss/s':>10}")
+    for name, pairs in workloads.items():
+        keys = [key for key, _ in pairs]
+        misses = [("miss", key) for key in keys]
+        for probing in _PROBING:
+            table = Table(probing=probing)
+            start = time.perf_counter()
+            for key, value in pairs:
+                table.add(key, value)
+            add_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for key in keys:
+                table.get(key)
+            hit_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for key in misses:
+                try:
+                    table.get(key)
+                except KeyError:
+                    pass
+            miss_time = time.perf_counter() - start
+
+            stats = table.tombstone_stats()
+            print(f"{name:>16} {probing:>11} {stats['mean_probe_length']:>11.3f} "
+                  f"{stats['max_probe_length']:>10} {len(pairs) / add_time:>10.0f} "
+                  f"{len(keys) / hit_time:>10.0f} {len(misses) / miss_time:>10.0f}")
+
+
+def trial_division_prime(n):
+    """
+    Finds the next prime at or above n the way Table._next_prime() used to: trial
+    division of every candidate up to its square root.
+
+    Parameters:
+        n (int): The starting number.
+
+    Returns:
+        int: The next prime.
+    """
+    table = Table(0)
+    while not table.isprime(n):
+        n += 1
+    return n
+
+
+def bench_sizing(capacities=(1_000, 100_000, 10_000_000, 100_000_000)):
+    """
+    Compares finding table sizes by trial division against the prime ladder, for
+    construction (1.5 times the capacity) and for a resize (double that). The first
+    ladder lookup above the sieve extends the ladder, so it is timed separately.
+
+    Parameters:
+        capacities (tuple): Capacity hints to size for.
+    """
+    table = Table(0)
+    print("table sizing")
+    print(f"{'capacity':>12} {'step':>10} {'trial (s)':>12} {'ladder, first (s)':>18} {'ladder (s)':>12}")
+    for capacity in capacities:
+        for step, n in (("construct", int(1.5 * capacity)), ("resize", 3 * capacity)):
+            start = time.perf_counter()
+            trial_division_prime(n)
+            before = time.perf_counter() - start
+            start = time.perf_counter()
+            table._next_prime(n)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            table._next_prime(n)
+            after = time.perf_counter() - start
+            print(f"{capacity:>12} {step:>10} {before:>12.6f} {first:>18.6f} {after:>12.6f}")
+
+
+class LockedTable:
+    """A Table behind one lock, the simplest way to share it between threads."""
+
+    def __init__(self, capacity=100):
+        self.lock = threading.Lock()
+        self.table = Table(capacity)
+
+    def add(self, key, value):
+        with self.lock:
+            self.table.add(key, value)
+
+    def get(self, key):
+        with self.lock:
+            return self.table.get(key)
+
+
+def run_threads(table, keys, n_threads, reads_per_write):
+    """
+    Has n_threads threads add their share of keys to a table, reading reads_per_write
+    already added keys after each add.
+
+    Parameters:
+        table: A LockedTable or ConcurrentTable.
+        keys (list): The keys to add.
+        n_threads (int): The number of threads.
+        reads_per_write (int): The number of gets per add.
+
+    Returns:
+        float: The wall-clock time taken, in seconds.
+    """
+    def work(share):
+        for i, key in enumerate(share):
+            table.add(key, i)
+            for j in range(reads_per_write):
+                table.get(share[(i * 7 + j) % (i + 1)])
+
+    threads = [threading.Thread(target=work, args=(keys[t::n_threads],)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench_concurrent(n=200_000, thread_counts=(1, 2, 4, 8), reads_per_write=4):
+    """
+    Compares throughput of a ConcurrentTable against a Table behind a single lock as
+    threads are added, on a mixed workload of adds and gets.
+
+    Parameters:
+        n (int): The number of keys added in each run.
+        thread_counts (tuple): The numbers of threads to run with.
+        reads_per_write (int): The number of gets per add.
+    """
+    keys = string_keys(n, 8)
+    ops = n * (1 + reads_per_write)
+    print(f"concurrent table, {n} adds and {n * reads_per_write} gets")
+    print(f"{'threads':>8} {'locked (ops/s)':>16} {'concurrent (ops/s)':>20}")
+    for n_threads in thread_counts:
+        locked = run_threads(LockedTable(), keys, n_threads, reads_per_write)
+        concurrent = run_threads(ConcurrentTable(), keys, n_threads, reads_per_write)
+        print(f"{n_threads:>8} {ops / locked:>16,.0f} {ops / concurrent:>20,.0f}")
+
+
+def bench_latency(n=1_000_000):
+    """
+    Compares the distribution of add() latencies with and without incremental resizing,
+    adding n string keys to a table that starts small and grows throughout.
+
+    Parameters:
+        n (int): The number of keys to add.
+    """
+    keys = string_keys(n, 8)
+    print(f"add() latency, {n} adds from an empty table")
+    print(f"{'mode':>12} {'p50 (us)':>10} {'p99 (us)':>10} {'p99.9 (us)':>11} {'max (ms)':>10} {'total (s)':>10}")
+    for incremental in (False, True):
+        table = Table(incremental=incremental)
+        latencies = np.empty(n, dtype=np.int64)
+        clock = time.perf_counter_ns
+        for i, key in enumerate(keys):
+            start = clock()
+            table.add(key, i)
+            latencies[i] = clock() - start
+        p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) / 1e3
+        mode = "incremental" if incremental else "all at once"
+        print(f"{mode:>12} {p50:>10.2f} {p99:>10.2f} {p999:>11.2f} {latencies.max() / 1e6:>10.2f} "
+              f"{latencies.sum() / 1e9:>10.2f}")
+
+
+def build_typed(cls, keys, n):
+    """
+    Builds a table of n keys numbered 0 to n - 1 from a batch.
+
+    Parameters:
+        cls: Table, IntTable or FixedStrTable.
+        keys: The batch of n keys.
+        n (int): The number of keys.
+
+    Returns:
+        The table.
+    """
+    if cls is Table:
+        return Table.from_items(zip(keys, range(n)))
+    table = cls(0, value_dtype=np.int64)
+    table.add_many(keys, np.arange(n))
+    return table
+
+
+def retained_per_entry(cls, make_keys, n):
+    """
+    Measures the memory a table keeps per entry once its input batch is gone.
+
+    Parameters:
+        cls: Table, IntTable or FixedStrTable.
+        make_keys: Makes the batch of n keys.
+        n (int): The number of keys.
+
+    Returns:
+        float: Bytes retained per entry.
+    """
+    tracemalloc.start()
+    table = build_typed(cls, make_keys(n), n)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del table
+    return retained / n
+
+
+def bench_typed(n=1_000_000):
+    """
+    Compares IntTable and FixedStrTable, with int64 values, against Table on int IDs
+    and 8-character string keys: batch build time, batch lookup time and the memory
+    kept per entry, which for Table includes the key and value objects.
+
+    Parameters:
+        n (int): The number of keys.
+    """
+    workloads = (
+        ("int", IntTable, lambda n: [i * 7919 for i in range(n)], lambda n: np.arange(n) * 7919),
+        ("str8", FixedStrTable, lambda n: string_keys(n, 8), lambda n: string_keys(n, 8)),
+    )
+    print(f"typed tables, {n} keys")
+    print(f"{'keys':>5} {'table':>14} {'build (s)':>10} {'lookup (s)':>11} {'bytes/entry':>12}")
+    for name, cls, generic_keys, typed_keys in workloads:
+        for table_cls, make_keys in ((Table, generic_keys), (cls, typed_keys)):
+            keys = make_keys(n)
+            start = time.perf_counter()
+            table = build_typed(table_cls, keys, n)
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            table.get_many(keys)
+            lookup = time.perf_counter() - start
+            del table, keys
+            per_entry = retained_per_entry(table_cls, make_keys, n)
+            print(f"{name:>5} {table_cls.__name__:>14} {build:>10.3f} {lookup:>11.3f} {per_entry:>12.1f}")
+
+
+POSTAL_DATASETS = ("postalcodes_2.in", "postalcodes_20.in", "postalcodes_100.in",
+                   "postalcodes_1000.in", "postalcodes.in")
+PHASES = ("insert", "hit", "miss", "remove", "reinsert")
+
+
+class DictAdapter:
+    """Gives a dict the add/get/remove interface of Table, so both run the same loops."""
+
+    def __init__(self):
+        self.data = {}
+        self.add = self.data.__setitem__
+        self.get = self.data.__getitem__
+        self.remove = self.data.__delitem__
+        self.contains = self.data.__contains__
+
+
+def run_phases(table, pairs, misses, distinct):
+    """
+    Runs every benchmark phase once against a table, in order.
+
+    Parameters:
+        table: A Table or DictAdapter, empty.
+        pairs (list): (postal code, city) pairs to insert.
+        misses (list): Keys that are not in the dataset.
+        distinct (list): Every distinct postal code.
+
+    Returns:
+        dict: Phase -> seconds taken.
+    """
+    add, get, remove = table.add, table.get, table.remove
+    contains = table.contains if isinstance(table, DictAdapter) else table.__contains__
+    clock = time.perf_counter
+    times = {}
+    start = clock()
+    for key, value in pairs:
+        add(key, value)
+    times["insert"] = clock() - start
+    start = clock()
+    for key in distinct:
+        get(key)
+    times["hit"] = clock() - start
+    start = clock()
+    for key in misses:
+        contains(key)
+    times["miss"] = clock() - start
+    start = clock()
+    for key in distinct:
+        remove(key)
+    times["remove"] = clock() - start
+    start = clock()
+    for key, value in pairs:
+        add(key, value)
+    times["reinsert"] = clock() - start
+    return times
+
+
+def bench_postal(names=POSTAL_DATASETS, repeats=5, min_ops=100_000):
+    """
+    Measures Table against dict on each postal-code dataset: throughput of inserting
+    every row into an empty table (resizes included), looking up every code, looking up
+    codes that are not there, removing every code and inserting the rows again; the
+    peak memory of the insert; and, for Table, probe lengths and resizes over the phases.
+
+    Small datasets are run many times over per measurement, so that each covers at
+    least min_ops operations; the best of repeats measurements is kept.
+
+    Parameters:
+        names (tuple): The dataset files.
+        repeats (int): Measurements per phase.
+        min_ops (int): The fewest operations per measurement.
+
+    Returns:
+        dict: The results, ready for json.dump().
+    """
+    results = {"python": platform.python_version(), "numpy": np.__version__, "datasets": []}
+    for name in names:
+        pairs = postal_codes(name)
+        distinct = list(dict.fromkeys(code for code, _ in pairs))
+        # Postal codes are upper case, so lower-cased ones all miss.
+        misses = [code.lower() for code in distinct]
+        rounds = max(1, -(-min_ops // len(pairs)))
+        entry = {"dataset": name, "rows": len(pairs), "distinct": len(distinct), "rounds": rounds}
+
+        for label, make in (("Table", Table), ("dict", DictAdapter)):
+            best = dict.fromkeys(PHASES, float("inf"))
+            for _ in range(repeats):
+                total = dict.fromkeys(PHASES, 0.0)
+                for _ in range(rounds):
+                    for phase, seconds in run_phases(make(), pairs, misses, distinct).items():
+                        total[phase] += seconds
+                for phase in PHASES:
+                    best[phase] = min(best[phase], total[phase])
+            ops = {"insert": len(pairs), "hit": len(distinct), "miss": len(misses),
+                   "remove": len(distinct), "reinsert": len(pairs)}
+            throughput = {phase: rounds * ops[phase] / best[phase] for phase in PHASES}
+
+            tracemalloc.start()
+            table = make()
+            for key, value in pairs:
+                table.add(key, value)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del table
+            entry[label] = {"ops_per_second": throughput, "peak_bytes": peak}
+
+        table = Table(stats=True)
+        run_phases(table, pairs, misses, distinct)
+        stats = table.stats()
+        entry["Table"]["probes"] = {op: {"mean": stats[op]["mean_probes"], "max": stats[op]["max_probes"]}
+                                    for op in ("add", "get", "remove")}
+        entry["Table"]["resizes"] = stats["resizes"]
+        entry["Table"]["size"] = stats["size"]
+        results["datasets"].append(entry)
+    return results
+
+
+def print_postal(results):
+    """
+    Prints the results of bench_postal() as a table.
+
+    Parameters:
+        results (dict): The results.
+    """
+    print("postal codes, operations per second (best of repeats)")
+    print(f"{'dataset':>20} {'rows':>6} {'table':>6} " + " ".join(f"{phase:>10}" for phase in PHASES)
+          + f" {'peak (KB)':>10} {'get probes':>11}")
+    for entry in results["datasets"]:
+        for label in ("Table", "dict"):
+            row = entry[label]
+            probes = f"{row['probes']['get']['mean']:.2f}/{row['probes']['get']['max']}" if "probes" in row else ""
+            print(f"{entry['dataset']:>20} {entry['rows']:>6} {label:>6} "
+                  + " ".join(f"{row['ops_per_second'][phase]:>10,.0f}" for phase in PHASES)
+                  + f" {row['peak_bytes'] / 1024:>10.1f} {probes:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the hash table.")
+    parser.add_argument("--postal", action="store_true", help="run only the postal-code benchmark")
+    parser.add_argument("--json", metavar="PATH", help="write the postal-code results as JSON to PATH, or - for stdout")
+    args = parser.parse_args()
+
+    if not args.postal:
+        bench_resize()
+        print()
+        bench_probing()
+        print()
+        bench_sizing()
+        print()
+        bench_concurrent()
+        print()
+        bench_latency()
+        print()
+        bench_typed()
+        print()
+    results = bench_postal()
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print_postal(results)
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump(results, file, indent=2)
@@ -0,0 +1,236 @@
+"""
+concurrent_table.py
+Author: Dele Osuma
+
+A hash table that can be shared between threads.
+"""
+
+import threading
+from table import Table, _MISSING
+
+
+class _Stripe:
+    """
+    One independently locked part of a ConcurrentTable.
+
+    seq is odd while a writer is changing the stripe's slot arrays in place, and is
+    bumped twice by every such change, so a reader that sees the same even value before
+    and after a lookup knows nothing changed under it.
+    """
+
+    __slots__ = ("lock", "seq", "table")
+
+    def __init__(self, capacity, probing, incremental):
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.table = Table(capacity, probing=probing, incremental=incremental)
+
+
+class ConcurrentTable:
+    """
+    A thread-safe hash table with the same add/get/remove interface as Table.
+
+    Keys are split by hash over a number of stripes, each a Table with its own lock,
+    so writers to different stripes never wait for each other, and a resize rehashes
+    only the stripe that filled up. Reads take no lock: they search a snapshot of the
+    stripe's slot arrays and check the stripe's sequence number afterwards, retrying
+    under the lock if a writer got in the way. Resizes build new slot arrays and swap
+    them in without touching the old ones, so a read that started on the old arrays
+    still finishes correctly. In incremental mode a resize is instead spread over the
+    following writes to the stripe, and reads check the old and new arrays meanwhile.
+
+    Author: Dele Osuma
+    """
+
+    def __init__(self, capacity=100, stripes=16, probing="linear", incremental=False):
+        """
+        Initializes the ConcurrentTable.
+
+        Parameters:
+            capacity (int): The expected number of entries, spread evenly over the stripes.
+            stripes (int): The number of independently locked parts. More stripes let
+                           more writers run at once, at the cost of a little memory each.
+            probing (str): The collision strategy of every stripe, as for Table.
+            incremental (bool): If True, stripes resize incrementally, as for Table, so
+                                no writer rehashes a whole stripe at once.
+
+        Raises:
+            ValueError: If stripes is less than 1, or probing is not a Table strategy.
+        """
+        if stripes < 1:
+            raise ValueError(f"stripes must be at least 1, not {stripes!r}")
+        per_stripe = -(-capacity // stripes)
+        self.probing = probing
+        self._incremental = incremental
+        self._stripes = [_Stripe(per_stripe, probing, incremental) for _ in range(stripes)]
+
+    def _stripe(self, h):
+        """
+        Returns the stripe that holds keys with the given hash.
+
+        Parameters:
+            h (int): The hash of a key.
+
+        Returns:
+            _Stripe: The stripe for that hash.
+        """
+        return self._stripes[h % len(self._stripes)]
+
+    def add(self, key, value):
+        """
+        Adds a key-value pair to the table. If the key already exists, updates its value.
+
+        Parameters:
+            key: The key to add.
+            value: The value associated with the key.
+        """
+        stripe = self._stripe(hash(key))
+        table = stripe.table
+        with stripe.lock:
+            stripe.seq += 1
+            try:
+                table._add(key, value)
+                if self._incremental:
+                    # Starting an incremental resize swaps two references readers follow.
+                    table._grow_or_compact()
+            finally:
+                stripe.seq += 1
+            if not self._incremental:
+                table._grow_or_compact()
+
+    def update(self, items):
+        """
+        Adds many key-value pairs at once, taking each stripe's lock once.
+
+        Parameters:
+            items: A mapping or an iterable of (key, value) pairs. Later pairs win
+                   over earlier pairs with the same key.
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        groups = {}
+        for pair in items:
+            groups.setdefault(hash(pair[0]) % len(self._stripes), []).append(pair)
+        for i, pairs in groups.items():
+            stripe = self._stripes[i]
+            with stripe.lock:
+                stripe.seq += 1
+                try:
+                    stripe.table.update(pairs)
+                finally:
+                    stripe.seq += 1
+
+    def get(self, key, default=_MISSING):
+        """
+        Retrieves the value associated with the given key, without taking a lock unless
+        a writer is changing the key's stripe at the same time.
+
+        Parameters:
+            key: The key to search for.
+            default: The value returned if the key is not found. If omitted, a missing
+                     key raises KeyError.
+
+        Returns:
+            The value associated with the key.
+
+        Raises:
+            KeyError: If the key is not found and no default was given.
+        """
+        h = hash(key)
+        stripe = self._stripe(h)
+        value = self._read(stripe, key, h)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+
+    def _read(self, stripe, key, h):
+        """
+        Looks a key up in a stripe, first optimistically and then under its lock.
+
+        Parameters:
+            stripe (_Stripe): The stripe holding the key.
+            key: The key to search for.
+            h (int): The hash of key.
+
+        Returns:
+            The value associated with the key, or _MISSING if it is not in the stripe.
+        """
+        table = stripe.table
+        seq = stripe.seq
+        if not seq & 1:
+            value = table._lookup(key, h)
+            if stripe.seq == seq:
+                return value
+        with stripe.lock:
+            return table._lookup(key, h)
+
+    def remove(self, key):
+        """
+        Removes the key (and its associated value) from the table.
+
+        Parameters:
+            key: The key to remove.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        h = hash(key)
+        stripe = self._stripe(h)
+        table = stripe.table
+        with stripe.lock:
+            stripe.seq += 1
+            try:
+                table._delete(key, h)
+                if self._incremental:
+                    # A shrink during an incremental resize drops the old arrays too.
+                    table._shrink_if_sparse()
+            finally:
+                stripe.seq += 1
+            if not self._incremental:
+                table._shrink_if_sparse()
+
+    def keys(self):
+        """
+        Returns a set of all keys in the table. Each stripe is read under its lock, so
+        the result is consistent per stripe but not across stripes.
+
+        Returns:
+            set: A set containing all the keys.
+        """
+        keys = set()
+        for stripe in self._stripes:
+            with stripe.lock:
+                if not self._incremental:
+                    keys |= stripe.table.keys()
+                    continue
+                # Listing the keys finishes an incremental resize, which readers must not see half done.
+                stripe.seq += 1
+                try:
+                    keys |= stripe.table.keys()
+                finally:
+                    stripe.seq += 1
+        return keys
+
+    def __contains__(self, key):
+        """
+        Checks whether a key is in the table.
+
+        Parameters:
+            key: The key to search for.
+
+        Returns:
+            bool: True if the key is in the table, False otherwise.
+        """
+        h = hash(key)
+        return self._read(self._stripe(h), key, h) is not _MISSING
+
+    def __len__(self):
+        """
+        Returns the number of key-value pairs in the table.
+
+        Returns:
+            int: The number of entries.
+        """
+        return sum(stripe.table.count for stripe in self._stripes)
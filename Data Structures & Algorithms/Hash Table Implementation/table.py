@@ -1,29 +1,610 @@
+import hashlib
+import math
+import struct
+import time
+from bisect import bisect_left
+from collections import Counter
+from itertools import repeat
 import numpy as np
 
+
+def _line_pack(home):
+    """
+    Packs entries onto an unbounded line the way linear probing would if the
+    entries were inserted in order of their home slot.
+
+    Parameters:
+        home (np.ndarray): The home slot of every entry.
+
+    Returns:
+        np.ndarray: The position of every entry; positions may run past the table end.
+    """
+    order = np.argsort(home, kind="stable")
+    ranks = np.arange(len(home))
+    packed = np.empty_like(home)
+    packed[order] = ranks + np.maximum.accumulate(home[order] - ranks)
+    return packed
+
+
+def _pack_linear(home, size):
+    """
+    Computes linear probing slots for a batch of entries going into an empty table.
+
+    Entries that run off the end of the table wrap around to the front, which can
+    push the first clusters along. Since the set of occupied slots does not depend
+    on insertion order, the slot that is still free once the overflow has been
+    absorbed is known up front, and cutting the circle there leaves a plain line.
+
+    Parameters:
+        home (np.ndarray): The home slot of every entry.
+        size (int): The table size.
+
+    Returns:
+        np.ndarray: The slot of every entry.
+    """
+    slots = _line_pack(home)
+    overflow = int(np.count_nonzero(slots >= size))
+    if overflow:
+        occupied = np.zeros(size, dtype=bool)
+        occupied[slots[slots < size]] = True
+        cut = int(np.flatnonzero(~occupied)[overflow]) + 1
+        slots = (_line_pack((home - cut) % size) + cut) % size
+    return slots
+
+
+def _pack_probing(home, step, incr, size):
+    """
+    Computes slots for a batch of entries going into an empty table under any probe
+    sequence of the form used by Table._probe_start().
+
+    Every round, each unplaced entry tries its next slot. Where several entries want
+    the same free slot the earliest one gets it and the others move on, so every slot
+    on an entry's probe path before its own is occupied, as after one-by-one inserts.
+
+    Parameters:
+        home (np.ndarray): The home slot of every entry.
+        step (np.ndarray or int): The first step of every probe sequence.
+        incr (int): How much the step grows after each probe.
+        size (int): The table size.
+
+    Returns:
+        np.ndarray or None: The slot of every entry, or None if some probe sequence
+                            ran out of free slots to visit.
+    """
+    n = len(home)
+    slots = np.empty(n, dtype=np.int64)
+    taken = np.zeros(size, dtype=bool)
+    pending = np.arange(n)
+    idx = home.copy()
+    step = np.broadcast_to(step, (n,)).astype(np.int64)
+
+    for _ in range(size):
+        if not len(pending):
+            return slots
+        free = np.flatnonzero(~taken[idx])
+        claimed, first = np.unique(idx[free], return_index=True)
+        slots[pending[free[first]]] = claimed
+        taken[claimed] = True
+
+        rest = np.ones(len(pending), dtype=bool)
+        rest[free[first]] = False
+        pending, idx, step = pending[rest], idx[rest], step[rest]
+        idx = (idx + step) % size
+        step = (step + incr) % size
+    return slots if not len(pending) else None
+
+
+def _last_occurrences(keys, hashes):
+    """
+    Finds repeated keys in a batch so that, as with repeated add() calls, the last value wins.
+
+    Only keys whose hashes collide are compared, by identity and then with ==, as add() does.
+
+    Parameters:
+        keys (list): The keys of the batch.
+        hashes (np.ndarray): hash() of every key.
+
+    Returns:
+        np.ndarray or None: A mask of the entries to keep, or None if every key is distinct.
+    """
+    order = np.argsort(hashes, kind="stable")
+    ordered = hashes[order]
+    bounds = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(hashes)]))
+    runs = ends - starts > 1
+    if not runs.any():
+        return None
+
+    keep = np.ones(len(hashes), dtype=bool)
+    for start, end in zip(starts[runs], ends[runs]):
+        kept = []
+        for i in order[start:end][::-1]:
+            if any(keys[i] is keys[j] or keys[i] == keys[j] for j in kept):
+                keep[i] = False
+            else:
+                kept.append(i)
+    return keep
+
+
+# Slot states
+_EMPTY = 0
+_LIVE = 1
+_DELETED = 2
+
+# Probing strategies accepted by Table
+_PROBING = ("linear", "quadratic", "double", "robin_hood")
+
+# Default for Table.get_many() meaning "raise KeyError"
+_MISSING = object()
+
+# Slots scanned per step when iterating, bounding the index array built for the live mask
+_ITER_CHUNK = 4096
+
+# Old slots moved per add or remove while an incremental resize is under way. Clearing
+# deleted markers at the same size leaves room for a sixth of the slots in new entries,
+# so the move needs 6 slots per add to finish before the new arrays fill; a grow needs 1.5.
+_MIGRATE_STEP = 8
+
+# Table sizes come from a ladder of primes, each at least 2 ** (1/16), about 4.4%, above
+# the one before: doubling a size is 16 rungs up, and sizing overshoots by at most a rung.
+# The rungs below _SIEVE_LIMIT are built at import; larger ones are added on first use.
+_LADDER_RATIO = 2 ** (1 / 16)
+_SIEVE_LIMIT = 1 << 20
+
+
+def _sieve(limit):
+    """
+    Finds every prime below limit with the sieve of Eratosthenes.
+
+    Parameters:
+        limit (int): The bound.
+
+    Returns:
+        np.ndarray: The primes below limit, in order.
+    """
+    is_prime = np.ones(limit, dtype=bool)
+    is_prime[:2] = False
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if is_prime[i]:
+            is_prime[i * i::i] = False
+    return np.flatnonzero(is_prime)
+
+
+_SMALL_PRIMES = _sieve(_SIEVE_LIMIT)
+
+
+# Miller-Rabin witnesses that decide primality for every n below 3.3 * 10 ** 24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _is_prime(n):
+    """
+    Checks whether n is prime: by lookup in the sieve below _SIEVE_LIMIT, and by a
+    deterministic Miller-Rabin test above it.
+
+    Parameters:
+        n (int): The number to check.
+
+    Returns:
+        bool: True if n is prime, False otherwise.
+    """
+    if n < _SIEVE_LIMIT:
+        idx = np.searchsorted(_SMALL_PRIMES, n)
+        return idx < len(_SMALL_PRIMES) and _SMALL_PRIMES[idx] == n
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for a in _WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _next_rung(prime):
+    """
+    Finds the rung of the prime ladder after a given one.
+
+    Parameters:
+        prime (int): A rung of the ladder.
+
+    Returns:
+        int: The smallest prime at least _LADDER_RATIO times prime, and above it.
+    """
+    n = max(prime + 1, math.ceil(prime * _LADDER_RATIO))
+    idx = np.searchsorted(_SMALL_PRIMES, n)
+    if idx < len(_SMALL_PRIMES):
+        return int(_SMALL_PRIMES[idx])
+    n |= 1
+    while not _is_prime(n):
+        n += 2
+    return n
+
+
+def _build_ladder():
+    """
+    Builds the rungs of the prime ladder that lie within the sieve.
+
+    Returns:
+        list: The rungs, in increasing order.
+    """
+    ladder = [2]
+    while ladder[-1] < _SMALL_PRIMES[-1]:
+        ladder.append(_next_rung(ladder[-1]))
+    return ladder
+
+
+# Extended past the sieve by _ladder_prime() when a larger size is asked for
+_PRIME_LADDER = _build_ladder()
+
+
+def _ladder_prime(n):
+    """
+    Finds the smallest rung of the prime ladder at or above n.
+
+    Parameters:
+        n (int): The smallest acceptable size.
+
+    Returns:
+        int: The prime.
+    """
+    while _PRIME_LADDER[-1] < n:
+        _PRIME_LADDER.append(_next_rung(_PRIME_LADDER[-1]))
+    return _PRIME_LADDER[bisect_left(_PRIME_LADDER, n)]
+
+
+def _objects(items, count):
+    """
+    Packs items into a one-dimensional object array, even when the items are tuples.
+
+    Parameters:
+        items: An iterable of objects.
+        count (int): The number of items.
+
+    Returns:
+        np.ndarray: The object array.
+    """
+    return np.fromiter(items, dtype=object, count=count)
+
+
+# Elementwise `a is b or a == b`: the key comparison of the scalar paths, so that a key
+# unequal to itself, such as float('nan'), is still found by the very object it was added as
+_same_key = np.frompyfunc(lambda a, b: a is b or a == b, 2, 1)
+
+
+# Snapshot files: a header, then the slot arrays and the packed keys and values
+_SNAPSHOT_MAGIC = b"PYTABLE1"
+_SNAPSHOT_HEADER = struct.Struct("<8sqqqqq")  # magic, size, count, probing, key bytes, value bytes
+
+# Type tags of snapshot keys and values
+_TAG_NONE = 0
+_TAG_STR = 1
+_TAG_INT = 2
+_TAG_BYTES = 3
+
+
+def _stable_hash(key):
+    """
+    Hashes a key the same way in every process, for tables stored in snapshots. Python
+    salts hash() of str and bytes per process, so for those a BLAKE2 digest is used;
+    hash() of ints and other keys is already stable or never stored.
+
+    Parameters:
+        key: The key to hash.
+
+    Returns:
+        int: The hash, within the int64 range.
+    """
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    elif not isinstance(key, bytes):
+        return hash(key)
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little", signed=True)
+
+
+def _encode(item):
+    """
+    Encodes a snapshot key or value.
+
+    Parameters:
+        item: None, or a str, int or bytes.
+
+    Returns:
+        tuple: (type tag, encoded bytes)
+
+    Raises:
+        TypeError: If item is of any other type.
+    """
+    if item is None:
+        return _TAG_NONE, b""
+    if isinstance(item, str):
+        return _TAG_STR, item.encode("utf-8")
+    if isinstance(item, int) and not isinstance(item, bool):
+        return _TAG_INT, str(item).encode("ascii")
+    if isinstance(item, bytes):
+        return _TAG_BYTES, item
+    raise TypeError(f"Snapshots hold str, int, bytes and None keys and values, not {type(item).__name__}")
+
+
+def _pack_column(items, live, size):
+    """
+    Packs the keys or values of a table into a snapshot's packed region.
+
+    Parameters:
+        items (np.ndarray): The key or value of every live slot, in slot order.
+        live (np.ndarray): The live slots.
+        size (int): The number of slots.
+
+    Returns:
+        tuple: (type tag per slot, offset into the data per slot plus the end, packed data)
+    """
+    encoded = [_encode(item) for item in items]
+    tags = np.full(size, _TAG_NONE, dtype=np.uint8)
+    tags[live] = [tag for tag, _ in encoded]
+    lengths = np.zeros(size + 1, dtype=np.int64)
+    lengths[live + 1] = [len(data) for _, data in encoded]
+    return tags, np.cumsum(lengths), b"".join(data for _, data in encoded)
+
+
+class _PackedColumn:
+    """
+    The keys or values of a memory-mapped snapshot, decoded only when read.
+
+    Indexing works like the object arrays it stands in for: by slot number, or by an
+    array of slot numbers or a boolean mask, which gives an object array.
+    """
+
+    def __init__(self, tags, offsets, data):
+        """
+        Wraps a snapshot's packed region.
+
+        Parameters:
+            tags (np.ndarray): The type tag of every slot.
+            offsets (np.ndarray): Where every slot's bytes start in data, plus the end.
+            data (np.ndarray): The packed bytes.
+        """
+        self.tags = tags
+        self.offsets = offsets
+        self.data = data
+        self._tag_view = memoryview(tags)
+        self._offset_view = memoryview(offsets)
+        self._data_view = memoryview(data)
+
+    @property
+    def nbytes(self):
+        """The size of the packed region, in bytes."""
+        return self.tags.nbytes + self.offsets.nbytes + self.data.nbytes
+
+    def __len__(self):
+        """
+        Returns the number of slots.
+
+        Returns:
+            int: The number of slots.
+        """
+        return len(self.tags)
+
+    def __getitem__(self, idx):
+        """
+        Decodes the items of one or more slots.
+
+        Parameters:
+            idx: A slot number, an array of slot numbers or a boolean mask.
+
+        Returns:
+            The item, or an object array of items.
+        """
+        if isinstance(idx, (int, np.integer)):
+            return self._decode(int(idx))
+        idx = np.asarray(idx)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        return _objects(map(self._decode, idx.tolist()), len(idx))
+
+    def _decode(self, i):
+        """
+        Decodes the item of one slot.
+
+        Parameters:
+            i (int): The slot number.
+
+        Returns:
+            The item.
+        """
+        tag = self._tag_view[i]
+        if tag == _TAG_NONE:
+            return None
+        data = self._data_view[self._offset_view[i]:self._offset_view[i + 1]]
+        if tag == _TAG_STR:
+            return str(data, "utf-8")
+        if tag == _TAG_INT:
+            return int(bytes(data))
+        return bytes(data)
+
+
+class _Slots:
+    """
+    Parallel NumPy arrays holding the slots of a Table.
+
+    Slot i is described by states[i] (_EMPTY, _LIVE or _DELETED), hashes[i] (the full
+    hash() of the key stored there), keys[i] and values[i]. Keeping the hash next to
+    the key lets probes skip __eq__ for keys that merely share a slot, and no tuple is
+    allocated per entry.
+    """
+
+    def __init__(self, size, arrays=None):
+        """
+        Allocates size empty slots.
+
+        Parameters:
+            size (int): The number of slots.
+            arrays (tuple): Existing (states, hashes, keys, values) to use read-only
+                            instead of allocating, e.g. from a memory-mapped snapshot.
+        """
+        self.size = size
+        self.readonly = arrays is not None
+        if self.readonly:
+            self.states, self.hashes, self.keys, self.values = arrays
+        else:
+            self.states = np.zeros(size, dtype=np.uint8)
+            self.hashes = np.zeros(size, dtype=np.int64)
+            self.keys = np.full(size, None, dtype=object)
+            self.values = np.full(size, None, dtype=object)
+        # Scalar reads through a memoryview return plain ints, several times faster
+        # than indexing the arrays one element at a time.
+        self.state_view = memoryview(self.states)
+        self.hash_view = memoryview(self.hashes)
+
+    def nbytes(self):
+        """
+        Returns the memory taken by the slot arrays, not counting the keys and values themselves.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return self.states.nbytes + self.hashes.nbytes + self.keys.nbytes + self.values.nbytes
+
+
 class Table:
     """
-     A hash table implemented using open addressing with linear probing.
+     A hash table implemented using open addressing with linear probing, or
+    optionally quadratic probing, double hashing or Robin Hood hashing.
     
     supports insertion, lookup, deletion, and automatic resizing when the load 
-    factor (number of entries / table size) reaches 2/3. Uses a NumPy array as the 
-    storage and Python's built-in hash() for hashing.
+    factor (number of entries / table size) reaches 2/3. Entries are stored as
+    parallel NumPy arrays of slot states, cached hashes, keys and values, and
+    Python's built-in hash() is used for hashing.
     
     Author: Dele Osuma
     """
     
-    def __init__(self, capacity=100):
+    def __init__(self, capacity=100, probing="linear", stats=False, shrink_below=1/6,
+                 incremental=False):
         """
         Initializes the Table.
         
         Parameters:
             capacity (int): The expected number of entries. The actual table size will be the next
                             prime number at least 1.5 times this capacity.
+            probing (str): How collisions are resolved:
+                           "linear" probes the following slots one by one.
+                           "quadratic" probes slots 1, 4, 9, ... past the home slot.
+                           "double" steps by a second hash of the key.
+                           "robin_hood" probes linearly but lets entries far from their home
+                           slot take over slots from entries closer to theirs, and shifts
+                           entries back on removal instead of leaving deleted markers.
+            stats (bool): If True, record probe lengths of add, get and remove calls and the
+                          number and duration of resizes, for stats(). Off by default, when
+                          the only cost is one attribute check per call.
+            shrink_below (float): When removals take the load factor below this, the table
+                                  shrinks to a load factor of about 1/3, but never below its
+                                  initial size. Must be below 1/3, so that the table has to
+                                  halve or double again before the next resize; 0 disables
+                                  shrinking.
+            incremental (bool): If True, a table that grows, or clears its deleted markers,
+                                after an add moves its entries into the new slot arrays a
+                                few at a time over the following adds and removes, instead
+                                of all at once, so no single add rehashes the whole table.
+                                Lookups check both arrays until the move is done. Operations
+                                over the whole table finish the move first.
+        
+        Raises:
+            ValueError: If probing is not one of the strategies above, or shrink_below
+                        is not in [0, 1/3).
         """
+        if probing not in _PROBING:
+            raise ValueError(f"Unknown probing strategy: {probing!r}")
+        if not 0 <= shrink_below < 1/3:
+            raise ValueError(f"shrink_below must be at least 0 and below 1/3, not {shrink_below!r}")
         self.capacity = capacity
-        self.size = self._next_prime(int(1.5 * capacity))
-        self.table = np.full(self.size, None, dtype=object)
+        self.probing = probing
+        self._robin_hood = probing == "robin_hood"
+        self._shrink_below = shrink_below
+        self._min_size = self._next_prime(int(1.5 * capacity))
+        self._slots = _Slots(self._min_size)
         self.count = 0
-        self._deleted = object()  # Marker for deleted entries
+        self._tombstones = 0  # Slots marked deleted since the arrays were last rebuilt
+        self._compactions = 0
+        self._version = 0  # Bumped whenever an entry is added, removed or moved
+        self._hashfn = hash
+        self._incremental = incremental
+        self._old = None  # Slot arrays being moved into _slots by an incremental resize
+        self._migrated = 0  # Slots of _old already moved
+        self._stats = None
+        if stats:
+            self._stats = {"add": Counter(), "get": Counter(), "remove": Counter(),
+                           "resizes": 0, "resize_seconds": 0.0}
+
+    @property
+    def size(self):
+        """The number of slots in the table."""
+        return self._slots.size
+
+    @classmethod
+    def from_items(cls, items, **kwargs):
+        """
+        Builds a table from (key, value) pairs in one pass.
+        
+        Parameters:
+            items: A mapping or an iterable of (key, value) pairs. Later pairs win
+                   over earlier pairs with the same key.
+            **kwargs: Passed on to the constructor, e.g. probing.
+        
+        Returns:
+            Table: A table sized once for the distinct keys in items.
+        """
+        table = cls(0, **kwargs)
+        table.update(items)
+        return table
+
+    def update(self, items):
+        """
+        Adds many key-value pairs at once.
+        
+        The table is resized at most once, up front. When the table is empty, all keys
+        are hashed in a single batch and the slot arrays are filled with one assignment
+        each instead of probing once per key.
+        
+        Parameters:
+            items: A mapping or an iterable of (key, value) pairs. Later pairs win
+                   over earlier pairs with the same key.
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        pairs = list(items)
+        if not pairs:
+            return
+        if self._slots.readonly:
+            self._resize(self.size)
+        self._finish_migration()
+
+        if self.count > 0:
+            needed = self.count + len(pairs)
+            if (needed + self._tombstones) / self.size >= 2/3:
+                self._resize(self._fit_size(needed))
+            for key, value in pairs:
+                self._insert(key, value)
+            return
+
+        keys = [pair[0] for pair in pairs]
+        hashes = np.fromiter(map(self._hashfn, keys), dtype=np.int64, count=len(keys))
+        keep = _last_occurrences(keys, hashes)
+        if keep is not None:
+            pairs = [pair for pair, kept in zip(pairs, keep) if kept]
+            hashes = hashes[keep]
+        n = len(pairs)
+
+        self._rebuild(max(self.size, self._fit_size(n)), hashes,
+                      _objects((pair[0] for pair in pairs), n),
+                      _objects((pair[1] for pair in pairs), n))
 
     def isprime(self, value):
         """
@@ -44,17 +625,28 @@ class Table:
 
     def _next_prime(self, n):
         """
-        Finds and returns the next prime number greater than or equal to n.
+        Finds and returns a prime number greater than or equal to n, and for large n at
+        most about 4.4% above it, from a precomputed ladder of primes.
         
         Parameters:
             n (int): The starting number.
         
         Returns:
-            int: The next prime number.
+            int: The prime number.
         """
-        while not self.isprime(n):
-            n += 1
-        return n
+        return _ladder_prime(n)
+
+    def _fit_size(self, n):
+        """
+        Finds the smallest prime table size that holds n entries below the 2/3 load factor.
+        
+        Parameters:
+            n (int): The number of entries.
+        
+        Returns:
+            int: The table size.
+        """
+        return self._next_prime(int(1.5 * n) + 1)
 
     def _hash(self, key):
         """
@@ -66,46 +658,389 @@ class Table:
         Returns:
             int: The hash index within the table.
         """
-        return hash(key) % self.size
+        return self._hashfn(key) % self.size
+
+    def _probe_start(self, h, size):
+        """
+        Starts the probe sequence of a hash. Probe i visits slot
+        (home + step * i + incr * i * (i - 1) / 2) % size, and each strategy is a choice
+        of step and incr. Works elementwise on NumPy arrays of hashes as well.
+        
+        With a prime size, linear and double hashing visit every slot; quadratic probing
+        visits about half of them.
+        
+        Parameters:
+            h (int or np.ndarray): The hash.
+            size (int): The table size.
+        
+        Returns:
+            tuple: (home, step, incr)
+        """
+        home = h % size
+        if self.probing == "quadratic":
+            return home, 1, 2
+        if self.probing == "double":
+            return home, 1 + (h // size) % (size - 1), 0
+        return home, 1, 0
+
+    def _find(self, key, h, slots=None):
+        """
+        Finds the slot holding a key. Cached hashes are compared before calling __eq__.
+        
+        Parameters:
+            key: The key to search for.
+            h (int): The hash of key.
+            slots (_Slots): The slot arrays to search. Defaults to the table's current ones.
+        
+        Returns:
+            int: The slot index, or -1 if the key is not in the table.
+        """
+        if slots is None:
+            slots = self._slots
+        if self._robin_hood:
+            return self._find_robin_hood(key, h, slots)
+        return self._find_probing(key, h, slots)
+
+    def _find_probing(self, key, h, slots):
+        """
+        Finds the slot holding a key by following its probe sequence up to an empty slot.
+        Also finds keys in Robin Hood arrays, which are laid out by linear probing, without
+        relying on entries being ordered by distance from home.
+        
+        Parameters:
+            key: The key to search for.
+            h (int): The hash of key.
+            slots (_Slots): The slot arrays to search.
+        
+        Returns:
+            int: The slot index, or -1 if the key is not in the table.
+        """
+        states, hashes, keys = slots.state_view, slots.hash_view, slots.keys
+        size = slots.size
+        idx, step, incr = self._probe_start(h, size)
+        start_idx = idx
+        
+        while True:
+            state = states[idx]
+            if state == _EMPTY:
+                return -1
+            if state == _LIVE and hashes[idx] == h:
+                k = keys[idx]
+                if k is key or k == key:
+                    return idx
+            idx = (idx + step) % size
+            step += incr
+            if idx == start_idx:
+                return -1
+
+    def _find_robin_hood(self, key, h, slots):
+        """
+        Finds the slot holding a key in a Robin Hood table. The search stops as soon as
+        it meets an entry closer to its home slot than the key would be, since the key
+        would have taken that slot over.
+        
+        Parameters:
+            key: The key to search for.
+            h (int): The hash of key.
+            slots (_Slots): The slot arrays to search.
+        
+        Returns:
+            int: The slot index, or -1 if the key is not in the table.
+        """
+        states, hashes, keys = slots.state_view, slots.hash_view, slots.keys
+        size = slots.size
+        idx = h % size
+        dist = 0
+        
+        while states[idx] == _LIVE:
+            resident = hashes[idx]
+            if (idx - resident) % size < dist:
+                return -1
+            if resident == h:
+                k = keys[idx]
+                if k is key or k == key:
+                    return idx
+            idx = (idx + 1) % size
+            dist += 1
+        return -1
 
     def add(self, key, value):
         """
         Adds a key-value pair to the table. If the key already exists, updates its value.
-        If the load factor reaches 2/3 or above, resizes the table.
+        If the load factor reaches 2/3 or above, resizes the table. Otherwise, if live
+        entries and deleted markers together fill 2/3 of the table, rehashes at the same
+        size to clear the deleted markers.
+        
+        Parameters:
+            key: The key to add.
+            value: The value associated with the key.
+        """
+        if self._slots.readonly:
+            self._resize(self.size)
+        if self._stats is not None:
+            self._record("add", key, self._hashfn(key))
+        self._add(key, value)
+        self._grow_or_compact()
+
+    def _add(self, key, value):
+        """
+        Adds or updates a key-value pair without checking the load factor. During an
+        incremental resize, first moves the next few old slots, and updates the key in
+        the old arrays if it has not been moved yet.
         
         Parameters:
             key: The key to add.
             value: The value associated with the key.
         """
-        idx = self._hash(key)
+        if self._old is not None:
+            self._migrate(_MIGRATE_STEP)
+            old = self._old
+            if old is not None:
+                idx = self._find_old(key, self._hashfn(key), old)
+                if idx >= 0:
+                    old.values[idx] = value
+                    return
+        self._insert(key, value)
+
+    def _grow_or_compact(self):
+        """
+        Resizes the table after an insert if the load factor has reached 2/3, or clears the
+        deleted markers if they and the entries together fill 2/3 of it.
+        """
+        if self.load() >= 2/3:
+            self._regrow()
+        elif (self.count + self._tombstones) / self.size >= 2/3:
+            self._compact_tombstones()
+
+    def _regrow(self, size=None):
+        """
+        Moves the entries into new slot arrays after an insert: all at once, or in
+        incremental mode, a few with each following add and remove.
+        
+        Parameters:
+            size (int): The new table size. Defaults to the next prime after double the current size.
+        """
+        if self._incremental:
+            self._start_migration(size)
+        else:
+            self._resize(size)
+
+    def _start_migration(self, size=None):
+        """
+        Starts an incremental resize: the current slot arrays are kept as the old arrays
+        and new, empty ones take their place. If a resize is already under way, only the
+        entries it has moved so far are placed in the new arrays, at once, and the rest of
+        the old arrays go on moving into them.
+        
+        Parameters:
+            size (int): The new table size. Defaults to the next prime after double the current size.
+        """
+        if self._stats is not None:
+            self._stats["resizes"] += 1
+        new_size = size if size is not None else self._next_prime(self.size * 2)
+        if self._old is not None:
+            moved = self._slots
+            live = np.flatnonzero(moved.states == _LIVE)
+            hashes = moved.hashes[live]
+            idx = self._pack(hashes, new_size)
+            if idx is None:
+                # Quadratic probing could not place them at this size
+                self._resize(new_size)
+                return
+            slots = _Slots(new_size)
+            slots.states[idx] = _LIVE
+            slots.hashes[idx] = hashes
+            slots.keys[idx] = moved.keys[live]
+            slots.values[idx] = moved.values[live]
+            self._slots = slots
+            self._tombstones = 0
+            self._version += 1
+            return
+        self._migrated = 0
+        self._old = self._slots
+        self._slots = _Slots(new_size)
+        self._tombstones = 0
+        self._version += 1
+
+    def _migrate(self, n):
+        """
+        Moves the next n old slots of an incremental resize into the current arrays,
+        reusing their cached hashes, and drops the old arrays once all are moved.
+        
+        Parameters:
+            n (int): The number of old slots to move.
+        """
+        old = self._old
+        states, hashes, keys, values = old.state_view, old.hash_view, old.keys, old.values
+        stop = min(self._migrated + n, old.size)
+        # _place() may resize outright (quadratic probing only), which ends the migration.
+        while self._migrated < stop and self._old is old:
+            idx = self._migrated
+            self._migrated += 1
+            if states[idx] == _LIVE:
+                self._place(keys[idx], values[idx], hashes[idx])
+        if self._old is old and self._migrated == old.size:
+            self._old = None
+
+    def _place(self, key, value, h):
+        """
+        Moves an entry of the old arrays of an incremental resize into the current ones.
+        The key cannot be there yet, so no key is compared on the way.
+        
+        Parameters:
+            key: The key to move.
+            value: The value associated with the key.
+            h (int): The hash of key.
+        """
+        self.count -= 1
+        if self._robin_hood:
+            self._insert_robin_hood(key, value, h)
+            return
+        slots = self._slots
+        states = slots.state_view
+        size = slots.size
+        idx, step, incr = self._probe_start(h, size)
+        start_idx = idx
+        while states[idx] == _LIVE:
+            idx = (idx + step) % size
+            step += incr
+            if idx == start_idx:
+                self._insert(key, value, h)
+                return
+        if states[idx] == _DELETED:
+            self._tombstones -= 1
+        states[idx] = _LIVE
+        slots.hash_view[idx] = h
+        slots.keys[idx] = key
+        slots.values[idx] = value
+        self.count += 1
+        self._version += 1
+
+    def _finish_migration(self):
+        """Moves all entries still in the old arrays of an incremental resize at once."""
+        if self._old is not None:
+            self._resize(self.size)
+
+    def _find_old(self, key, h, old):
+        """
+        Finds the slot holding a key in the old arrays of an incremental resize.
+        
+        Parameters:
+            key: The key to search for.
+            h (int): The hash of key.
+            old (_Slots): The old slot arrays.
+        
+        Returns:
+            int: The slot index, or -1 if the key is not there or has already been moved.
+        """
+        idx = self._find_probing(key, h, old)
+        return idx if idx >= self._migrated else -1
+
+    def _insert(self, key, value, h=None):
+        """
+        Adds or updates a key-value pair without checking the load factor.
+        
+        Parameters:
+            key: The key to add.
+            value: The value associated with the key.
+            h (int): The hash of key, if already known.
+        """
+        if h is None:
+            h = self._hashfn(key)
+        if self._robin_hood:
+            self._insert_robin_hood(key, value, h)
+            return
+        slots = self._slots
+        states, hashes, keys = slots.state_view, slots.hash_view, slots.keys
+        size = slots.size
+        idx, step, incr = self._probe_start(h, size)
         start_idx = idx
         first_deleted_index = None
         
         while True:
-            entry = self.table[idx]
-            if entry is None:
+            state = states[idx]
+            if state == _EMPTY:
                 # Empty slot found.
-                if first_deleted_index is not None:
-                    idx = first_deleted_index
-                self.table[idx] = (key, value)
-                self.count += 1
                 break
-            elif entry is self._deleted:
+            elif state == _DELETED:
                 # the first deleted slot encountered.
                 if first_deleted_index is None:
                     first_deleted_index = idx
-            else:
-                k, v = entry
-                if k == key:
+            elif hashes[idx] == h:
+                k = keys[idx]
+                if k is key or k == key:
                     # Key already exists, update its value.
-                    self.table[idx] = (key, value)
+                    slots.values[idx] = value
                     return
-            idx = (idx + 1) % self.size
+            idx = (idx + step) % size
+            step += incr
             if idx == start_idx:
-                raise Exception("Table is full, unexpected condition!")
+                if first_deleted_index is None:
+                    # Only quadratic probing can get here: it visits about half the
+                    # slots, and they may all be taken while the table is below 2/3.
+                    self._resize()
+                    self._insert(key, value, h)
+                    return
+                break
         
-        if self.load() >= 2/3:
-            self._resize()
+        if first_deleted_index is not None:
+            # Reuse the first deleted slot on the probe path.
+            idx = first_deleted_index
+            self._tombstones -= 1
+        states[idx] = _LIVE
+        hashes[idx] = h
+        keys[idx] = key
+        slots.values[idx] = value
+        self.count += 1
+        self._version += 1
+
+    def _insert_robin_hood(self, key, value, h):
+        """
+        Adds or updates a key-value pair in a Robin Hood table without checking the load factor.
+        
+        Once the probe meets an entry closer to its home slot than the new key, the key
+        is known to be absent; it takes that slot, and the displaced entry carries on
+        probing in the same way.
+        
+        Parameters:
+            key: The key to add.
+            value: The value associated with the key.
+            h (int): The hash of key.
+        """
+        slots = self._slots
+        states, hashes, keys, values = slots.state_view, slots.hash_view, slots.keys, slots.values
+        size = slots.size
+        idx = h % size
+        dist = 0
+        
+        while states[idx] == _LIVE:
+            resident = hashes[idx]
+            if (idx - resident) % size < dist:
+                break
+            if resident == h:
+                k = keys[idx]
+                if k is key or k == key:
+                    # Key already exists, update its value.
+                    values[idx] = value
+                    return
+            idx = (idx + 1) % size
+            dist += 1
+        
+        while states[idx] == _LIVE:
+            resident_dist = (idx - hashes[idx]) % size
+            if resident_dist < dist:
+                h, hashes[idx] = hashes[idx], h
+                key, keys[idx] = keys[idx], key
+                value, values[idx] = values[idx], value
+                dist = resident_dist
+            idx = (idx + 1) % size
+            dist += 1
+        states[idx] = _LIVE
+        hashes[idx] = h
+        keys[idx] = key
+        values[idx] = value
+        self.count += 1
+        self._version += 1
 
     def get(self, key):
         """
@@ -120,21 +1055,126 @@ class Table:
         Raises:
             KeyError: If the key is not found.
         """
-        idx = self._hash(key)
-        start_idx = idx
+        h = self._hashfn(key)
+        if self._stats is not None:
+            self._record("get", key, h)
+        value = self._lookup(key, h)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def _lookup(self, key, h):
+        """
+        Looks a key up, in both arrays during an incremental resize. Each array is read
+        through one reference, so the answer holds even if a resize swaps the arrays meanwhile.
         
-        while True:
-            entry = self.table[idx]
-            if entry is None:
-                raise KeyError(key)
-            elif entry is not self._deleted:
-                k, v = entry
-                if k == key:
-                    return v
-            idx = (idx + 1) % self.size
-            if idx == start_idx:
-                break
-        raise KeyError(key)
+        Parameters:
+            key: The key to search for.
+            h (int): The hash of key.
+        
+        Returns:
+            The value associated with the key, or _MISSING if it is not in the table.
+        """
+        slots = self._slots
+        idx = self._find(key, h, slots)
+        if idx >= 0:
+            return slots.values[idx]
+        old = self._old
+        if old is not None:
+            idx = self._find_old(key, h, old)
+            if idx >= 0:
+                return old.values[idx]
+        return _MISSING
+
+    def get_many(self, keys, default=_MISSING, return_mask=False):
+        """
+        Retrieves the values of many keys at once.
+        
+        Parameters:
+            keys: An iterable of keys to search for.
+            default: The value given for keys that are not found. If omitted, a missing
+                     key raises KeyError.
+            return_mask (bool): If True, also return which keys were not found.
+        
+        Returns:
+            np.ndarray: An object array of values, aligned with keys.
+            np.ndarray: Only with return_mask; a boolean array, True where the key was not found.
+        
+        Raises:
+            KeyError: If a key is not found and no default was given.
+        """
+        keys = list(keys)
+        found = self._find_many(keys)
+        missing = found < 0
+        n_missing = int(np.count_nonzero(missing))
+        if n_missing and default is _MISSING:
+            raise KeyError(keys[int(np.argmax(missing))])
+        
+        result = np.empty(len(keys), dtype=object)
+        result[~missing] = self._slots.values[found[~missing]]
+        if n_missing:
+            result[missing] = _objects(repeat(default, n_missing), n_missing)
+        if return_mask:
+            return result, missing
+        return result
+
+    def contains_many(self, keys):
+        """
+        Checks which of many keys are in the table.
+        
+        Parameters:
+            keys: An iterable of keys to search for.
+        
+        Returns:
+            np.ndarray: A boolean array, aligned with keys, True where the key is in the table.
+        """
+        return self._find_many(list(keys)) >= 0
+
+    def _find_many(self, keys):
+        """
+        Finds the slots of many keys. All keys take their probe steps together as NumPy
+        operations, one round per step, until each has hit its key or the end of its
+        probe sequence; keys are compared as in get(), by identity and then with __eq__,
+        and only where the cached hash matches.
+        
+        Parameters:
+            keys (list): The keys to search for.
+        
+        Returns:
+            np.ndarray: The slot of every key, or -1 where the key is not in the table.
+        """
+        self._finish_migration()
+        slots = self._slots
+        size = slots.size
+        n = len(keys)
+        wanted = _objects(keys, n)
+        hashes = np.fromiter(map(self._hashfn, keys), dtype=np.int64, count=n)
+        idx, step, incr = self._probe_start(hashes, size)
+        step = np.broadcast_to(step, (n,)).astype(np.int64)
+        found = np.full(n, -1, dtype=np.int64)
+        pending = np.arange(n)
+        dist = 0
+        
+        while len(pending) and dist < size:
+            states = slots.states[idx]
+            resident = slots.hashes[idx]
+            match = (states == _LIVE) & (resident == hashes[pending])
+            if match.any():
+                candidates = np.flatnonzero(match)
+                same = _same_key(slots.keys[idx[candidates]], wanted[pending[candidates]]).astype(bool)
+                hits = candidates[same]
+                found[pending[hits]] = idx[hits]
+                match[candidates[~same]] = False
+            
+            # An empty slot ends the search; so does, with Robin Hood, an entry closer to home.
+            going = ~match & (states != _EMPTY)
+            if self._robin_hood:
+                going &= (idx - resident % size) % size >= dist
+            pending, idx, step = pending[going], idx[going], step[going]
+            idx = (idx + step) % size
+            step = (step + incr) % size
+            dist += 1
+        return found
 
     def remove(self, key):
         """
@@ -146,23 +1186,180 @@ class Table:
         Raises:
             KeyError: If the key is not found.
         """
-        idx = self._hash(key)
-        start_idx = idx
+        if self._slots.readonly:
+            self._resize(self.size)
+        h = self._hashfn(key)
+        if self._stats is not None:
+            self._record("remove", key, h)
+        self._delete(key, h)
+        self._shrink_if_sparse()
+
+    def _delete(self, key, h):
+        """
+        Removes a key from the slot arrays, without shrinking the table.
         
-        while True:
-            entry = self.table[idx]
-            if entry is None:
+        Parameters:
+            key: The key to remove.
+            h (int): The hash of key.
+        
+        Raises:
+            KeyError: If the key is not found.
+        """
+        if self._old is not None:
+            self._migrate(_MIGRATE_STEP)
+        idx = self._find(key, h)
+        if idx < 0:
+            old = self._old
+            idx = self._find_old(key, h, old) if old is not None else -1
+            if idx < 0:
                 raise KeyError(key)
-            elif entry is not self._deleted:
-                k, v = entry
-                if k == key:
-                    self.table[idx] = self._deleted
-                    self.count -= 1
-                    return
-            idx = (idx + 1) % self.size
-            if idx == start_idx:
-                break
-        raise KeyError(key)
+            # The old arrays are only read by lookups and the move, which both skip
+            # deleted markers, even in a Robin Hood table.
+            old.state_view[idx] = _DELETED
+            old.keys[idx] = None
+            old.values[idx] = None
+            self.count -= 1
+            self._version += 1
+            return
+        self.count -= 1
+        self._version += 1
+        if self._robin_hood:
+            self._shift_back(idx)
+        else:
+            slots = self._slots
+            slots.state_view[idx] = _DELETED
+            slots.keys[idx] = None
+            slots.values[idx] = None
+            self._tombstones += 1
+
+    def _shrink_if_sparse(self):
+        """
+        Shrinks the table to a load factor of about 1/3 after a removal if its load factor
+        has fallen below the low-water mark, but not below its initial size.
+        """
+        if self.load() < self._shrink_below and self.size > self._min_size:
+            self._resize(max(self._min_size, self._next_prime(3 * self.count)))
+
+    def save(self, path):
+        """
+        Writes the table to a snapshot file that open() can memory-map.
+        
+        The file holds a header with the size and count, the slot state and hash arrays,
+        and the keys and values packed by type. Keys are rehashed with a hash that is the
+        same in every process, since hash() of str and bytes is not.
+        
+        Parameters:
+            path (str): The file to write.
+        
+        Raises:
+            TypeError: If a key or value is not a str, int, bytes or None.
+        """
+        self._finish_migration()
+        slots = self._slots
+        live = np.flatnonzero(slots.states == _LIVE)
+        keys, values = slots.keys[live], slots.values[live]
+        snapshot = Table(0, probing=self.probing, shrink_below=0)
+        snapshot._hashfn = _stable_hash
+        snapshot._rebuild(self.size, np.fromiter(map(_stable_hash, keys), dtype=np.int64, count=len(keys)),
+                          keys, values)
+        
+        slots = snapshot._slots
+        live = np.flatnonzero(slots.states == _LIVE)
+        key_tags, key_offsets, key_data = _pack_column(slots.keys[live], live, slots.size)
+        value_tags, value_offsets, value_data = _pack_column(slots.values[live], live, slots.size)
+        with open(path, "wb") as file:
+            file.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, slots.size, snapshot.count,
+                                             _PROBING.index(self.probing), len(key_data), len(value_data)))
+            for array in (slots.hashes, key_offsets, value_offsets, slots.states, key_tags, value_tags):
+                file.write(array.tobytes())
+            file.write(key_data)
+            file.write(value_data)
+
+    @classmethod
+    def open(cls, path, mmap=True):
+        """
+        Loads a table written by save().
+        
+        Parameters:
+            path (str): The snapshot file.
+            mmap (bool): If True, map the file read-only and run lookups straight off it:
+                         nothing is deserialized up front, keys and values are decoded only
+                         when read, and processes opening the same file share its pages.
+                         The first change to the table copies it into memory; the file is
+                         never written. If False, read the whole file into memory.
+        
+        Returns:
+            Table: The table.
+        
+        Raises:
+            ValueError: If the file is not a table snapshot, or is shorter or longer than
+                        its header says.
+        """
+        if mmap:
+            buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            buffer = np.fromfile(path, dtype=np.uint8)
+        if len(buffer) < _SNAPSHOT_HEADER.size:
+            raise ValueError(f"{path} is not a table snapshot")
+        magic, size, count, probing, key_bytes, value_bytes = _SNAPSHOT_HEADER.unpack_from(buffer)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a table snapshot")
+        
+        sections = []
+        offset = _SNAPSHOT_HEADER.size
+        for dtype, length in ((np.int64, size), (np.int64, size + 1), (np.int64, size + 1),
+                              (np.uint8, size), (np.uint8, size), (np.uint8, size),
+                              (np.uint8, key_bytes), (np.uint8, value_bytes)):
+            end = offset + length * np.dtype(dtype).itemsize
+            if end > len(buffer):
+                raise ValueError(f"{path} is a truncated table snapshot")
+            sections.append(buffer[offset:end].view(dtype))
+            offset = end
+        if offset != len(buffer):
+            raise ValueError(f"{path} is not a table snapshot")
+        hashes, key_offsets, value_offsets, states, key_tags, value_tags, key_data, value_data = sections
+        keys = _PackedColumn(key_tags, key_offsets, key_data)
+        values = _PackedColumn(value_tags, value_offsets, value_data)
+        
+        table = cls(0, probing=_PROBING[probing])
+        table._hashfn = _stable_hash
+        if mmap:
+            table._slots = _Slots(size, (states, hashes, keys, values))
+            table.count = count
+        else:
+            live = np.flatnonzero(states == _LIVE)
+            table._rebuild(size, hashes[live], keys[live], values[live])
+        return table
+
+    def compact(self):
+        """
+        Reallocates the table to the smallest size that holds its entries below the 2/3
+        load factor, giving back the memory of removed entries and deleted markers.
+        """
+        self._resize(self._fit_size(self.count))
+
+    def _shift_back(self, idx):
+        """
+        Empties a slot of a Robin Hood table by moving each following entry that is away
+        from its home slot back by one, up to the next empty slot or entry already at home.
+        
+        Parameters:
+            idx (int): The slot to empty.
+        """
+        slots = self._slots
+        states, hashes, keys, values = slots.state_view, slots.hash_view, slots.keys, slots.values
+        size = slots.size
+        nxt = (idx + 1) % size
+        
+        while states[nxt] == _LIVE and hashes[nxt] % size != nxt:
+            hashes[idx] = hashes[nxt]
+            keys[idx] = keys[nxt]
+            values[idx] = values[nxt]
+            idx = nxt
+            nxt = (nxt + 1) % size
+        states[idx] = _EMPTY
+        keys[idx] = None
+        values[idx] = None
 
     def keys(self):
         """
@@ -171,11 +1368,86 @@ class Table:
         Returns:
             set: A set containing all the keys.
         """
-        result = set()
-        for entry in self.table:
-            if entry is not None and entry is not self._deleted:
-                result.add(entry[0])
-        return result
+        self._finish_migration()
+        slots = self._slots
+        return set(slots.keys[slots.states == _LIVE])
+
+    def __iter__(self):
+        """
+        Iterates lazily over the keys in the table.
+        
+        Yields:
+            Each key in the table.
+        
+        Raises:
+            RuntimeError: If the table is changed during iteration.
+        """
+        self._finish_migration()
+        keys = self._slots.keys
+        for idx in self._live_slots():
+            yield keys[idx]
+
+    def items(self):
+        """
+        Iterates lazily over the key-value pairs in the table.
+        
+        Yields:
+            tuple: (key, value) for each entry.
+        
+        Raises:
+            RuntimeError: If the table is changed during iteration.
+        """
+        self._finish_migration()
+        keys, values = self._slots.keys, self._slots.values
+        for idx in self._live_slots():
+            yield keys[idx], values[idx]
+
+    def values(self):
+        """
+        Iterates lazily over the values in the table.
+        
+        Yields:
+            Each value in the table.
+        
+        Raises:
+            RuntimeError: If the table is changed during iteration.
+        """
+        self._finish_migration()
+        values = self._slots.values
+        for idx in self._live_slots():
+            yield values[idx]
+
+    def __contains__(self, key):
+        """
+        Checks whether a key is in the table.
+        
+        Parameters:
+            key: The key to search for.
+        
+        Returns:
+            bool: True if the key is in the table, False otherwise.
+        """
+        return self._lookup(key, self._hashfn(key)) is not _MISSING
+
+    def _live_slots(self):
+        """
+        Yields the index of every live slot. Slots are masked a chunk at a time, so empty
+        and deleted slots are skipped in bulk without building an index of the whole table.
+        
+        Yields:
+            int: The index of each live slot, in slot order.
+        
+        Raises:
+            RuntimeError: If the table is changed during iteration.
+        """
+        version = self._version
+        states = self._slots.states
+        for start in range(0, len(states), _ITER_CHUNK):
+            live = np.flatnonzero(states[start:start + _ITER_CHUNK] == _LIVE) + start
+            for idx in live.tolist():
+                yield idx
+                if self._version != version:
+                    raise RuntimeError("Table changed during iteration")
 
     def load(self):
         """
@@ -186,6 +1458,175 @@ class Table:
         """
         return self.count / self.size
 
+    def tombstone_stats(self):
+        """
+        Reports on deleted markers and how far lookups have to probe.
+        
+        Returns:
+            dict: With the keys
+                live (int): The number of entries.
+                tombstones (int): The number of deleted markers.
+                size (int): The number of slots.
+                occupancy (float): (live + tombstones) / size, the load lookups actually see.
+                compactions (int): How often deleted markers were cleared by rehashing in place.
+                mean_probe_length (float): Mean slots probed to find a live key.
+                max_probe_length (int): Most slots probed to find a live key.
+                longest_run (int): Longest run of non-empty slots, which bounds the slots
+                                   probed by a lookup that misses.
+        
+        During an incremental resize, the entries and deleted markers still in the old
+        arrays are counted too, and their probe lengths and runs are measured there; the
+        resize itself is left to go on at its own pace.
+        """
+        slots = self._slots
+        tombstones = self._tombstones
+        probes = self._probe_lengths(slots)
+        clusters = self._cluster_lengths(slots)
+        old = self._old
+        if old is not None:
+            tombstones += int(np.count_nonzero(old.states[self._migrated:] == _DELETED))
+            probes = np.concatenate((probes, self._probe_lengths(old, self._migrated)))
+            clusters = np.concatenate((clusters, self._cluster_lengths(old)))
+        return {
+            "live": self.count,
+            "tombstones": tombstones,
+            "size": slots.size,
+            "occupancy": (self.count + tombstones) / slots.size,
+            "compactions": self._compactions,
+            "mean_probe_length": float(probes.mean()) if len(probes) else 0.0,
+            "max_probe_length": int(probes.max()) if len(probes) else 0,
+            "longest_run": int(clusters.max()) if len(clusters) else 0,
+        }
+
+    def stats(self):
+        """
+        Reports on the shape of the table and, in stats mode, on the calls made to it.
+        
+        Returns:
+            dict: Everything tombstone_stats() reports, plus
+                clusters (dict): Cluster length -> number of clusters, where a cluster is
+                                 a run of non-empty slots.
+            and, if the table was created with stats=True,
+                resizes (int): The number of resizes, including tombstone compactions.
+                resize_seconds (float): The time spent resizing.
+                add, get, remove (dict): For each operation, with the keys
+                    calls (int): The number of calls.
+                    mean_probes (float): Mean slots probed per call.
+                    max_probes (int): Most slots probed by one call.
+                    histogram (dict): Probe length -> number of calls.
+        """
+        result = self.tombstone_stats()
+        clusters = self._cluster_lengths(self._slots)
+        if self._old is not None:
+            clusters = np.concatenate((clusters, self._cluster_lengths(self._old)))
+        lengths, counts = np.unique(clusters, return_counts=True)
+        result["clusters"] = dict(zip(lengths.tolist(), counts.tolist()))
+        if self._stats is None:
+            return result
+        
+        result["resizes"] = self._stats["resizes"]
+        result["resize_seconds"] = self._stats["resize_seconds"]
+        for op in ("add", "get", "remove"):
+            histogram = self._stats[op]
+            calls = sum(histogram.values())
+            result[op] = {
+                "calls": calls,
+                "mean_probes": sum(n * c for n, c in histogram.items()) / calls if calls else 0.0,
+                "max_probes": max(histogram, default=0),
+                "histogram": dict(sorted(histogram.items())),
+            }
+        return result
+
+    def _record(self, op, key, h):
+        """
+        Records the probe length of an add, get or remove call in stats mode.
+        
+        Parameters:
+            op (str): "add", "get" or "remove".
+            key: The key of the call.
+            h (int): The hash of key.
+        """
+        self._stats[op][self._path_length(key, h)] += 1
+
+    def _path_length(self, key, h):
+        """
+        Counts the slots a lookup of key probes before it finds the key or gives up, which
+        is also how far add() probes. Walking the probe sequence again here, in stats mode
+        only, keeps counters out of the probe loops.
+        
+        Parameters:
+            key: The key to search for.
+            h (int): The hash of key.
+        
+        Returns:
+            int: The number of slots probed.
+        """
+        slots = self._slots
+        states, hashes, keys = slots.state_view, slots.hash_view, slots.keys
+        size = slots.size
+        idx, step, incr = self._probe_start(h, size)
+        
+        for probes in range(1, size + 1):
+            state = states[idx]
+            if state == _EMPTY:
+                return probes
+            if state == _LIVE:
+                resident = hashes[idx]
+                if self._robin_hood and (idx - resident) % size < probes - 1:
+                    return probes
+                if resident == h:
+                    k = keys[idx]
+                    if k is key or k == key:
+                        return probes
+            idx = (idx + step) % size
+            step += incr
+        return size
+
+    def _cluster_lengths(self, slots):
+        """
+        Measures every run of non-empty slots, counting a run that wraps past the end of the
+        table as one.
+        
+        Parameters:
+            slots (_Slots): The slot arrays to measure.
+        
+        Returns:
+            np.ndarray: The length of every cluster.
+        """
+        empty = np.flatnonzero(slots.states == _EMPTY)
+        if not len(empty):
+            return np.array([slots.size])
+        gaps = np.diff(np.append(empty, empty[0] + slots.size)) - 1
+        return gaps[gaps > 0]
+
+    def _probe_lengths(self, slots, start=0):
+        """
+        Computes how many slots a lookup probes to find each live key.
+        
+        Parameters:
+            slots (_Slots): The slot arrays to measure.
+            start (int): Only keys in this slot or later are measured, e.g. those an
+                         incremental resize has not moved yet.
+        
+        Returns:
+            np.ndarray: The probe length of every live key, in slot order.
+        """
+        live = np.flatnonzero(slots.states[start:] == _LIVE) + start
+        hashes = slots.hashes[live]
+        if self.probing in ("linear", "robin_hood"):
+            return (live - hashes % slots.size) % slots.size + 1
+
+        idx, step, incr = self._probe_start(hashes, slots.size)
+        step = np.broadcast_to(step, idx.shape).astype(np.int64)
+        lengths = np.ones(len(live), dtype=np.int64)
+        pending = np.flatnonzero(idx != live)
+        while len(pending):
+            lengths[pending] += 1
+            idx[pending] = (idx[pending] + step[pending]) % slots.size
+            step[pending] = (step[pending] + incr) % slots.size
+            pending = pending[idx[pending] != live[pending]]
+        return lengths
+
     def __str__(self):
         """
         Returns a string representation of all key-value pairs in the table.
@@ -194,11 +1635,7 @@ class Table:
         Returns:
             str: String representation of the table.
         """
-        items = []
-        for entry in self.table:
-            if entry is not None and entry is not self._deleted:
-                items.append(f"<{entry[0]}: {entry[1]}>")
-        return "{" + ", ".join(items) + "}"
+        return "{" + ", ".join(f"<{k}: {v}>" for k, v in self.items()) + "}"
 
     def __len__(self):
         """
@@ -209,35 +1646,109 @@ class Table:
         """
         return self.count
 
-    def _show_entries(self):
+    def _show_entries(self, limit=100):
         """
         Shows all entries in the table, including empty slots and deleted markers.
+        Tables with more than limit slots are summarized by cluster length instead.
+        
+        Parameters:
+            limit (int): The most slots to list one by one.
         """
-        for idx, entry in enumerate(self.table):
-            if entry is None:
+        self._finish_migration()
+        slots = self._slots
+        if slots.size > limit:
+            stats = self.stats()
+            print(f"Slots: {slots.size} Live: {stats['live']} Deleted: {stats['tombstones']} "
+                  f"Load: {self.load():.3f} Occupancy: {stats['occupancy']:.3f}")
+            for length, clusters in stats["clusters"].items():
+                print(f"Clusters of length {length}: {clusters}")
+            return
+        for idx in range(slots.size):
+            state = slots.states[idx]
+            if state == _EMPTY:
                 print(f"Index {idx}: None")
-            elif entry is self._deleted:
+            elif state == _DELETED:
                 print(f"Index {idx}: _deleted")
             else:
-                print(f"Index {idx}: {entry}")
+                print(f"Index {idx}: ({slots.keys[idx]!r}, {slots.values[idx]!r})")
 
-    def _resize(self):
+    def _resize(self, size=None):
         """
         Resizes the table to a new size (a prime number roughly double the current size)
         and rehashes all valid entries.
+        
+        The cached hashes are reused, so no key is hashed or compared again, and all
+        entries are placed in the new arrays at once.
+        
+        Parameters:
+            size (int): The new table size. Defaults to the next prime after double the current size.
         """
-        old_table = self.table
-        old_size = self.size
-        self.size = self._next_prime(self.size * 2)
-        self.table = np.full(self.size, None, dtype=object)
-        old_count = self.count
-        self.count = 0
+        if self._stats is not None:
+            start = time.perf_counter()
+        old_slots = self._slots
+        new_size = size if size is not None else self._next_prime(self.size * 2)
+        live = np.flatnonzero(old_slots.states == _LIVE)
+        hashes, keys, values = old_slots.hashes[live], old_slots.keys[live], old_slots.values[live]
+        if self._old is not None:
+            # Take along the entries an incremental resize has not moved yet.
+            old = self._old
+            rest = np.flatnonzero(old.states[self._migrated:] == _LIVE) + self._migrated
+            hashes = np.concatenate((hashes, old.hashes[rest]))
+            keys = np.concatenate((keys, old.keys[rest]))
+            values = np.concatenate((values, old.values[rest]))
+        self._rebuild(new_size, hashes, keys, values)
+        if self._stats is not None:
+            self._stats["resizes"] += 1
+            self._stats["resize_seconds"] += time.perf_counter() - start
+
+    def _compact_tombstones(self):
+        """
+        Rehashes the live entries into fresh arrays, dropping every deleted marker,
+        over the following operations in incremental mode.
+        The size stays the same unless live entries alone fill half the table, in which
+        case it doubles so that compaction does not come round again after a few inserts.
+        """
+        self._regrow(self.size if self.load() < 1/2 else None)
+        self._compactions += 1
+
+    def _rebuild(self, size, hashes, keys, values):
+        """
+        Replaces the slot arrays with new ones holding exactly the given entries.
         
-        for entry in old_table:
-            if entry is not None and entry is not self._deleted:
-                key, value = entry
-                self.add(key, value)
-        # After rehashing, count should be the same.
-        assert self.count == old_count
+        Parameters:
+            size (int): The new table size.
+            hashes (np.ndarray): The cached hash of every entry.
+            keys (np.ndarray): The distinct keys, as an object array.
+            values (np.ndarray): The values, as an object array.
+        """
+        idx = self._pack(hashes, size)
+        while idx is None:
+            size = self._next_prime(size * 2)
+            idx = self._pack(hashes, size)
+        slots = _Slots(size)
+        slots.states[idx] = _LIVE
+        slots.hashes[idx] = hashes
+        slots.keys[idx] = keys
+        slots.values[idx] = values
+        self._slots = slots
+        self._old = None
+        self.count = len(hashes)
+        self._version += 1
+        self._tombstones = 0
 
-    
\ No newline at end of file
+    def _pack(self, hashes, size):
+        """
+        Computes the slot of every entry for a batch going into an empty table.
+        
+        Parameters:
+            hashes (np.ndarray): The cached hash of every entry.
+            size (int): The table size.
+        
+        Returns:
+            np.ndarray or None: The slot of every entry, or None if quadratic probing could
+                                not place every entry at this size.
+        """
+        if self.probing in ("linear", "robin_hood"):
+            # Packing sorted by home slot is also a valid Robin Hood layout.
+            return _pack_linear(hashes % size, size)
+        return _pack_probing(*self._probe_start(hashes, size), size)
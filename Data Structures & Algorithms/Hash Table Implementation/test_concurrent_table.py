@@ -0,0 +1,77 @@
+import sys
+import threading
+import unittest
+from concurrent_table import *
+
+
+# Run from terminal: python -m unittest test_concurrent_table.py
+class ConcurrentTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+
+    def tearDown(self) -> None:
+        sys.setswitchinterval(self.interval)
+
+    def test_single_thread(self):
+        """Test add, get, remove, update and keys without other threads"""
+        t = ConcurrentTable(10, stripes=4)
+        for i in range(100):
+            t.add(i, str(i))
+        t.update((i, str(i)) for i in range(100, 200))
+        self.assertEqual(200, len(t))
+        self.assertEqual('150', t.get(150))
+        self.assertIn(199, t)
+        t.remove(150)
+        self.assertNotIn(150, t)
+        self.assertRaises(KeyError, t.get, 150)
+        self.assertRaises(KeyError, t.remove, 150)
+        self.assertIsNone(t.get(150, None))
+        self.assertEqual(set(range(200)) - {150}, t.keys())
+        self.assertRaises(ValueError, ConcurrentTable, stripes=0)
+
+    def test_stress(self):
+        """Test that readers always see a whole, current value while writers grow and shrink the table"""
+        for probing, incremental in (('linear', False), ('robin_hood', False),
+                                     ('linear', True), ('robin_hood', True)):
+            with self.subTest(probing=probing, incremental=incremental):
+                t = ConcurrentTable(1, stripes=4, probing=probing, incremental=incremental)
+                n_writers, n_keys, rounds = 4, 2000, 3
+                errors = []
+                done = threading.Event()
+
+                def write(w):
+                    keys = range(w * n_keys, (w + 1) * n_keys)
+                    for r in range(rounds):
+                        for key in keys:
+                            t.add(key, (key, r))
+                        for key in keys:
+                            if key % 2:
+                                t.remove(key)
+
+                def read():
+                    while not done.is_set():
+                        for key in range(0, n_writers * n_keys, 7):
+                            value = t.get(key, None)
+                            if value is not None and value[0] != key:
+                                errors.append((key, value))
+
+                writers = [threading.Thread(target=write, args=(w,)) for w in range(n_writers)]
+                readers = [threading.Thread(target=read) for _ in range(2)]
+                for thread in writers + readers:
+                    thread.start()
+                for thread in writers:
+                    thread.join()
+                done.set()
+                for thread in readers:
+                    thread.join()
+
+                self.assertEqual([], errors)
+                expected = {key for key in range(n_writers * n_keys) if key % 2 == 0}
+                self.assertEqual(expected, t.keys())
+                self.assertEqual(len(expected), len(t))
+                for key in expected:
+                    self.assertEqual((key, rounds - 1), t.get(key))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from table import *
+from table import _MIGRATE_STEP
 
 
 # Run from terminal: python -m unittest test_table.py
@@ -132,5 +133,551 @@ class TableTest(unittest.TestCase):
             t.remove(letter)
             
         t._show_entries()        
+
+    def test_from_items(self):
+        """Test building a table in one pass"""
+        t = Table.from_items((key, value) for value, key in enumerate(self.letters))
+        self.assertEqual(len(self.letters), len(t))
+        self.assertEqual(set(self.letters), t.keys())
+        self.assertTrue(t.load() < self.max_load_factor)
+        for value, key in enumerate(self.letters):
+            self.assertEqual(value, t.get(key))
+
+        t = Table.from_items([('a', 1), ('b', 2), ('a', 3)])
+        self.assertEqual(2, len(t))
+        self.assertEqual(3, t.get('a'))
+
+        t = Table.from_items({})
+        self.assertEqual(0, len(t))
+        self.assertRaises(KeyError, t.get, 'a')
+
+    def test_from_items_large(self):
+        """Test that a bulk-loaded table agrees with one built by add"""
+        pairs = [(f'key{i}', i) for i in range(5000)] + [(i * 7919, i) for i in range(5000)]
+        bulk = Table.from_items(pairs)
+        for key, value in pairs:
+            self.assertEqual(value, bulk.get(key))
+        self.assertEqual(len(pairs), len(bulk))
+        self.assertTrue(bulk.load() < self.max_load_factor)
+
+        bulk.remove('key0')
+        bulk.add('key0', 'again')
+        self.assertEqual('again', bulk.get('key0'))
+        self.assertEqual(len(pairs), len(bulk))
+
+    def test_update(self):
+        """Test adding many entries to a table that already has some"""
+        t = Table(1)
+        t.add('A', 'old')
+        t.update({letter: index for index, letter in enumerate(self.letters)})
+        self.assertEqual(len(self.letters), len(t))
+        self.assertEqual(0, t.get('A'))
+        self.assertEqual(25, t.get('Z'))
+        self.assertTrue(t.load() < self.max_load_factor)
+
+    def test_hash_collisions(self):
+        """Test that keys sharing a hash are told apart, and that __eq__ is only called on matching hashes"""
+        calls = []
+
+        class Key:
+            def __init__(self, name, h):
+                self.name, self.h = name, h
+
+            def __hash__(self):
+                return self.h
+
+            def __eq__(self, other):
+                calls.append(self.name)
+                return self.name == other.name
+
+        t = Table(5)
+        first, second, other = Key('first', 42), Key('second', 42), Key('other', 7)
+        t.add(first, 1)
+        t.add(second, 2)
+        t.add(other, 3)
+        self.assertEqual(1, t.get(Key('first', 42)))
+        self.assertEqual(2, t.get(Key('second', 42)))
+        calls.clear()
+        self.assertEqual(3, t.get(Key('other', 7)))
+        self.assertTrue(all(name == 'other' for name in calls))
+        self.assertRaises(KeyError, t.get, Key('third', 42))
+
+    def test_tuple_keys(self):
+        """Test that tuple keys and values are stored as single entries"""
+        t = Table.from_items([((1, 2), ('a', 'b')), ((3, 4), ('c', 'd'))])
+        t.add((5, 6), ('e', 'f'))
+        self.assertEqual(('a', 'b'), t.get((1, 2)))
+        self.assertEqual(('e', 'f'), t.get((5, 6)))
+        self.assertEqual({(1, 2), (3, 4), (5, 6)}, t.keys())
+
+    def test_resize_reuses_hashes(self):
+        """Test that resizing neither hashes nor compares keys again"""
+        calls = []
+
+        class Key:
+            def __init__(self, name):
+                self.name = name
+
+            def __hash__(self):
+                calls.append('hash')
+                return hash(self.name)
+
+            def __eq__(self, other):
+                calls.append('eq')
+                return self.name == other.name
+
+        t = Table(5)
+        keys = [Key(letter) for letter in self.letters]
+        for value, key in enumerate(keys):
+            t.add(key, value)
+        size = t.size
+        calls.clear()
+        t._resize()
+        self.assertEqual([], calls)
+        self.assertTrue(t.size > size)
+        self.assertEqual(len(keys), len(t))
+        for value, key in enumerate(keys):
+            self.assertEqual(value, t.get(key))
+
+    def test_tombstones(self):
+        """Test that deleted markers are counted and cleared under insert/delete churn"""
+        t = Table(10)
+        size = t.size
+        for i in range(1000):
+            t.add(i, i)
+            if i >= 5:
+                t.remove(i - 5)
+            stats = t.tombstone_stats()
+            self.assertTrue(stats['occupancy'] < self.max_load_factor)
+            self.assertTrue(stats['longest_run'] < t.size)
+            self.assertEqual(5 if i >= 5 else i + 1, stats['live'])
+        self.assertEqual(size, t.size)
+        self.assertTrue(t.tombstone_stats()['compactions'] > 0)
+        self.assertRaises(KeyError, t.get, 0)
+        for i in range(995, 1000):
+            self.assertEqual(i, t.get(i))
+
+    def test_tombstone_stats(self):
+        """Test the tombstone stats of a small table"""
+        t = Table(5)
+        stats = t.tombstone_stats()
+        self.assertEqual(0, stats['live'])
+        self.assertEqual(0, stats['tombstones'])
+        self.assertEqual(0, stats['max_probe_length'])
+
+        for letter in 'ABC':
+            t.add(letter, 0)
+        t.remove('B')
+        stats = t.tombstone_stats()
+        self.assertEqual(2, stats['live'])
+        self.assertEqual(1, stats['tombstones'])
+        self.assertEqual(3 / t.size, stats['occupancy'])
+        self.assertTrue(stats['mean_probe_length'] >= 1)
+
+        t.add('B', 1)  # reuses the deleted slot
+        self.assertEqual(0, t.tombstone_stats()['tombstones'])
+
+    def test_probing(self):
+        """Test every probing strategy against a dict under random adds, removes and lookups"""
+        import random
+        for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+            with self.subTest(probing=probing):
+                rng = random.Random(probing)
+                t = Table(5, probing=probing)
+                expected = {}
+                for step in range(3000):
+                    key = rng.randrange(300) * 37
+                    if rng.random() < 0.4 and key in expected:
+                        t.remove(key)
+                        del expected[key]
+                    else:
+                        t.add(key, step)
+                        expected[key] = step
+                    self.assertTrue(t.load() < self.max_load_factor)
+                self.assertEqual(len(expected), len(t))
+                self.assertEqual(set(expected), t.keys())
+                for key in range(0, 300 * 37, 37):
+                    if key in expected:
+                        self.assertEqual(expected[key], t.get(key))
+                    else:
+                        self.assertRaises(KeyError, t.get, key)
+
+                bulk = Table.from_items(expected.items(), probing=probing)
+                self.assertEqual(probing, bulk.probing)
+                for key, value in expected.items():
+                    self.assertEqual(value, bulk.get(key))
+                bulk._resize()
+                stats = bulk.tombstone_stats()
+                self.assertEqual(len(expected), stats['live'])
+                self.assertTrue(stats['max_probe_length'] >= 1)
+                for key, value in expected.items():
+                    self.assertEqual(value, bulk.get(key))
+
+    def test_robin_hood_no_tombstones(self):
+        """Test that Robin Hood removal shifts entries back instead of leaving markers"""
+        t = Table(10, probing='robin_hood')
+        for letter in self.letters:
+            t.add(letter, 0)
+        for letter in self.letters[:20]:
+            t.remove(letter)
+            self.assertEqual(0, t.tombstone_stats()['tombstones'])
+        self.assertEqual(set(self.letters[20:]), t.keys())
+        self.assertEqual(len(self.letters) - 20, t.tombstone_stats()['live'])
+
+    def test_probing_invalid(self):
+        """Test that an unknown probing strategy is rejected"""
+        self.assertRaises(ValueError, Table, 10, 'cuckoo')
+
+    def test_get_many(self):
+        """Test looking up many keys at once"""
+        for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(10, probing=probing)
+                for value, key in enumerate(self.letters):
+                    t.add(key, value)
+                for key in 'AEIOU':
+                    t.remove(key)
+                keys = list(self.letters) + ['a', ('tuple', 1)]
+
+                values, missing = t.get_many(keys, default=None, return_mask=True)
+                self.assertEqual(len(keys), len(values))
+                for key, value, absent in zip(keys, values, missing):
+                    if key in t.keys():
+                        self.assertFalse(absent)
+                        self.assertEqual(t.get(key), value)
+                    else:
+                        self.assertTrue(absent)
+                        self.assertIsNone(value)
+
+                self.assertEqual([1, 25], list(t.get_many(['B', 'Z'])))
+                self.assertEqual([(0, 0), 2], list(t.get_many(['A', 'C'], default=(0, 0))))
+                self.assertRaises(KeyError, t.get_many, ['B', 'A'])
+                self.assertEqual([not absent for absent in missing], list(t.contains_many(keys)))
+                self.assertEqual(0, len(t.get_many([])))
+
+    def test_many_nan_keys(self):
+        """Test that the batch paths find a key unequal to itself by identity, as get() does"""
+        nan = float('nan')
+        for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(10, probing=probing)
+                t.update([(nan, 1), ('A', 2), (nan, 3)])
+                self.assertEqual(2, len(t))
+                self.assertEqual(3, t.get(nan))
+                self.assertEqual([3, 2], list(t.get_many([nan, 'A'])))
+                self.assertEqual([True, False], list(t.contains_many([nan, float('nan')])))
+
+    def test_stats(self):
+        """Test the operation counters of stats mode"""
+        for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(1, probing=probing, stats=True)
+                for value, key in enumerate(self.letters):
+                    t.add(key, value)
+                for key in self.letters:
+                    t.get(key)
+                self.assertRaises(KeyError, t.get, 'missing')
+                t.remove('A')
+
+                stats = t.stats()
+                self.assertEqual(len(self.letters), stats['add']['calls'])
+                self.assertEqual(len(self.letters) + 1, stats['get']['calls'])
+                self.assertEqual(1, stats['remove']['calls'])
+                self.assertTrue(stats['resizes'] > 0)
+                self.assertTrue(stats['resize_seconds'] >= 0)
+                self.assertEqual(stats['add']['calls'], sum(stats['add']['histogram'].values()))
+                self.assertTrue(stats['get']['max_probes'] >= 1)
+                self.assertEqual(len(self.letters) - 1, stats['live'])
+
+                hits = Table.from_items(((key, 0) for key in self.letters), probing=probing, stats=True)
+                for key in self.letters:
+                    hits.get(key)
+                stats = hits.stats()
+                self.assertAlmostEqual(stats['mean_probe_length'], stats['get']['mean_probes'])
+                self.assertEqual(stats['max_probe_length'], stats['get']['max_probes'])
+
+    def test_stats_disabled(self):
+        """Test that a table without stats mode still reports its shape"""
+        t = Table(10)
+        for letter in self.letters:
+            t.add(letter, 0)
+        stats = t.stats()
+        self.assertNotIn('add', stats)
+        self.assertEqual(len(self.letters), stats['live'])
+        self.assertEqual(len(self.letters) + stats['tombstones'],
+                         sum(length * clusters for length, clusters in stats['clusters'].items()))
+
+    def test_show_entries_summary(self):
+        """Test that large tables are summarized by cluster length"""
+        import io
+        import contextlib
+        t = Table(1000)
+        for i in range(500):
+            t.add(i * 31, i)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            t._show_entries()
+        self.assertIn('Clusters of length', out.getvalue())
+        self.assertTrue(len(out.getvalue().splitlines()) < 100)
+
+    def test_iteration(self):
+        """Test iterating over keys, values and items"""
+        for probing in ('linear', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(10, probing=probing)
+                self.assertEqual([], list(t))
+                for value, key in enumerate(self.letters):
+                    t.add(key, value)
+                for key in 'AEIOU':
+                    t.remove(key)
+                expected = {key: value for value, key in enumerate(self.letters) if key not in 'AEIOU'}
+
+                self.assertEqual(sorted(expected), sorted(t))
+                self.assertEqual(sorted(expected.values()), sorted(t.values()))
+                self.assertEqual(sorted(expected.items()), sorted(t.items()))
+                self.assertEqual(t.keys(), set(t))
+                self.assertIn('B', t)
+                self.assertNotIn('A', t)
+                self.assertNotIn(('A',), t)
+
+    def test_iteration_large(self):
+        """Test iteration over a table spanning several chunks of slots"""
+        t = Table.from_items((i, -i) for i in range(20000))
+        self.assertEqual(list(range(20000)), sorted(t))
+        self.assertEqual(sum(range(20000)), -sum(t.values()))
+
+    def test_iteration_mutation(self):
+        """Test that changing the table during iteration is detected"""
+        t = Table(10)
+        for letter in self.letters:
+            t.add(letter, 0)
+        with self.assertRaises(RuntimeError):
+            for key in t:
+                t.remove(key)
+        with self.assertRaises(RuntimeError):
+            for key, value in t.items():
+                t.add(key + key, value)
+
+        for key, value in t.items():  # updating a value is allowed
+            t.add(key, value + 1)
+        self.assertEqual(len(t), len(list(t.values())))
+
+    def test_next_prime(self):
+        """Test that table sizes are primes just above the size asked for"""
+        t = Table()
+        for n in list(range(0, 2000)) + [10 ** 6 + 1, 3 * 10 ** 7, 10 ** 10]:
+            prime = t._next_prime(n)
+            self.assertTrue(prime >= n)
+            self.assertTrue(prime <= n * 1.05 + 40)  # allow for the gap to the next prime
+            if prime < 10 ** 8:
+                self.assertTrue(t.isprime(prime))
+        self.assertEqual(t._next_prime(3 * 10 ** 7), t._next_prime(3 * 10 ** 7))
+        self.assertFalse(t._next_prime(10 ** 10) % 2 == 0)
+
+    def test_shrink(self):
+        """Test that the table shrinks after most entries are removed"""
+        for probing in ('linear', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(10, probing=probing)
+                initial = t.size
+                for i in range(10000):
+                    t.add(i, i)
+                peak = t.size
+                for i in range(9990):
+                    t.remove(i)
+                    self.assertTrue(t.load() < self.max_load_factor)
+                self.assertTrue(t.size < peak / 100)
+                self.assertEqual(set(range(9990, 10000)), t.keys())
+                for i in range(9990, 10000):
+                    self.assertEqual(i, t.get(i))
+                for i in range(9990, 10000):
+                    t.remove(i)
+                self.assertEqual(initial, t.size)  # never below the initial size
+
+    def test_shrink_hysteresis(self):
+        """Test that adding and removing around the low-water mark does not resize every time"""
+        t = Table(1, stats=True)
+        for i in range(1000):
+            t.add(i, i)
+        i = 999
+        while t.load() >= 1/6 + 1 / t.size:  # stop one entry above the low-water mark
+            t.remove(i)
+            i -= 1
+        resizes = t.stats()['resizes']
+        for _ in range(100):
+            t.remove(0)
+            t.add(0, 0)
+        self.assertEqual(resizes + 1, t.stats()['resizes'])
+
+    def test_shrink_disabled(self):
+        """Test that shrinking can be turned off and is validated"""
+        t = Table(1, shrink_below=0)
+        for i in range(1000):
+            t.add(i, i)
+        size = t.size
+        for i in range(1000):
+            t.remove(i)
+        self.assertEqual(size, t.size)
+        self.assertRaises(ValueError, Table, 10, shrink_below=0.5)
+
+    def test_compact(self):
+        """Test reallocating to the smallest size that fits"""
+        t = Table(1000)
+        for letter in self.letters:
+            t.add(letter, 0)
+        t.remove('A')
+        t.compact()
+        self.assertTrue(t.size < 1000)
+        self.assertTrue(t.load() < self.max_load_factor)
+        self.assertEqual(0, t.tombstone_stats()['tombstones'])
+        self.assertEqual(set(self.letters[1:]), t.keys())
+        t.add('A', 1)
+        self.assertEqual(len(self.letters), len(t))
+
+    def test_snapshot(self):
+        """Test saving a table and opening it again, mapped and in memory"""
+        import os
+        import tempfile
+        pairs = [(f'K{i}', i) for i in range(500)] + [(i, f'V{i}') for i in range(500)]
+        pairs += [(b'raw', None), ('', b'\x00\xff'), (-2 ** 70, 'big')]
+        for probing in ('linear', 'double', 'robin_hood'):
+            for mmap in (True, False):
+                with self.subTest(probing=probing, mmap=mmap), tempfile.TemporaryDirectory() as tmp:
+                    path = os.path.join(tmp, 'table.snap')
+                    t = Table.from_items(pairs, probing=probing)
+                    t.remove('K0')
+                    t.save(path)
+
+                    loaded = Table.open(path, mmap=mmap)
+                    self.assertEqual(len(t), len(loaded))
+                    self.assertEqual(probing, loaded.probing)
+                    self.assertEqual(t.keys(), loaded.keys())
+                    for key, value in pairs[1:]:
+                        self.assertEqual(value, loaded.get(key))
+                    self.assertRaises(KeyError, loaded.get, 'K0')
+                    self.assertNotIn(('not', 'stored'), loaded)
+                    self.assertEqual(['V1', 1], list(loaded.get_many([1, 'K1'])))
+                    self.assertEqual(sorted(t.items(), key=repr), sorted(loaded.items(), key=repr))
+
+                    loaded.add('K0', 'back')  # copies a mapped table into memory
+                    loaded.remove('K1')
+                    self.assertEqual('back', loaded.get('K0'))
+                    self.assertEqual(len(t), len(loaded))
+                    self.assertRaises(KeyError, Table.open(path, mmap=mmap).get, 'K0')
+
+    def test_snapshot_across_processes(self):
+        """Test that a snapshot of str keys can be read by a process with a different hash() salt"""
+        import os
+        import subprocess
+        import sys
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table.snap')
+            Table.from_items((f'G{i}E7C2', i) for i in range(100)).save(path)
+            script = ('import sys; from table import Table; t = Table.open(sys.argv[1]); '
+                      'print(sum(t.get(f"G{i}E7C2") for i in range(100)))')
+            env = dict(os.environ, PYTHONHASHSEED='12345')
+            out = subprocess.run([sys.executable, '-c', script, path], env=env, capture_output=True,
+                                 text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            self.assertEqual(str(sum(range(100))), out.stdout.strip())
+
+    def test_snapshot_errors(self):
+        """Test that unsupported snapshot contents and files are rejected"""
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table.snap')
+            t = Table()
+            t.add((1, 2), 'tuple key')
+            self.assertRaises(TypeError, t.save, path)
+            with open(path, 'wb') as file:
+                file.write(b'not a snapshot' * 10)
+            self.assertRaises(ValueError, Table.open, path)
+
+            Table.from_items((f'K{i}', i) for i in range(100)).save(path)
+            with open(path, 'rb') as file:
+                data = file.read()
+            for cut in (len(data) - 1, len(data) - 200, 100):
+                with open(path, 'wb') as file:
+                    file.write(data[:cut])
+                for mmap in (True, False):
+                    with self.assertRaisesRegex(ValueError, 'truncated'):
+                        Table.open(path, mmap=mmap)
+            with open(path, 'wb') as file:
+                file.write(data + b'\0')
+            self.assertRaises(ValueError, Table.open, path)
+
+    def test_incremental(self):
+        """Test that an incremental resize moves entries over later operations and loses nothing"""
+        for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(10, probing=probing, incremental=True)
+                expected = {}
+                migrating = 0
+                for i in range(2000):
+                    t.add(i, i)
+                    expected[i] = i
+                    if t._old is not None:
+                        migrating += 1
+                        # Update, remove and look up keys wherever they are
+                        t.add(i // 2, -i)
+                        expected[i // 2] = -i
+                        if i % 3 == 0 and i - 1 in expected:
+                            t.remove(i - 1)
+                            del expected[i - 1]
+                    self.assertLess(t.load(), self.max_load_factor)
+                self.assertGreater(migrating, 0)
+                self.assertEqual(len(expected), len(t))
+                for key, value in expected.items():
+                    self.assertEqual(value, t.get(key))
+                self.assertNotIn(2000, t)
+                self.assertEqual(set(expected), t.keys())
+                self.assertIsNone(t._old)
+
+    def test_incremental_restart(self):
+        """Test that a resize starting during another moves only the entries moved so far, and stats change nothing"""
+        for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+            with self.subTest(probing=probing):
+                t = Table(10, probing=probing, incremental=True, stats=True)
+                i = 0
+                while t._old is None or t._migrated < t._old.size // 4:
+                    t.add(i, i)
+                    i += 1
+                t.remove(0)
+                old, migrated, version = t._old, t._migrated, t._version
+                stats = t.stats()
+                self.assertIs(old, t._old)
+                self.assertEqual((migrated, version), (t._migrated, t._version))
+                self.assertEqual(i - 1, stats['live'])
+                # Both sets of arrays are measured
+                self.assertEqual(int((t._slots.states != 0).sum() + (old.states != 0).sum()),
+                                 sum(length * n for length, n in stats['clusters'].items()))
+                self.assertEqual(int((t._slots.states == 2).sum() + (old.states[migrated:] == 2).sum()),
+                                 stats['tombstones'])
+
+                t._rebuild = None  # A full rebuild would fail
+                t._regrow()
+                self.assertIs(old, t._old)
+                self.assertEqual(migrated, t._migrated)
+                self.assertEqual(int((old.states[migrated:] == 2).sum()), t.tombstone_stats()['tombstones'])
+                del t._rebuild
+                for key in range(1, i):
+                    self.assertEqual(key, t.get(key))
+                for key in range(i, i + 200):
+                    t.add(key, key)
+                self.assertEqual(set(range(1, i + 200)), t.keys())
+                self.assertEqual(i + 199, len(t))
+
+    def test_incremental_bounded(self):
+        """Test that no add moves more than a few entries while the table grows"""
+        t = Table(1, incremental=True)
+        for i in range(20000):
+            before = t._migrated if t._old is not None else 0
+            t.add(i, i)
+            if t._old is not None and t._migrated >= before:
+                self.assertLessEqual(t._migrated - before, _MIGRATE_STEP)
+        self.assertEqual(20000, len(t))
+        self.assertEqual(list(range(20000)), sorted(t.keys()))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
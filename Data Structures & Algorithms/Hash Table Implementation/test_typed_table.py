@@ -0,0 +1,124 @@
+import random
+import unittest
+import numpy as np
+from typed_table import *
+from typed_table import _mix, _mix_word
+
+
+# Run from terminal: python -m unittest test_typed_table.py
+class TypedTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.max_load_factor = 2/3
+
+    def test_hash(self):
+        """Test that the vectorized and scalar hashes agree"""
+        words = np.array([0, 1, -1, 2**63 - 1, -2**63, 123456789], dtype=np.int64)
+        self.assertEqual([_mix_word(int(w)) for w in words], _mix(words).tolist())
+        self.assertTrue((_mix(words) >= 0).all())
+
+    def test_int_table(self):
+        """Test add, get, remove and keys against a dict under random operations"""
+        t = IntTable(1)
+        expected = {}
+        rng = random.Random(7)
+        for i in range(5000):
+            key = rng.randrange(-2**63, 2**63) if i % 10 == 0 else rng.randrange(-500, 500)
+            if rng.random() < 0.7:
+                t.add(key, i)
+                expected[key] = i
+            elif key in expected:
+                t.remove(key)
+                del expected[key]
+            else:
+                self.assertRaises(KeyError, t.remove, key)
+            self.assertLess(t.load(), self.max_load_factor)
+        self.assertEqual(len(expected), len(t))
+        self.assertEqual(set(expected), t.keys())
+        for key, value in expected.items():
+            self.assertEqual(value, t.get(key))
+        self.assertRaises(KeyError, t.get, 10**6)
+        self.assertRaises(TypeError, t.add, 'a', 1)
+        self.assertRaises(OverflowError, t.add, 2**63, 1)
+
+    def test_add_many(self):
+        """Test that batch inserts update existing keys, place new ones and let the last duplicate win"""
+        t = IntTable(10)
+        t.add(5, 'old')
+        t.add_many(np.arange(10), [f'v{i}' for i in range(10)])
+        t.add_many([3, 20, 3], ['a', 'b', 'c'])
+        self.assertEqual(11, len(t))
+        self.assertEqual('v5', t.get(5))
+        self.assertEqual('c', t.get(3))
+        self.assertEqual('b', t.get(20))
+        for i in range(8):
+            t.remove(i)
+        t.add_many(range(100, 110), range(10))  # Placed into slots with deleted markers
+        self.assertEqual(13, len(t))
+        self.assertEqual({8, 9, 20} | set(range(100, 110)), t.keys())
+        self.assertRaises(ValueError, t.add_many, [1, 2], [1])
+
+    def test_get_many(self):
+        """Test batch lookups with and without defaults"""
+        t = IntTable.from_items({i: i * i for i in range(1000)}, value_dtype=np.int64)
+        keys = np.arange(-5, 1005)
+        values, missing = t.get_many(keys, default=-1, return_mask=True)
+        self.assertEqual(np.int64, values.dtype)
+        self.assertEqual([-1] * 5 + [i * i for i in range(1000)] + [-1] * 5, values.tolist())
+        self.assertEqual(((keys < 0) | (keys >= 1000)).tolist(), missing.tolist())
+        self.assertEqual(missing.tolist(), (~t.contains_many(keys)).tolist())
+        self.assertRaises(KeyError, t.get_many, [1, 2000])
+        self.assertRaises(TypeError, t.get_many, [1, 2000], default=None)
+        self.assertEqual(81, t.get(9))
+        floats = IntTable.from_items({1: 0.5}, value_dtype=np.float64)
+        self.assertTrue(np.isnan(floats.get_many([1, 2], default=None)[1]))
+
+    def test_batch_checks(self):
+        """Test that batch inserts reject the keys that add() rejects, with the same errors"""
+        t = IntTable()
+        for key in (2**70, 2**63, -2**63 - 1):
+            self.assertRaises(OverflowError, t.add_many, [1, key], [0, 0])
+        self.assertRaises(OverflowError, t.add_many, np.array([2**63], dtype=np.uint64), [0])
+        self.assertRaises(TypeError, t.add_many, [1, 2.5], [0, 0])
+        self.assertRaises(TypeError, t.add_many, ['1'], [0])
+        t.add_many(np.array([2**63 - 1, 1], dtype=object), [0, 1])
+        self.assertEqual({2**63 - 1, 1}, t.keys())
+
+        s = FixedStrTable()
+        for keys in (['ab\0', 'ab'], ['a\0b'], np.array(['a\0b'])):
+            self.assertRaises(ValueError, s.add_many, keys, [0] * len(keys))
+        self.assertRaises(ValueError, s.add_many, ['caf\xe9'], [0])
+        self.assertRaises(TypeError, s.add_many, ['a', 1], [0, 0])
+        self.assertRaises(TypeError, s.add_many, [b'bytes'], [0])
+        self.assertEqual(0, len(s))
+
+    def test_fixed_str_table(self):
+        """Test string keys, including postal codes and keys of every allowed length"""
+        t = FixedStrTable()
+        codes = ['G1E7C2', 'M5V3L9', 'H2X1Y4', 'a', '', '12345678']
+        for i, code in enumerate(codes):
+            t.add(code, i)
+        self.assertEqual(set(codes), t.keys())
+        self.assertEqual(1, t.get('M5V3L9'))
+        self.assertEqual(4, t.get(''))
+        self.assertIn('12345678', t)
+        self.assertNotIn('G1E7C', t)
+        t.remove('G1E7C2')
+        self.assertRaises(KeyError, t.get, 'G1E7C2')
+        self.assertEqual([1, None], t.get_many(['M5V3L9', 'G1E7C2'], default=None).tolist())
+        self.assertRaises(ValueError, t.add, '123456789', 0)
+        self.assertRaises(ValueError, t.add, 'a\0b', 0)
+        self.assertRaises(ValueError, t.add, 'caf\xe9', 0)
+        self.assertRaises(TypeError, t.add, b'bytes', 0)
+        self.assertRaises(ValueError, t.add_many, ['123456789'], [0])
+
+    def test_fixed_str_bulk(self):
+        """Test a large batch insert and lookup of string keys"""
+        keys = [f'K{i:07d}' for i in range(50000)]
+        t = FixedStrTable.from_items(zip(keys, range(50000)))
+        self.assertEqual(50000, len(t))
+        self.assertLess(t.load(), self.max_load_factor)
+        self.assertEqual(list(range(50000)), t.get_many(keys).tolist())
+        self.assertEqual(49999, t.get('K0049999'))
+
+if __name__ == '__main__':
+    unittest.main()
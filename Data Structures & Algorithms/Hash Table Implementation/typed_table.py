@@ -0,0 +1,634 @@
+"""
+typed_table.py
+Author: Dele Osuma
+
+Hash tables for int64 keys and short ASCII string keys, stored in typed NumPy arrays.
+"""
+
+import operator
+import sys
+from itertools import repeat
+import numpy as np
+from table import _DELETED, _EMPTY, _LIVE, _MISSING, _ladder_prime, _objects, _pack_linear
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(words):
+    """
+    Hashes 64-bit key words with the splitmix64 finalizer, which spreads every input
+    bit over the whole output, so consecutive IDs do not land in consecutive slots.
+
+    Parameters:
+        words (np.ndarray): The int64 key words.
+
+    Returns:
+        np.ndarray: A non-negative int64 hash of every word.
+    """
+    z = words.astype(np.uint64)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(1)).astype(np.int64)
+
+
+def _mix_word(word):
+    """
+    Hashes one key word exactly as _mix() does.
+
+    Parameters:
+        word (int): The key word.
+
+    Returns:
+        int: The non-negative hash.
+    """
+    z = word & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return (z ^ (z >> 31)) >> 1
+
+
+class _TypedTable:
+    """
+    A linear probing hash table whose keys each fit in one 64-bit word, held in a typed
+    array. Keys are hashed from their word whenever needed instead of being cached, and
+    compared as words, so a slot costs one state byte, the key word and the value.
+    Batch inserts and lookups run as NumPy operations, probing for all keys at once.
+
+    Subclasses set _KEY_DTYPE and convert keys to and from words.
+
+    Author: Dele Osuma
+    """
+
+    _KEY_DTYPE = None
+
+    def __init__(self, capacity=100, value_dtype=object):
+        """
+        Initializes the table.
+
+        Parameters:
+            capacity (int): The expected number of entries. The actual table size will be the next
+                            prime number at least 1.5 times this capacity.
+            value_dtype: The NumPy dtype of the values. The default holds any object; a
+                         numeric dtype stores values inline and saves their boxes too.
+        """
+        self.capacity = capacity
+        self.value_dtype = np.dtype(value_dtype)
+        self._min_size = _ladder_prime(int(1.5 * capacity))
+        self._allocate(self._min_size)
+        self.count = 0
+        self._tombstones = 0
+
+    @classmethod
+    def from_items(cls, items, **kwargs):
+        """
+        Builds a table from (key, value) pairs in one pass.
+
+        Parameters:
+            items: A mapping or an iterable of (key, value) pairs. Later pairs win
+                   over earlier pairs with the same key.
+            **kwargs: Passed on to the constructor, e.g. value_dtype.
+
+        Returns:
+            A table of the calling class.
+        """
+        table = cls(0, **kwargs)
+        table.update(items)
+        return table
+
+    @property
+    def size(self):
+        """The number of slots in the table."""
+        return len(self._states)
+
+    def _allocate(self, size):
+        """
+        Replaces the slot arrays with size empty slots.
+
+        Parameters:
+            size (int): The number of slots.
+        """
+        self._states = np.zeros(size, dtype=np.uint8)
+        self._keys = np.zeros(size, dtype=self._KEY_DTYPE)
+        self._words = self._keys.view(np.int64)
+        if self.value_dtype == object:
+            self._values = np.full(size, None, dtype=object)
+        else:
+            self._values = np.zeros(size, dtype=self.value_dtype)
+        # Scalar reads through a memoryview return plain ints.
+        self._state_view = memoryview(self._states)
+        self._word_view = memoryview(self._words)
+
+    def _encode(self, key):
+        """Converts a key to its int word. Implemented by subclasses."""
+        raise NotImplementedError
+
+    def _encode_many(self, keys):
+        """Converts a batch of keys to an int64 array of words. Implemented by subclasses."""
+        raise NotImplementedError
+
+    def _decode(self, keys):
+        """Converts an array of stored keys to a list of keys. Implemented by subclasses."""
+        raise NotImplementedError
+
+    def _find(self, word):
+        """
+        Finds the slot holding a key word.
+
+        Parameters:
+            word (int): The key word.
+
+        Returns:
+            int: The slot index, or -1 if the key is not in the table.
+        """
+        states, words = self._state_view, self._word_view
+        size = len(states)
+        idx = _mix_word(word) % size
+        while True:
+            state = states[idx]
+            if state == _EMPTY:
+                return -1
+            if state == _LIVE and words[idx] == word:
+                return idx
+            idx = (idx + 1) % size
+
+    def _find_many(self, words):
+        """
+        Finds the slots of many key words, all probing one step per round.
+
+        Parameters:
+            words (np.ndarray): The key words.
+
+        Returns:
+            np.ndarray: The slot of every word, or -1 where the key is not in the table.
+        """
+        size = self.size
+        idx = _mix(words) % size
+        found = np.full(len(words), -1, dtype=np.int64)
+        pending = np.arange(len(words))
+        while len(pending):
+            states = self._states[idx]
+            match = (states == _LIVE) & (self._words[idx] == words[pending])
+            found[pending[match]] = idx[match]
+            going = ~match & (states != _EMPTY)
+            pending = pending[going]
+            idx = (idx[going] + 1) % size
+        return found
+
+    def add(self, key, value):
+        """
+        Adds a key-value pair to the table. If the key already exists, updates its value.
+        If the load factor reaches 2/3 or above, resizes the table.
+
+        Parameters:
+            key: The key to add.
+            value: The value associated with the key.
+        """
+        word = self._encode(key)
+        states, words = self._state_view, self._word_view
+        size = len(states)
+        idx = _mix_word(word) % size
+        first_deleted_index = None
+        while True:
+            state = states[idx]
+            if state == _EMPTY:
+                break
+            if state == _DELETED:
+                if first_deleted_index is None:
+                    first_deleted_index = idx
+            elif words[idx] == word:
+                self._values[idx] = value
+                return
+            idx = (idx + 1) % size
+
+        if first_deleted_index is not None:
+            idx = first_deleted_index
+            self._tombstones -= 1
+        self._values[idx] = value
+        states[idx] = _LIVE
+        words[idx] = word
+        self.count += 1
+        self._grow_or_compact()
+
+    def add_many(self, keys, values):
+        """
+        Adds many key-value pairs at once. Keys already in the table have their values
+        updated; the new ones are placed together, or the table is rebuilt once with
+        room for them.
+
+        Parameters:
+            keys: A sequence or array of keys. Later keys win over earlier equal ones.
+            values: A sequence or array of values, aligned with keys.
+
+        Raises:
+            ValueError: If keys and values differ in length.
+        """
+        words = self._encode_many(keys)
+        n = len(words)
+        if len(values) != n:
+            raise ValueError(f"Got {n} keys but {len(values)} values")
+        if self.value_dtype == object:
+            values = _objects(values, n)
+        else:
+            values = np.asarray(values, dtype=self.value_dtype)
+        if not n:
+            return
+
+        last, first = np.unique(words[::-1], return_index=True)
+        if len(last) < n:
+            keep = n - 1 - first
+            words, values = words[keep], values[keep]
+        found = self._find_many(words)
+        hit = found >= 0
+        self._values[found[hit]] = values[hit]
+        if hit.all():
+            return
+
+        words, values = words[~hit], values[~hit]
+        needed = self.count + len(words)
+        if (needed + self._tombstones) / self.size >= 2/3:
+            self._rebuild(max(self.size, _ladder_prime(int(1.5 * needed) + 1)), words, values)
+        else:
+            self._place_many(words, values)
+
+    def _place_many(self, words, values):
+        """
+        Places keys that are not in the table yet, without resizing. Every round, each
+        unplaced key tries its next slot; where several want the same free slot the
+        first gets it and the others move on.
+
+        Parameters:
+            words (np.ndarray): The new key words.
+            values (np.ndarray): Their values.
+        """
+        size = self.size
+        idx = _mix(words) % size
+        pending = np.arange(len(words))
+        while len(pending):
+            free = np.flatnonzero(self._states[idx] != _LIVE)
+            claimed, first = np.unique(idx[free], return_index=True)
+            placed = pending[free[first]]
+            self._tombstones -= int(np.count_nonzero(self._states[claimed] == _DELETED))
+            self._states[claimed] = _LIVE
+            self._words[claimed] = words[placed]
+            self._values[claimed] = values[placed]
+
+            rest = np.ones(len(pending), dtype=bool)
+            rest[free[first]] = False
+            pending = pending[rest]
+            idx = (idx[rest] + 1) % size
+        self.count += len(words)
+
+    def update(self, items):
+        """
+        Adds many key-value pairs at once.
+
+        Parameters:
+            items: A mapping or an iterable of (key, value) pairs. Later pairs win
+                   over earlier pairs with the same key.
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        pairs = list(items)
+        self.add_many([pair[0] for pair in pairs], [pair[1] for pair in pairs])
+
+    def get(self, key):
+        """
+        Retrieves the value associated with the given key.
+
+        Parameters:
+            key: The key to search for.
+
+        Returns:
+            The value associated with the key.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        idx = self._find(self._encode(key))
+        if idx < 0:
+            raise KeyError(key)
+        return self._values.item(idx)
+
+    def get_many(self, keys, default=_MISSING, return_mask=False):
+        """
+        Retrieves the values of many keys at once.
+
+        Parameters:
+            keys: A sequence or array of keys to search for.
+            default: The value given for keys that are not found. If omitted, a missing
+                     key raises KeyError. With a numeric value dtype it must be castable
+                     to that dtype, e.g. -1 or, for floats, None (NaN); to tell missing
+                     keys apart otherwise, use return_mask.
+            return_mask (bool): If True, also return which keys were not found.
+
+        Returns:
+            np.ndarray: The values, aligned with keys, with the table's value dtype.
+            np.ndarray: Only with return_mask; a boolean array, True where the key was not found.
+
+        Raises:
+            KeyError: If a key is not found and no default was given.
+            TypeError: If default cannot be cast to the value dtype.
+        """
+        if default is not _MISSING and self.value_dtype != object:
+            try:
+                default = np.asarray(default, dtype=self.value_dtype)
+            except (TypeError, ValueError, OverflowError):
+                raise TypeError(f"default {default!r} cannot be stored as {self.value_dtype}") from None
+        found = self._find_many(self._encode_many(keys))
+        missing = found < 0
+        n_missing = int(np.count_nonzero(missing))
+        if n_missing and default is _MISSING:
+            raise KeyError(keys[int(np.argmax(missing))])
+
+        result = np.empty(len(found), dtype=self.value_dtype)
+        result[~missing] = self._values[found[~missing]]
+        if n_missing:
+            if self.value_dtype == object:
+                result[missing] = _objects(repeat(default, n_missing), n_missing)
+            else:
+                result[missing] = default
+        if return_mask:
+            return result, missing
+        return result
+
+    def contains_many(self, keys):
+        """
+        Checks which of many keys are in the table.
+
+        Parameters:
+            keys: A sequence or array of keys to search for.
+
+        Returns:
+            np.ndarray: A boolean array, True where the key is in the table.
+        """
+        return self._find_many(self._encode_many(keys)) >= 0
+
+    def remove(self, key):
+        """
+        Removes the key (and its associated value) from the table. If the load factor
+        falls below 1/6, shrinks the table, but not below its initial size.
+
+        Parameters:
+            key: The key to remove.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        idx = self._find(self._encode(key))
+        if idx < 0:
+            raise KeyError(key)
+        self._states[idx] = _DELETED
+        if self.value_dtype == object:
+            self._values[idx] = None
+        self.count -= 1
+        self._tombstones += 1
+        if self.load() < 1/6 and self.size > self._min_size:
+            self._rebuild(max(self._min_size, _ladder_prime(3 * self.count)))
+
+    def _grow_or_compact(self):
+        """
+        Resizes the table after an insert if the load factor has reached 2/3, or clears the
+        deleted markers if they and the entries together fill 2/3 of it.
+        """
+        if self.load() >= 2/3:
+            self._rebuild(_ladder_prime(self.size * 2))
+        elif (self.count + self._tombstones) / self.size >= 2/3:
+            self._rebuild(self.size if self.load() < 1/2 else _ladder_prime(self.size * 2))
+
+    def _rebuild(self, size, words=None, values=None):
+        """
+        Moves the live entries, and any new ones, into fresh slot arrays in one pass.
+
+        Parameters:
+            size (int): The new table size.
+            words (np.ndarray): Key words of new entries, not in the table yet.
+            values (np.ndarray): Their values.
+        """
+        live = np.flatnonzero(self._states == _LIVE)
+        all_words, all_values = self._words[live], self._values[live]
+        if words is not None:
+            all_words = np.concatenate((all_words, words))
+            all_values = np.concatenate((all_values, values))
+        idx = _pack_linear(_mix(all_words) % size, size)
+        self._allocate(size)
+        self._states[idx] = _LIVE
+        self._words[idx] = all_words
+        self._values[idx] = all_values
+        self.count = len(all_words)
+        self._tombstones = 0
+
+    def keys(self):
+        """
+        Returns a set of all keys in the table.
+
+        Returns:
+            set: A set containing all the keys.
+        """
+        return set(self._decode(self._keys[self._states == _LIVE]))
+
+    def __contains__(self, key):
+        """
+        Checks whether a key is in the table.
+
+        Parameters:
+            key: The key to search for.
+
+        Returns:
+            bool: True if the key is in the table, False otherwise.
+        """
+        return self._find(self._encode(key)) >= 0
+
+    def __len__(self):
+        """
+        Returns the number of key-value pairs in the table.
+
+        Returns:
+            int: The number of entries.
+        """
+        return self.count
+
+    def __str__(self):
+        """
+        Returns a string representation of all key-value pairs in the table.
+        Format: {<key: value>, <key: value>, ...}
+
+        Returns:
+            str: String representation of the table.
+        """
+        live = self._states == _LIVE
+        pairs = zip(self._decode(self._keys[live]), self._values[live].tolist())
+        return "{" + ", ".join(f"<{k}: {v}>" for k, v in pairs) + "}"
+
+    def load(self):
+        """
+        Calculates the load factor of the table.
+
+        Returns:
+            float: The load factor (number of entries / table size).
+        """
+        return self.count / self.size
+
+    def nbytes(self):
+        """
+        Returns the bytes held by the slot arrays; with object values, not counting the
+        value objects themselves.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return self._states.nbytes + self._keys.nbytes + self._values.nbytes
+
+
+class IntTable(_TypedTable):
+    """
+    A hash table with int64 keys, such as IDs, kept in an int64 array.
+
+    Author: Dele Osuma
+    """
+
+    _KEY_DTYPE = np.int64
+
+    def _encode(self, key):
+        """
+        Converts a key to its int word.
+
+        Parameters:
+            key (int): The key.
+
+        Returns:
+            int: The key itself.
+
+        Raises:
+            TypeError: If the key is not an integer.
+            OverflowError: If the key does not fit in 64 bits.
+        """
+        key = operator.index(key)
+        if not -(1 << 63) <= key < (1 << 63):
+            raise OverflowError(f"IntTable keys must fit in int64, not {key}")
+        return key
+
+    def _encode_many(self, keys):
+        """
+        Converts a batch of keys to an int64 array. A batch that NumPy cannot hold as
+        integers, e.g. because a key is beyond 64 bits, is checked key by key as add()
+        checks one key.
+
+        Parameters:
+            keys: A sequence or array of integers.
+
+        Returns:
+            np.ndarray: The keys as int64.
+
+        Raises:
+            TypeError: If the keys are not integers.
+            OverflowError: If a key does not fit in 64 bits.
+        """
+        array = np.asarray(keys)
+        if not array.size:
+            return np.empty(0, dtype=np.int64)
+        if array.dtype.kind not in "biu":
+            # NumPy holds such keys as objects or floats, so check the original ones
+            items = array.ravel() if isinstance(keys, np.ndarray) else keys
+            return np.fromiter(map(self._encode, items), dtype=np.int64, count=array.size)
+        if array.dtype == np.uint64 and array.max() >= 1 << 63:
+            raise OverflowError("IntTable keys must fit in int64")
+        return array.astype(np.int64, copy=False)
+
+    def _decode(self, keys):
+        """
+        Converts an array of stored keys to a list of keys.
+
+        Parameters:
+            keys (np.ndarray): int64 keys.
+
+        Returns:
+            list: The keys as ints.
+        """
+        return keys.tolist()
+
+
+class FixedStrTable(_TypedTable):
+    """
+    A hash table with ASCII string keys of at most 8 characters, such as postal codes,
+    kept in an S8 array. Keys must not contain NUL characters.
+
+    Author: Dele Osuma
+    """
+
+    _KEY_DTYPE = "S8"
+
+    def _encode(self, key):
+        """
+        Converts a key to its int word: its bytes, zero-padded to 8, read as an int64.
+
+        Parameters:
+            key (str): The key.
+
+        Returns:
+            int: The key word.
+
+        Raises:
+            TypeError: If the key is not a str.
+            ValueError: If the key is not ASCII, is longer than 8 characters or contains NUL.
+        """
+        if not isinstance(key, str):
+            raise TypeError(f"FixedStrTable keys must be str, not {type(key).__name__}")
+        data = key.encode("ascii")
+        if len(data) > 8 or b"\0" in data:
+            raise ValueError(f"FixedStrTable keys must be at most 8 characters without NUL, not {key!r}")
+        return int.from_bytes(data.ljust(8, b"\0"), sys.byteorder, signed=True)
+
+    def _encode_many(self, keys):
+        """
+        Converts a batch of keys to an int64 array of key words, with the checks of
+        _encode().
+
+        Parameters:
+            keys: A sequence of str, or a str or S8 array.
+
+        Returns:
+            np.ndarray: The key words.
+
+        Raises:
+            TypeError: If the keys are not strings.
+            ValueError: If a key is not ASCII, is longer than 8 characters or contains NUL.
+        """
+        if not isinstance(keys, np.ndarray):
+            keys = list(keys)
+            # NumPy drops trailing NULs when it packs str, so look for them first;
+            # join() also rejects anything that is not a str.
+            try:
+                joined = "".join(keys)
+            except TypeError:
+                raise TypeError("FixedStrTable keys must be str") from None
+            if "\0" in joined:
+                raise ValueError("FixedStrTable keys must not contain NUL")
+        keys = np.asarray(keys)
+        if not keys.size:
+            return np.empty(0, dtype=np.int64)
+        if keys.dtype.kind not in "SU":
+            raise TypeError(f"FixedStrTable keys must be strings, not {keys.dtype}")
+        if keys.dtype.itemsize > (8 if keys.dtype.kind == "S" else 32):
+            longest = int(np.char.str_len(keys).max())
+            if longest > 8:
+                raise ValueError(f"FixedStrTable keys must be at most 8 characters, not {longest}")
+        words = np.ascontiguousarray(keys.astype("S8")).view(np.int64)
+        data = words.view(np.uint8).reshape(-1, 8)
+        if ((data[:, :-1] == 0) & (data[:, 1:] != 0)).any():
+            raise ValueError("FixedStrTable keys must not contain NUL")
+        return words
+
+    def _decode(self, keys):
+        """
+        Converts an array of stored keys to a list of keys.
+
+        Parameters:
+            keys (np.ndarray): S8 keys.
+
+        Returns:
+            list: The keys as str.
+        """
+        return keys.astype(np.str_).tolist()
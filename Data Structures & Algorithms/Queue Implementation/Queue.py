@@ -7,6 +7,14 @@ Tmplementing an array-based dynamic circular queue using numpy.
 
 import numpy as np
 
+# Below this many items, enqueue_many() adds them one by one, which is faster
+# than building an array to copy in.
+_SMALL_BATCH = 8
+
+# Python types that a numeric queue of each dtype kind stores unchanged, or
+# refuses with an error of NumPy's own; anything else is checked by _cast().
+_EXACT_TYPES = {"b": (bool,), "i": (int,), "u": (int,), "f": (int, float), "c": (int, float, complex)}
+
 class Empty(Exception):
     """Custom exception to indicate queue is empty."""
     pass
@@ -14,21 +22,45 @@ class Empty(Exception):
 class Queue:
     """
     Implements an array-based circular queue using numpy.
-    Expands dynamically when full.
+    Expands dynamically when full, and shrinks when mostly drained.
     """
 
-    def __init__(self, capacity=5):
+    def __init__(self, capacity=5, dtype=object, shrink_below=1/4):
         """
         Initializes a circular queue with a fixed capacity.
 
         Parameters:
         - capacity (int): The initial capacity of the queue (default: 5).
+        - dtype: The numpy dtype of the items (default: object, any item).
+          A numeric dtype such as np.int64 or np.float64 stores items
+          unboxed in a contiguous array, 8 bytes each, and dequeued items
+          come back as plain Python numbers. Items are only stored if the
+          dtype holds them unchanged: 2.9 or "7" is refused by an integer
+          queue, not truncated or parsed.
+        - shrink_below (float): When dequeues take the size below this
+          fraction of the capacity, the capacity is cut to twice the size,
+          but never below the initial capacity or a size passed to
+          reserve() (default: 1/4). Must be below 1/2, so that the queue
+          has to fill up again before the next resize; 0 disables
+          shrinking. A queue drained and refilled in large batches should
+          reserve() its peak size or pass 0, or every batch may resize it.
+
+        Raises:
+        - ValueError: If shrink_below is not in [0, 1/2).
         
         Post-condition:
         - Creates an empty queue with the given capacity.
         """
-        self._data = np.empty(capacity, dtype=object)
+        if not 0 <= shrink_below < 1/2:
+            raise ValueError(f"shrink_below must be at least 0 and below 1/2, not {shrink_below!r}")
+        self._data = np.empty(capacity, dtype=dtype)
+        self._typed = self._data.dtype != object
+        self._numeric = self._data.dtype.kind in _EXACT_TYPES
+        self._exact_types = _EXACT_TYPES.get(self._data.dtype.kind, ())
         self._capacity = capacity
+        self._initial_capacity = max(1, capacity)
+        self._min_capacity = self._initial_capacity  # Shrinking stops here
+        self._shrink_below = shrink_below
         self._size = 0
         self._front = 0
         self._rear = 0
@@ -39,17 +71,61 @@ class Queue:
 
         Parameters:
         - item (object): The item to be added to the queue.
+
+        Raises:
+        - ValueError: If a numeric queue's dtype cannot hold the item unchanged.
         
         Post-condition:
         - The item is added to the rear of the queue.
         - Queue resizes dynamically if full.
         """
+        if self._numeric and type(item) not in self._exact_types:
+            item = self._cast(item)
         if self._size == self._capacity:
             self._resize()
         self._data[self._rear] = item
         self._rear = (self._rear + 1) % self._capacity
         self._size += 1
 
+    def enqueue_many(self, items):
+        """
+        Adds many items to the queue at once. Resizes at most once.
+
+        Parameters:
+        - items (iterable): The items to be added, front first.
+
+        Raises:
+        - ValueError: If a numeric queue's dtype cannot hold every item
+          unchanged; then no item is added.
+
+        Post-condition:
+        - The items are added to the rear of the queue in order, copied
+          in at most two slices around the end of the array.
+        """
+        if not isinstance(items, np.ndarray):
+            items = list(items)
+            if len(items) < _SMALL_BATCH:
+                for item in items:
+                    self.enqueue(item)
+                return
+            if self._typed:
+                items = self._cast(items) if self._numeric else np.asarray(items, dtype=self._data.dtype)
+            else:
+                # fromiter keeps tuple items whole instead of making a 2-D array
+                items = np.fromiter(items, dtype=object, count=len(items))
+        elif self._numeric and items.dtype != self._data.dtype:
+            items = self._cast(items)
+        n = len(items)
+        if n == 0:
+            return
+        if self._size + n > self._capacity:
+            self._resize(max(self._capacity * 2, self._size + n))
+        first = min(n, self._capacity - self._rear)
+        self._data[self._rear:self._rear + first] = items[:first]
+        self._data[:n - first] = items[first:]
+        self._rear = (self._rear + n) % self._capacity
+        self._size += n
+
     def dequeue(self):
         """
         Removes and returns the front item of the queue.
@@ -63,15 +139,93 @@ class Queue:
         Post-condition:
         - The front item is removed from the queue.
         - The queue size is reduced.
+        - The queue shrinks if it has become sparse.
         """
         if self.is_empty():
             raise Empty("Queue is empty")
-        item = self._data[self._front]
-        self._data[self._front] = None  # Avoid memory retention issues
+        if self._typed:
+            item = self._data.item(self._front)
+        else:
+            item = self._data[self._front]
+            self._data[self._front] = None  # Avoid memory retention issues
         self._front = (self._front + 1) % self._capacity
         self._size -= 1
+        self._shrink_if_sparse()
         return item
 
+    def dequeue_many(self, n):
+        """
+        Removes and returns up to n items from the front of the queue.
+
+        Parameters:
+        - n (int): The most items to remove.
+
+        Raises:
+        - Empty: If the queue is empty.
+        - ValueError: If n is negative.
+
+        Returns:
+        - (np.ndarray): The removed items, front first; fewer than n if
+          the queue held fewer.
+
+        Post-condition:
+        - The items are removed from the queue, copied out in at most two
+          slices around the end of the array.
+        - The queue shrinks if it has become sparse.
+        """
+        if n < 0:
+            raise ValueError("n must not be negative")
+        if self.is_empty():
+            raise Empty("Queue is empty")
+        n = min(n, self._size)
+        first = min(n, self._capacity - self._front)
+        items = np.empty(n, dtype=self._data.dtype)
+        items[:first] = self._data[self._front:self._front + first]
+        items[first:] = self._data[:n - first]
+        if not self._typed:
+            self._data[self._front:self._front + first] = None  # Avoid memory retention issues
+            self._data[:n - first] = None
+        self._front = (self._front + n) % self._capacity
+        self._size -= n
+        self._shrink_if_sparse()
+        return items
+
+    def reserve(self, n):
+        """
+        Makes room for n more items, so that adding them does not resize,
+        and keeps that room: the queue no longer shrinks below it.
+
+        Parameters:
+        - n (int): The number of items about to be added.
+
+        Post-condition:
+        - The capacity is at least the current size plus n, and stays so
+          until shrink_to_fit() is called.
+        """
+        self._min_capacity = max(self._min_capacity, self._size + n)
+        if self._size + n > self._capacity:
+            self._resize(self._size + n)
+
+    def shrink_to_fit(self):
+        """
+        Gives back all unused capacity, including any kept by reserve().
+
+        Post-condition:
+        - The capacity equals the size (or 1 if the queue is empty).
+        - Later shrinks stop at the initial capacity again.
+        """
+        self._min_capacity = self._initial_capacity
+        self._resize(max(1, self._size))
+
+    def capacity(self):
+        """
+        Returns the number of items the queue can hold without resizing.
+
+        Returns:
+        - (int): The current capacity.
+        """
+        return self._capacity
+
     def peek(self):
         """
         Returns the front item without removing it.
@@ -84,8 +238,33 @@ class Queue:
         """
         if self.is_empty():
             raise Empty("Queue is empty")
+        if self._typed:
+            return self._data.item(self._front)
         return self._data[self._front]
 
+    def segments(self):
+        """
+        Returns the queue contents as views into the ring buffer, without
+        copying, for vectorized work over the items.
+
+        Returns:
+        - (tuple): Two numpy arrays, front part first; the second holds the
+          items that wrap around to the start of the buffer and is empty if
+          none do. Changing their elements changes the queued items, e.g.
+          `for part in q.segments(): part -= 1`.
+        """
+        first = min(self._size, self._capacity - self._front)
+        return self._data[self._front:self._front + first], self._data[:self._size - first]
+
+    def to_array(self):
+        """
+        Returns a copy of the queue contents.
+
+        Returns:
+        - (np.ndarray): The items from front to rear, with the queue's dtype.
+        """
+        return np.concatenate(self.segments())
+
     def is_empty(self):
         """
         Checks if the queue is empty.
@@ -111,26 +290,62 @@ class Queue:
         Returns:
         - (str): The queue elements from front to rear.
         """
-        items = []
-        for i in range(self._size):
-            items.append(self._data[(self._front + i) % self._capacity])
-        return f"Queue: {items}"
+        return f"Queue: {self.to_array().tolist()}"
 
-    def _resize(self):
+    def _cast(self, items):
+        """
+        Converts items to the queue's numeric dtype, refusing any conversion
+        that would change them, such as float to int or str to a number.
+
+        Parameters:
+        - items: An item or an array-like of items.
+
+        Raises:
+        - ValueError: If the dtype cannot hold every item unchanged.
+
+        Returns:
+        - (np.ndarray): The items with the queue's dtype.
         """
-        Doubles the capacity of the queue when full.
+        dtype = self._data.dtype
+        values = np.asarray(items)
+        if values.size == 0 or np.can_cast(values.dtype, dtype, "safe"):
+            return values.astype(dtype, copy=False)
+        if values.dtype.kind in "biu" and dtype.kind in "iu":
+            # Narrower integers, e.g. Python ints into int32: fine if in range
+            converted = values.astype(dtype)
+            if (converted == values).all():
+                return converted
+            raise ValueError(f"items out of range for a queue of {dtype}")
+        raise ValueError(f"cannot store {values.dtype} items in a queue of {dtype} without changing them")
+
+    def _shrink_if_sparse(self):
+        """
+        Cuts the capacity to twice the size if the size has fallen below the
+        shrink threshold, but not below the initial or reserved capacity.
+        """
+        if self._size < self._shrink_below * self._capacity and self._capacity > self._min_capacity:
+            self._resize(max(self._min_capacity, 2 * self._size))
+
+    def _resize(self, new_capacity=None):
+        """
+        Moves the elements to a new array, by default of double the capacity.
+
+        Parameters:
+        - new_capacity (int): The new capacity; at least the queue size.
 
         Post-condition:
-        - The queue capacity is doubled.
-        - The elements are copied to a new array in order.
+        - The queue capacity is new_capacity.
+        - The elements are copied to the start of the new array in order,
+          in at most two slices around the end of the old array.
         """
-        new_capacity = self._capacity * 2
-        new_data = np.empty(new_capacity, dtype=object)
-        
-        for i in range(self._size):
-            new_data[i] = self._data[(self._front + i) % self._capacity]
+        if new_capacity is None:
+            new_capacity = max(1, self._capacity * 2)
+        new_data = np.empty(new_capacity, dtype=self._data.dtype)
+        first = min(self._size, self._capacity - self._front)
+        new_data[:first] = self._data[self._front:self._front + first]
+        new_data[first:self._size] = self._data[:self._size - first]
 
         self._data = new_data
         self._capacity = new_capacity
         self._front = 0
-        self._rear = self._size  # Reset rear index after copying elements
+        self._rear = self._size % new_capacity  # Reset rear index after copying elements
@@ -0,0 +1,193 @@
+"""
+async_queue.py
+Author: Dele Osuma
+
+An asyncio queue built on the circular queue's ring buffer.
+"""
+
+import asyncio
+from collections import deque
+from Queue import Queue, Empty
+from concurrent_queue import Full
+
+
+class AsyncQueue:
+    """
+    Implements a FIFO queue for coroutines on one event loop.
+
+    put() and get() are awaited, and only suspend when the queue is full or
+    empty: a future is created for a coroutine only when it has to wait, so
+    items that are already there cost no allocation beyond the call itself.
+    Waiting coroutines are woken in arrival order, one per item or slot, so
+    thousands of waiters do not all wake for every item.
+    """
+
+    def __init__(self, maxsize=0, capacity=5, dtype=object):
+        """
+        Initializes an empty async queue.
+
+        Parameters:
+        - maxsize (int): The most items the queue holds before put() waits;
+          0 or less means no limit (default: 0).
+        - capacity (int): The initial capacity of the ring buffer (default: 5).
+        - dtype: The numpy dtype of the items, as for Queue (default: object).
+
+        Post-condition:
+        - Creates an empty queue.
+        """
+        self._queue = Queue(capacity, dtype=dtype)
+        self._maxsize = maxsize
+        self._getters = deque()  # Futures of get() calls waiting for an item
+        self._putters = deque()  # Futures of put() calls waiting for room
+
+    def _wakeup(self, waiters, n=1):
+        """
+        Wakes up to n waiting coroutines, oldest first, skipping cancelled ones.
+
+        Parameters:
+        - waiters (deque): The futures of the waiting coroutines.
+        - n (int): The most coroutines to wake.
+        """
+        while n and waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                n -= 1
+
+    async def _wait(self, waiters):
+        """
+        Suspends the calling coroutine until it is woken through waiters.
+
+        Parameters:
+        - waiters (deque): The queue of waiting futures to join.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                # Already woken: hand the wakeup on so it is not lost.
+                self._wakeup(waiters)
+            raise
+
+    def is_full(self):
+        """
+        Checks if a bounded queue is full.
+
+        Returns:
+        - (bool): True if full, False otherwise.
+        """
+        return 0 < self._maxsize <= len(self._queue)
+
+    def is_empty(self):
+        """
+        Checks if the queue is empty.
+
+        Returns:
+        - (bool): True if empty, False otherwise.
+        """
+        return self._queue.is_empty()
+
+    def __len__(self):
+        """
+        Returns the number of items in the queue.
+
+        Returns:
+        - (int): The current size of the queue.
+        """
+        return len(self._queue)
+
+    async def put(self, item):
+        """
+        Adds an item to the rear of the queue, waiting for room if bounded.
+
+        Parameters:
+        - item (object): The item to be added.
+
+        Post-condition:
+        - The item is added and the longest-waiting get() is woken.
+        """
+        while 0 < self._maxsize <= len(self._queue):
+            await self._wait(self._putters)
+        self._queue.enqueue(item)
+        if self._getters:
+            self._wakeup(self._getters)
+
+    def put_nowait(self, item):
+        """
+        Adds an item to the rear of the queue without waiting.
+
+        Parameters:
+        - item (object): The item to be added.
+
+        Raises:
+        - Full: If the queue is full.
+
+        Post-condition:
+        - The item is added and the longest-waiting get() is woken.
+        """
+        if 0 < self._maxsize <= len(self._queue):
+            raise Full("Queue is full")
+        self._queue.enqueue(item)
+        if self._getters:
+            self._wakeup(self._getters)
+
+    async def get(self):
+        """
+        Removes and returns the front item, waiting for one if necessary.
+
+        Returns:
+        - The front item of the queue.
+
+        Post-condition:
+        - The item is removed and the longest-waiting put() is woken.
+        """
+        while not len(self._queue):
+            await self._wait(self._getters)
+        item = self._queue.dequeue()
+        if self._putters:
+            self._wakeup(self._putters)
+        return item
+
+    def get_nowait(self):
+        """
+        Removes and returns the front item without waiting.
+
+        Raises:
+        - Empty: If the queue is empty.
+
+        Returns:
+        - The front item of the queue.
+
+        Post-condition:
+        - The item is removed and the longest-waiting put() is woken.
+        """
+        item = self._queue.dequeue()
+        if self._putters:
+            self._wakeup(self._putters)
+        return item
+
+    def get_nowait_batch(self, max_n):
+        """
+        Removes and returns up to max_n items from the front without waiting.
+
+        Parameters:
+        - max_n (int): The most items to remove.
+
+        Raises:
+        - Empty: If the queue is empty.
+
+        Returns:
+        - (np.ndarray): The removed items, front first.
+
+        Post-condition:
+        - The items are removed, and up to one waiting put() per item is woken.
+        """
+        items = self._queue.dequeue_many(max_n)
+        if self._putters:
+            self._wakeup(self._putters, len(items))
+        return items
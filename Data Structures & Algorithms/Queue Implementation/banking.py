@@ -6,8 +6,15 @@ simulates a banking system using a dynamic circular queue for customer
 management and a round-robin scheduling system for fair service distribution.
 """
 
-from queue import Queue
-import job_generator
+import heapq
+import numpy as np
+from Queue import Queue
+from job_source import parse_service_times, read_jobs
+from quantile_sketch import QuantileSketch
+
+# The times of a queued customer, kept side by side so that one ring buffer
+# move carries both; first_service is -1 until the customer is first served.
+_CUSTOMER_TIMES = np.dtype([("arrival", np.int64), ("first_service", np.int64)])
 
 
 class Teller:
@@ -55,6 +62,14 @@ class Teller:
             if self._current_customer == 0:
                 self._current_customer = None  # Customer finished
 
+    def record_service(self, service_time):
+        """
+        Adds service time given outside accept_customer()/service_customer().
+        Parameters:
+            service_time (int): The amount of time spent serving customers.
+        """
+        self._total_service_time += service_time
+
     def release_customer(self):
         """Marks the teller as available for the next customer."""
         self._current_customer = None
@@ -68,25 +83,243 @@ class Teller:
         return f"Teller: {self._name} Total service time: {self._total_service_time}"
 
 
+class TellerPool:
+    """
+    Represents a group of tellers as NumPy arrays, teller i being entry i of
+    each, so that assigning, serving and releasing customers are a few array
+    operations for all tellers at once.
+    """
+
+    def __init__(self, num_tellers):
+        """
+        Initializes num_tellers available tellers, named by their index.
+        Parameters:
+            num_tellers (int): The number of tellers.
+        """
+        self._remaining = np.zeros(num_tellers, dtype=np.int64)  # Service left for each current customer
+        self._busy = np.zeros(num_tellers, dtype=bool)
+        self._total_service_time = np.zeros(num_tellers, dtype=np.int64)
+
+    def __len__(self):
+        """Returns the number of tellers."""
+        return len(self._busy)
+
+    def get_names(self):
+        """Returns the tellers' names."""
+        return [str(i) for i in range(len(self))]
+
+    def num_available(self):
+        """Returns how many tellers are available to serve a customer."""
+        return len(self) - int(np.count_nonzero(self._busy))
+
+    def accept_customers(self, service_times):
+        """
+        Gives customers to the available tellers, in teller order.
+        Parameters:
+            service_times (array-like): The requested service times, at most
+                one per available teller.
+        """
+        service_times = np.asarray(service_times, dtype=np.int64)
+        tellers = np.flatnonzero(~self._busy)[:len(service_times)]
+        self._remaining[tellers] = service_times
+        self._busy[tellers] = True
+
+    def service_customers(self, service_time):
+        """
+        Serves every current customer for the given service time.
+        Parameters:
+            service_time (int): The amount of time to serve each customer.
+        """
+        served = np.minimum(self._remaining, service_time, where=self._busy, out=np.zeros_like(self._remaining))
+        self._total_service_time += served
+        self._remaining -= served
+        self._busy &= self._remaining > 0  # Customers finished
+
+    def release_customers(self):
+        """
+        Makes every teller available again.
+        Returns:
+            np.ndarray: The remaining service times of the unfinished
+                customers, in teller order.
+        """
+        unfinished = self._remaining[self._busy]
+        self._busy[:] = False
+        return unfinished
+
+    def record_service(self, service_times):
+        """
+        Adds service time given outside accept_customers()/service_customers().
+        Parameters:
+            service_times (array-like): Service time per teller, for the
+                first len(service_times) tellers.
+        """
+        service_times = np.asarray(service_times, dtype=np.int64)
+        self._total_service_time[:len(service_times)] += service_times
+
+    def get_total_service_times(self):
+        """Returns the tellers' total service times as a list."""
+        return self._total_service_time.tolist()
+
+
+class _AliveIndex:
+    """
+    Fenwick tree over the customers in a stretch of service cycles, counting
+    how many still being served stand ahead of a given one.
+    """
+
+    def __init__(self, n):
+        """Marks customers 0 to n - 1 as being served."""
+        self._tree = [0] * (n + 1)
+        for i in range(1, n + 1):
+            self._tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+
+    def rank(self, i):
+        """Returns how many customers before customer i are still being served."""
+        count = 0
+        while i > 0:
+            count += self._tree[i]
+            i -= i & -i
+        return count
+
+    def remove(self, i):
+        """Marks customer i as finished."""
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] -= 1
+            i += i & -i
+
+
 class BankingSimulation:
     """
     A banking system simulation that manages tellers and customer service using a round-robin queue.
+
+    The "cycle" engine walks every teller in every service cycle. The "event"
+    engine gives the same results but only does work when customers are
+    served: idle tellers and empty cycles cost nothing. While there are no
+    more customers than tellers, it jumps from one customer completion to
+    the next, kept on a heap, instead of running the cycles in between.
+
+    With pool=True the tellers are a TellerPool rather than a list of
+    Teller objects, and a cycle is a few array operations.
+
+    With track_latency=True every customer's arrival, first service and
+    completion times are tracked, and the waits and latencies they give are
+    kept in quantile sketches, so metrics() reports percentiles in bounded
+    memory. This keeps a second ring of times in step with the queue, which
+    can double the cost of a pooled cycle, so it is off by default.
     """
 
-    def __init__(self):
-        """Initializes the banking simulation with a queue and teller list."""
-        self.tellers = []
-        self.customer_queue = Queue()
+    ENGINES = ("cycle", "event")
+
+    def __init__(self, engine="cycle", pool=False, track_latency=False):
+        """
+        Initializes the banking simulation with a queue and teller list.
+        Parameters:
+            engine (str): "cycle" or "event" (default: "cycle").
+            pool (bool): Whether to keep the tellers in a TellerPool (default: False).
+            track_latency (bool): Whether to track each customer's times for
+                the wait and latency percentiles of metrics() (default: False).
+        Raises:
+            ValueError: If the engine is not one of ENGINES.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine must be one of {self.ENGINES}, not {engine!r}")
+        self.engine = engine
+        self.pool = pool
+        self.track_latency = track_latency
+        self.tellers = TellerPool(0) if pool else []
+        # Each cycle dequeues a batch and puts the unfinished part back, so a
+        # shrink would be undone at once: the queues keep their capacity.
+        self.customer_queue = Queue(dtype=np.int64, shrink_below=0)  # Remaining service times
         self.total_simulation_time = 0
+        self.total_wait_time = 0  # Summed over customers, for the cycles they spent in the queue
+        self.customers_added = 0
+        # With track_latency, kept in step with customer_queue, one entry per queued customer
+        self._customer_times = Queue(dtype=_CUSTOMER_TIMES, shrink_below=0)
+        self._first_service_waits = QuantileSketch()  # From arrival to first service
+        self._latencies = QuantileSketch()  # From arrival to completion
 
     def create_tellers(self, num_tellers):
         """Creates the specified number of tellers."""
-        self.tellers = [Teller(str(i)) for i in range(num_tellers)]
+        if self.pool:
+            self.tellers = TellerPool(num_tellers)
+        else:
+            self.tellers = [Teller(str(i)) for i in range(num_tellers)]
+
+    def get_teller_service_times(self):
+        """Returns each teller's total service time, in teller order."""
+        if self.pool:
+            return self.tellers.get_total_service_times()
+        return [teller.get_total_service_time() for teller in self.tellers]
+
+    def _record_service(self, service_times):
+        """
+        Credits service time to the first len(service_times) tellers.
+        Parameters:
+            service_times (array-like): Service time per teller.
+        """
+        if self.pool:
+            self.tellers.record_service(service_times)
+        else:
+            for teller, time in zip(self.tellers, np.asarray(service_times).tolist()):
+                teller.record_service(time)
 
     def add_customers(self, service_times):
-        """Adds customers with the given service times to the queue."""
-        for time in service_times:
-            self.customer_queue.enqueue(time)
+        """
+        Adds customers with the given service times to the queue.
+        Parameters:
+            service_times (iterable of int): Their service times, none negative.
+        Raises:
+            ValueError: If a service time is negative or not an integer; then
+                no customer is added.
+        """
+        if not isinstance(service_times, np.ndarray):
+            service_times = np.asarray(list(service_times))
+        if service_times.dtype.kind in "iuf" and (service_times < 0).any():
+            raise ValueError("service times must not be negative")
+        size = len(self.customer_queue)
+        self.customer_queue.enqueue_many(service_times)
+        added = len(self.customer_queue) - size
+        self.customers_added += added
+        if not self.track_latency:
+            return
+        times = np.empty(added, dtype=_CUSTOMER_TIMES)
+        times["arrival"] = self.total_simulation_time
+        times["first_service"] = -1
+        self._customer_times.enqueue_many(times)
+
+    def _track_service(self, start, served, finished):
+        """
+        Updates the times of the customers just served from the front of the
+        queue, after the unfinished ones have been requeued in order.
+        Parameters:
+            start (int): The time their service started.
+            served (np.ndarray): Their remaining service times at the start.
+            finished (np.ndarray): Which of them finished, each at start
+                plus its remaining service time.
+        """
+        if not self.track_latency or not len(served):
+            return
+        times = self._customer_times.dequeue_many(len(served))
+        arrivals, first = times["arrival"], times["first_service"]
+        new = first < 0
+        if new.any():
+            self._first_service_waits.add_many(start - arrivals[new])
+            first[new] = start
+        if finished.any():
+            self._latencies.add_many((start + served - arrivals)[finished])
+            times = times[~finished]
+        self._customer_times.enqueue_many(times)
+
+    def get_mean_wait_time(self):
+        """
+        Returns the mean time customers added so far have spent waiting in the
+        queue rather than being served, or 0 if there have been none.
+        """
+        return self.total_wait_time / self.customers_added if self.customers_added else 0
 
     def process_service_cycle(self, service_time):
         """
@@ -95,48 +328,211 @@ class BankingSimulation:
         Parameters:
             service_time (int): The time duration of the service cycle.
         """
+        if self.engine == "event":
+            self._advance(service_time, 1)
+            return
+        start = self.total_simulation_time
         self.total_simulation_time += service_time
+        self.total_wait_time += max(0, len(self.customer_queue) - len(self.tellers)) * service_time
+        if self.pool:
+            available = min(self.tellers.num_available(), len(self.customer_queue))
+            served = self.customer_queue.dequeue_many(available) if available else np.empty(0, dtype=np.int64)
+            self.tellers.accept_customers(served)
+            self.tellers.service_customers(service_time)
+            self.customer_queue.enqueue_many(self.tellers.release_customers())
+            self._track_service(start, served, served <= service_time)
+            return
 
         # Assign available tellers to customers
+        served = []
         for teller in self.tellers:
             if teller.is_available() and not self.customer_queue.is_empty():
-                teller.accept_customer(self.customer_queue.dequeue())
+                served.append(self.customer_queue.dequeue())
+                teller.accept_customer(served[-1])
 
         # Serve customers for the given service time
         for teller in self.tellers:
             teller.service_customer(service_time)
 
         # Requeue customers who are not fully served
+        unfinished = []
         for teller in self.tellers:
             if teller._current_customer is not None:
-                self.customer_queue.enqueue(teller._current_customer)
+                unfinished.append(teller._current_customer)
                 teller.release_customer()
+        self.customer_queue.enqueue_many(unfinished)
+        served = np.array(served, dtype=np.int64)
+        self._track_service(start, served, served <= service_time)
+
+    def process_service_cycles(self, service_time, cycles):
+        """
+        Performs a number of service cycles of the same duration.
+
+        Parameters:
+            service_time (int): The time duration of each service cycle.
+            cycles (int): The number of service cycles.
+        """
+        if self.engine == "event":
+            self._advance(service_time, cycles)
+            return
+        for _ in range(cycles):
+            self.process_service_cycle(service_time)
+
+    def _advance(self, service_time, cycles):
+        """
+        Runs service cycles on the event engine.
+
+        While there are more customers than tellers, every teller is busy and
+        each cycle serves the front customers as one batch. Once every waiting
+        customer has a teller, nobody waits any more and unfinished customers
+        are requeued in the order they were served, so the queue order is
+        fixed: customer j keeps the teller whose index is its rank among the
+        customers still being served. The only events left are completions,
+        in cycle ceil(remaining / service_time), and these are popped off a
+        heap while the time in between is credited to the tellers in bulk.
+
+        Parameters:
+            service_time (int): The time duration of each service cycle.
+            cycles (int): The number of service cycles.
+        """
+        num_tellers = len(self.tellers)
+        while cycles and num_tellers and len(self.customer_queue) > num_tellers:
+            self.total_wait_time += (len(self.customer_queue) - num_tellers) * service_time
+            served = self.customer_queue.dequeue_many(num_tellers)
+            done = np.minimum(served, service_time)
+            self._record_service(done)
+            left = served - done
+            self.customer_queue.enqueue_many(left[left > 0])
+            self._track_service(self.total_simulation_time, served, left == 0)
+            self.total_simulation_time += service_time
+            cycles -= 1
+        start = self.total_simulation_time
+        self.total_simulation_time += service_time * cycles
+        if not num_tellers:
+            self.total_wait_time += len(self.customer_queue) * service_time * cycles
+        if not cycles or not num_tellers or self.customer_queue.is_empty():
+            return
+
+        remaining = self.customer_queue.dequeue_many(len(self.customer_queue)).tolist()
+        events = []  # (cycle the customer finishes in, customer)
+        for j, time in enumerate(remaining):
+            if time == 0:
+                finish = 1
+            elif service_time > 0:
+                finish = -(-time // service_time)
+            else:
+                continue  # Never finishes
+            if finish <= cycles:
+                events.append((finish, j))
+        heapq.heapify(events)
+
+        alive = _AliveIndex(len(remaining))
+        busy_cycles = [0] * (len(remaining) + 1)  # Cycles spent with k customers being served
+        shortfall = [0] * len(remaining)  # Time short of a full cycle, per teller
+        finished = [False] * len(remaining)
+        num_alive, last = len(remaining), 0
+        while events:
+            cycle = events[0][0]
+            busy_cycles[num_alive] += cycle - last
+            group = []
+            while events and events[0][0] == cycle:
+                group.append(heapq.heappop(events)[1])
+            for j in group:
+                # In its last cycle the customer is served for what it has
+                # left, by the teller matching its rank at the cycle start.
+                shortfall[alive.rank(j)] += service_time * cycle - remaining[j]
+            for j in group:
+                alive.remove(j)
+                finished[j] = True
+            num_alive -= len(group)
+            last = cycle
+        busy_cycles[num_alive] += cycles - last
+
+        # Teller i was busy in every cycle with more than i customers being served
+        full_cycles = np.cumsum(np.array(busy_cycles[:0:-1], dtype=np.int64))[::-1]
+        self._record_service(service_time * full_cycles - np.array(shortfall, dtype=np.int64))
+        self.customer_queue.enqueue_many(
+            [time - service_time * cycles for j, time in enumerate(remaining) if not finished[j]])
+        # Being served every cycle, each finished customer took exactly its remaining time
+        self._track_service(start, np.array(remaining, dtype=np.int64), np.array(finished))
+
+    def metrics(self, percentiles=(50, 90, 99, 99.9)):
+        """
+        Returns the simulation's metrics so far.
+        Parameters:
+            percentiles (tuple): The percentiles to estimate (default: 50, 90, 99, 99.9).
+        Returns:
+            dict: "time", "customers" added, "completed" and "in_queue"
+                counts, the mean teller "idle_percentage", the
+                "mean_queue_wait" of get_mean_wait_time(), and summaries of
+                the "first_service_wait" (arrival to first service) and the
+                "latency" (arrival to completion) as given by
+                QuantileSketch.summary(), percentiles being within 1%. The
+                summaries are only {"count": 0} without track_latency.
+        """
+        time = self.total_simulation_time
+        service_times = self.get_teller_service_times()
+        idle = 100 * (1 - sum(service_times) / (len(service_times) * time)) if time and service_times else 0.0
+        return {
+            "time": time,
+            "customers": self.customers_added,
+            "completed": self.customers_added - len(self.customer_queue),
+            "in_queue": len(self.customer_queue),
+            "idle_percentage": idle,
+            "mean_queue_wait": self.get_mean_wait_time(),
+            "first_service_wait": self._first_service_waits.summary(percentiles),
+            "latency": self._latencies.summary(percentiles),
+        }
 
     def print_status(self):
         """Prints the status of the tellers and the queue."""
         print("\n--- STATUS REPORT ---")
-        for teller in self.tellers:
+        names = self.tellers.get_names() if self.pool else [teller.get_name() for teller in self.tellers]
+        for name, service_time in zip(names, self.get_teller_service_times()):
             idle_percentage = (
-                (self.total_simulation_time - teller.get_total_service_time()) / self.total_simulation_time * 100
+                (self.total_simulation_time - service_time) / self.total_simulation_time * 100
                 if self.total_simulation_time > 0 else 0
             )
-            print(f"{teller} Percentage idle: {idle_percentage:.2f}%")
-        print(f"Customers in queue: {len(self.customer_queue)} {self.customer_queue}")
+            print(f"Teller: {name} Total service time: {service_time} Percentage idle: {idle_percentage:.2f}%")
+        print(f"Customers in queue: {len(self.customer_queue)}")
+        latency = self._latencies.summary((50, 90, 99))
+        if latency["count"]:
+            print(f"Customers finished: {latency['count']} Latency p50: {latency['p50']:.1f} "
+                  f"p90: {latency['p90']:.1f} p99: {latency['p99']:.1f}")
+
+    def run_simulation(self, jobs=None):
+        """
+        Runs the banking simulation over a stream of jobs. On the event engine,
+        runs of "service" jobs with the same duration are processed together.
+        Parameters:
+            jobs (iterable): (job, value) pairs, e.g. from job_source.read_jobs()
+                or job_source.synthetic_jobs() (default: jobs read from stdin).
+        """
+        if jobs is None:
+            jobs = read_jobs()
 
-    def run_simulation(self):
-        """Runs the banking simulation using job_generator."""
-        job_gen = job_generator.generate_jobs()
+        pending, count = None, 0  # A run of "service" jobs not yet processed
+        for job, value in jobs:
+            if self.engine == "event" and job == "service" and value == pending:
+                count += 1
+                continue
+            if count:
+                self.process_service_cycles(pending, count)
+                pending, count = None, 0
 
-        for job, value in job_gen:
             if job == "call":
                 self.create_tellers(value)
 
             elif job == "add":
-                service_times = list(map(int, value.split()))
-                self.add_customers(service_times)
+                if isinstance(value, str):
+                    value = parse_service_times(value)
+                self.add_customers(value)
 
             elif job == "service":
-                self.process_service_cycle(value)
+                if self.engine == "event":
+                    pending, count = value, 1
+                else:
+                    self.process_service_cycle(value)
 
             elif job == "status":
                 self.print_status()
@@ -147,3 +543,21 @@ class BankingSimulation:
                 print(f"Customers left in queue: {len(self.customer_queue)}")
                 break
 
+        if count:
+            self.process_service_cycles(pending, count)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Runs the banking simulation over a job file.")
+    parser.add_argument("jobs", nargs="?", help="the job file (default: stdin)")
+    parser.add_argument("--engine", choices=BankingSimulation.ENGINES, default="cycle")
+    parser.add_argument("--pool", action="store_true", help="keep the tellers in a TellerPool")
+    parser.add_argument("--latency", action="store_true", help="report wait and latency percentiles")
+    args = parser.parse_args()
+    simulation = BankingSimulation(args.engine, args.pool, args.latency)
+    if args.jobs:
+        with open(args.jobs) as stream:
+            simulation.run_simulation(read_jobs(stream))
+    else:
+        simulation.run_simulation()
@@ -0,0 +1,113 @@
+"""
+bench_banking.py
+Author: Dele Osuma
+
+Benchmarks for the banking simulation on reproducible synthetic workloads.
+
+Run from terminal: python bench_banking.py [--customers N] [--tellers N] [--batch-size N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from banking import BankingSimulation
+from job_source import read_jobs, synthetic_jobs, write_jobs
+from sweep import format_table, sweep, synthetic_trace
+
+
+def bench_parse(path):
+    """
+    Compares read_jobs(), which parses "add" jobs into arrays, against
+    parsing every job the way run_simulation() used to, with "add" values
+    split into lists of Python ints.
+
+    Parameters:
+    - path (str): A job file written by write_jobs().
+    """
+    start = time.perf_counter()
+    with open(path) as stream:
+        jobs = sum(1 for _ in read_jobs(stream))
+    elapsed = time.perf_counter() - start
+    print(f"{'read_jobs':>22} {jobs / elapsed:>14,.0f} jobs/s")
+
+    start = time.perf_counter()
+    with open(path) as stream:
+        for line in stream:
+            job, _, value = line.partition(" ")
+            if job == "add":
+                list(map(int, value.split()))
+            elif job in ("call", "service"):
+                int(value)
+    elapsed = time.perf_counter() - start
+    print(f"{'split + int':>22} {jobs / elapsed:>14,.0f} jobs/s")
+
+
+def bench_engines(path, configs=(("cycle", False, False), ("cycle", True, False), ("cycle", True, True),
+                                 ("event", False, False), ("event", True, False), ("event", True, True))):
+    """
+    Times a full simulation replayed from a job file on each engine.
+
+    Parameters:
+    - path (str): A job file written by write_jobs().
+    - configs (tuple): (engine, pool, track_latency) triples to run.
+    """
+    for engine, pool, track_latency in configs:
+        simulation = BankingSimulation(engine, pool, track_latency)
+        start = time.perf_counter()
+        with open(path) as stream, contextlib.redirect_stdout(io.StringIO()):
+            simulation.run_simulation(read_jobs(stream))
+        elapsed = time.perf_counter() - start
+        name = f"{engine}{' + pool' if pool else ''}{' + latency' if track_latency else ''}"
+        print(f"{name:>22} {elapsed:>10.2f} s   {len(simulation.customer_queue):>10,} left in queue")
+
+
+def bench_sweep(num_customers=200_000, teller_counts=(150, 200, 250, 300), service_times=(2, 5, 10),
+                worker_counts=(1, 2, 4, 8)):
+    """
+    Times a parameter sweep with different numbers of worker processes and
+    prints the table it produces.
+
+    Parameters:
+    - num_customers (int): Customers in each of the two synthetic traces.
+    - teller_counts (tuple): The numbers of tellers to sweep.
+    - service_times (tuple): The service cycle durations to sweep.
+    - worker_counts (tuple): The numbers of worker processes to time.
+    """
+    traces = [synthetic_trace(num_customers, seed=seed) for seed in range(2)]
+    configs = len(traces) * len(teller_counts) * len(service_times)
+    print(f"sweep of {configs} configurations, {os.cpu_count()} CPUs")
+    base = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        rows = sweep(traces, teller_counts, service_times, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(f"{workers:>4} workers {elapsed:>8.2f} s   speed-up {base / elapsed:>5.2f}x")
+    print(format_table(rows))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the banking simulation.")
+    parser.add_argument("--customers", type=int, default=2_000_000)
+    parser.add_argument("--tellers", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000, help="customers per add job")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".jobs")
+    try:
+        with os.fdopen(fd, "w") as stream:
+            jobs = write_jobs(synthetic_jobs(args.customers, num_tellers=args.tellers,
+                                                batch_size=args.batch_size, seed=args.seed), stream)
+        print(f"{args.customers:,} customers, {args.tellers} tellers, {jobs:,} jobs, "
+              f"{os.path.getsize(path) / 2**20:.1f} MiB job file")
+        bench_parse(path)
+        print()
+        bench_engines(path)
+    finally:
+        os.remove(path)
+    print()
+    bench_sweep()
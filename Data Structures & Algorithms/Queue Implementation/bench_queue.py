@@ -0,0 +1,330 @@
+"""
+bench_queue.py
+Author: Dele Osuma
+
+Benchmarks for the circular queue.
+
+Run from terminal: python bench_queue.py
+"""
+
+import asyncio
+import queue
+import threading
+import time
+import tracemalloc
+from collections import deque
+import numpy as np
+from Queue import Queue
+from concurrent_queue import ConcurrentQueue
+from async_queue import AsyncQueue
+
+
+def resize_by_loop(queue):
+    """
+    Doubles a queue's capacity the way Queue._resize() used to: one element at a time.
+
+    Parameters:
+    - queue (Queue): The queue to resize.
+    """
+    new_capacity = queue._capacity * 2
+    new_data = np.empty(new_capacity, dtype=object)
+    for i in range(queue._size):
+        new_data[i] = queue._data[(queue._front + i) % queue._capacity]
+    queue._data = new_data
+    queue._capacity = new_capacity
+    queue._front = 0
+    queue._rear = queue._size
+
+
+def bench_resize(sizes=(10_000, 100_000, 1_000_000)):
+    """
+    Times doubling a full queue whose contents wrap around the end of its array.
+
+    Parameters:
+    - sizes (tuple): Queue sizes to resize at.
+    """
+    print("queue resize")
+    print(f"{'size':>10} {'loop (ms)':>10} {'slices (ms)':>12}")
+    for size in sizes:
+        timings = []
+        for resize in (resize_by_loop, Queue._resize):
+            queue = Queue(size)
+            queue.enqueue_many(range(size // 2))
+            queue.dequeue_many(size // 2)
+            queue.enqueue_many(range(size))  # Full, with the front in the middle
+            start = time.perf_counter()
+            resize(queue)
+            timings.append(time.perf_counter() - start)
+        print(f"{size:>10} {timings[0] * 1e3:>10.2f} {timings[1] * 1e3:>12.2f}")
+
+
+def bench_batches(n=1_000_000, batch_sizes=(1, 16, 256, 4096)):
+    """
+    Compares the per-item cost of enqueue()/dequeue() loops with enqueue_many()/dequeue_many()
+    at several batch sizes, moving n items through a queue that starts small.
+
+    Parameters:
+    - n (int): The number of items.
+    - batch_sizes (tuple): Items per batch call.
+    """
+    items = list(range(n))
+    print(f"queue batches, {n} items, ns per item")
+    print(f"{'batch':>8} {'enqueue':>9} {'dequeue':>9}")
+    queue = Queue()
+    start = time.perf_counter()
+    for item in items:
+        queue.enqueue(item)
+    enqueue = time.perf_counter() - start
+    start = time.perf_counter()
+    while not queue.is_empty():
+        queue.dequeue()
+    dequeue = time.perf_counter() - start
+    print(f"{'single':>8} {enqueue / n * 1e9:>9.1f} {dequeue / n * 1e9:>9.1f}")
+
+    for batch in batch_sizes:
+        chunks = [items[i:i + batch] for i in range(0, n, batch)]
+        queue = Queue()
+        start = time.perf_counter()
+        for chunk in chunks:
+            queue.enqueue_many(chunk)
+        enqueue = time.perf_counter() - start
+        start = time.perf_counter()
+        while not queue.is_empty():
+            queue.dequeue_many(batch)
+        dequeue = time.perf_counter() - start
+        print(f"{batch:>8} {enqueue / n * 1e9:>9.1f} {dequeue / n * 1e9:>9.1f}")
+
+
+def bench_dtype(n=1_000_000):
+    """
+    Compares an object queue with an int64 queue holding n service times: memory per
+    item, batch enqueue time, and summing and decrementing every queued item.
+
+    Parameters:
+    - n (int): The number of items.
+    """
+    print(f"queue dtype, {n} items")
+    print(f"{'dtype':>8} {'bytes/item':>11} {'enqueue (ms)':>13} {'sum (ms)':>9} {'decrement (ms)':>15}")
+    for dtype in (object, np.int64):
+        tracemalloc.start()
+        queue = Queue(n, dtype=dtype)
+        queue.enqueue_many(range(1000, 1000 + n))
+        per_item = tracemalloc.get_traced_memory()[0] / n
+        tracemalloc.stop()
+
+        queue = Queue(n, dtype=dtype)
+        items = list(range(1000, 1000 + n))
+        start = time.perf_counter()
+        queue.enqueue_many(items)
+        enqueue = time.perf_counter() - start
+        start = time.perf_counter()
+        if dtype is object:
+            sum(queue.to_array())
+        else:
+            sum(part.sum() for part in queue.segments())
+        total = time.perf_counter() - start
+        start = time.perf_counter()
+        if dtype is object:
+            for part in queue.segments():
+                for i in range(len(part)):
+                    part[i] -= 1
+        else:
+            for part in queue.segments():
+                part -= 1
+        decrement = time.perf_counter() - start
+        print(f"{np.dtype(dtype).name:>8} {per_item:>11.1f} {enqueue * 1e3:>13.2f} "
+              f"{total * 1e3:>9.2f} {decrement * 1e3:>15.2f}")
+
+
+def bench_burst(n=1_000_000, keep=1_000, batch=100):
+    """
+    Measures memory across a burst of n items drained down to keep items, in batches,
+    with and without shrinking: the memory still held after the drain, and the time
+    the drain takes.
+
+    Parameters:
+    - n (int): The size of the burst.
+    - keep (int): The items left in the queue after draining.
+    - batch (int): Items per dequeue_many() call.
+    """
+    print(f"queue burst then drain, {n} items down to {keep}")
+    print(f"{'dtype':>8} {'shrink_below':>13} {'peak (MB)':>10} {'after (MB)':>11} {'drain (ms)':>11}")
+    for dtype in (object, np.int64):
+        for shrink_below in (0, 1/4):
+            tracemalloc.start()
+            queue = Queue(dtype=dtype, shrink_below=shrink_below)
+            queue.enqueue_many(np.arange(n).astype(dtype))
+            start = time.perf_counter()
+            while len(queue) > keep:
+                queue.dequeue_many(min(batch, len(queue) - keep))
+            drain = time.perf_counter() - start
+            after, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del queue
+            print(f"{np.dtype(dtype).name:>8} {shrink_below:>13.2f} {peak / 2**20:>10.1f} "
+                  f"{after / 2**20:>11.3f} {drain * 1e3:>11.1f}")
+
+
+class DequeQueue:
+    """A deque guarded by a threading.Condition, the usual hand-rolled blocking queue."""
+
+    def __init__(self, maxsize=0):
+        self.items = deque()
+        self.maxsize = maxsize
+        self.not_empty = threading.Condition()
+        self.not_full = threading.Condition(self.not_empty._lock)
+
+    def put(self, item):
+        with self.not_full:
+            while self.maxsize and len(self.items) >= self.maxsize:
+                self.not_full.wait()
+            self.items.append(item)
+            self.not_empty.notify()
+
+    def get(self):
+        with self.not_empty:
+            while not self.items:
+                self.not_empty.wait()
+            item = self.items.popleft()
+            self.not_full.notify()
+            return item
+
+
+def run_handoff(make, n, producers, consumers, batch):
+    """
+    Moves n items from producer threads to consumer threads through one queue.
+
+    Parameters:
+    - make (callable): Makes the empty queue.
+    - n (int): The number of items; divisible by producers and consumers.
+    - producers (int): The number of producer threads.
+    - consumers (int): The number of consumer threads.
+    - batch (int): Items per put_many()/get_batch() call, or 0 for put()/get().
+
+    Returns:
+    - (float): The wall-clock time taken, in seconds.
+    """
+    q = make()
+
+    def produce():
+        items = range(n // producers)
+        if batch:
+            for i in range(0, len(items), batch):
+                q.put_many(items[i:i + batch])
+        else:
+            for item in items:
+                q.put(item)
+
+    def consume():
+        left = n // consumers
+        if batch:
+            while left:
+                left -= len(q.get_batch(min(batch, left)))
+        else:
+            for _ in range(left):
+                q.get()
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    threads += [threading.Thread(target=consume) for _ in range(consumers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench_threads(n=240_000, maxsize=1024, shapes=((1, 1), (4, 4))):
+    """
+    Compares thread hand-off throughput through a bounded queue.Queue, a deque with a
+    Condition, and ConcurrentQueue item by item and in batches.
+
+    Parameters:
+    - n (int): The number of items moved per run.
+    - maxsize (int): The bound of every queue.
+    - shapes (tuple): (producers, consumers) pairs to run.
+    """
+    queues = (
+        ("queue.Queue", lambda: queue.Queue(maxsize), 0),
+        ("deque+Condition", lambda: DequeQueue(maxsize), 0),
+        ("ConcurrentQueue", lambda: ConcurrentQueue(maxsize), 0),
+        ("ConcurrentQueue x64", lambda: ConcurrentQueue(maxsize), 64),
+        ("ConcurrentQueue x512", lambda: ConcurrentQueue(maxsize), 512),
+    )
+    print(f"thread hand-off, {n} items, maxsize {maxsize}, items per second")
+    print(f"{'queue':>22} " + " ".join(f"{f'{p}P/{c}C':>10}" for p, c in shapes))
+    for name, make, batch in queues:
+        rates = [n / run_handoff(make, n, p, c, batch) for p, c in shapes]
+        print(f"{name:>22} " + " ".join(f"{rate:>10,.0f}" for rate in rates))
+
+
+async def run_async_handoff(make, n, producers, consumers, batch):
+    """
+    Moves n items from producer coroutines to consumer coroutines through one queue.
+
+    Parameters:
+    - make (callable): Makes the empty queue.
+    - n (int): The number of items; divisible by producers and consumers.
+    - producers (int): The number of producer coroutines.
+    - consumers (int): The number of consumer coroutines.
+    - batch (int): The most items a consumer takes per wakeup through
+      get_nowait_batch(), or 0 for get() alone.
+
+    Returns:
+    - (float): The wall-clock time taken, in seconds.
+    """
+    q = make()
+
+    async def produce():
+        for item in range(n // producers):
+            await q.put(item)
+
+    async def consume():
+        left = n // consumers
+        while left:
+            await q.get()
+            left -= 1
+            if batch and left and not q.is_empty():
+                left -= len(q.get_nowait_batch(min(batch - 1, left)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(consume() for _ in range(consumers)),
+                         *(produce() for _ in range(producers)))
+    return time.perf_counter() - start
+
+
+def bench_async(n=200_000, maxsize=1024, shapes=((1, 1), (1, 1000), (1000, 1000))):
+    """
+    Compares coroutine hand-off throughput on one event loop through a bounded
+    asyncio.Queue and AsyncQueue, item by item and in batches. The shapes with
+    1000 consumers keep most of them waiting on an empty queue.
+
+    Parameters:
+    - n (int): The number of items moved per run.
+    - maxsize (int): The bound of every queue.
+    - shapes (tuple): (producers, consumers) pairs to run.
+    """
+    queues = (
+        ("asyncio.Queue", lambda: asyncio.Queue(maxsize), 0),
+        ("AsyncQueue", lambda: AsyncQueue(maxsize), 0),
+        ("AsyncQueue x64", lambda: AsyncQueue(maxsize), 64),
+    )
+    print(f"event-loop hand-off, {n} items, maxsize {maxsize}, items per second")
+    print(f"{'queue':>22} " + " ".join(f"{f'{p}P/{c}C':>10}" for p, c in shapes))
+    for name, make, batch in queues:
+        rates = [n / asyncio.run(run_async_handoff(make, n, p, c, batch)) for p, c in shapes]
+        print(f"{name:>22} " + " ".join(f"{rate:>10,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    bench_resize()
+    print()
+    bench_batches()
+    print()
+    bench_dtype()
+    print()
+    bench_burst()
+    print()
+    bench_threads()
+    print()
+    bench_async()
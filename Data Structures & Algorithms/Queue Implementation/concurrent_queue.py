@@ -0,0 +1,216 @@
+"""
+concurrent_queue.py
+Author: Dele Osuma
+
+A thread-safe blocking queue built on the circular queue's ring buffer.
+"""
+
+import threading
+from Queue import Queue, Empty
+
+
+class Full(Exception):
+    """Custom exception to indicate a bounded queue is full."""
+    pass
+
+
+class ConcurrentQueue:
+    """
+    Implements a thread-safe FIFO queue for handing items from producer
+    threads to consumer threads.
+
+    put() and get() block on condition variables until they can go ahead,
+    optionally with a timeout. A maximum size makes producers wait for
+    consumers (back-pressure). put_many() and get_batch() move many items
+    per lock acquisition and wake as many waiting threads as they made room
+    or items for, instead of one wakeup per item.
+    """
+
+    def __init__(self, maxsize=0, capacity=5, dtype=object):
+        """
+        Initializes an empty concurrent queue.
+
+        Parameters:
+        - maxsize (int): The most items the queue holds before put() blocks;
+          0 or less means no limit (default: 0).
+        - capacity (int): The initial capacity of the ring buffer (default: 5).
+        - dtype: The numpy dtype of the items, as for Queue (default: object).
+
+        Post-condition:
+        - Creates an empty queue.
+        """
+        self._queue = Queue(capacity, dtype=dtype)
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def _room(self):
+        """Returns how many items can be added before the queue is full."""
+        if self._maxsize <= 0:
+            return float("inf")
+        return self._maxsize - len(self._queue)
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Adds an item to the rear of the queue, waiting for room if bounded.
+
+        Parameters:
+        - item (object): The item to be added.
+        - block (bool): If False, fail at once instead of waiting (default: True).
+        - timeout (float): The most seconds to wait; None waits as long as
+          it takes (default: None).
+
+        Raises:
+        - Full: If there is no room and none was made in time.
+
+        Post-condition:
+        - The item is added and one waiting consumer is woken.
+        """
+        with self._not_full:
+            if 0 < self._maxsize <= len(self._queue):
+                if not self._wait(self._not_full, lambda: self._room() > 0, block, timeout):
+                    raise Full("Queue is full")
+            self._queue.enqueue(item)
+            self._not_empty.notify()
+
+    def put_many(self, items, block=True, timeout=None):
+        """
+        Adds many items to the rear of the queue in order. A bounded queue
+        takes them in as many runs as room allows, waiting between runs.
+
+        Parameters:
+        - items (iterable): The items to be added, front first.
+        - block (bool): If False, add as many items as fit now and raise
+          Full for the rest instead of waiting (default: True).
+        - timeout (float): The most seconds to wait for each run; None waits
+          as long as it takes (default: None).
+
+        Raises:
+        - Full: If room ran out; the items before that point were added,
+          and those after it were not.
+
+        Post-condition:
+        - The items are added, and up to one waiting consumer per item is woken.
+        """
+        items = list(items)
+        start = 0
+        with self._not_full:
+            while start < len(items):
+                if not self._wait(self._not_full, lambda: self._room() > 0, block, timeout):
+                    raise Full("Queue is full")
+                run = items[start:start + min(self._room(), len(items) - start)]
+                self._queue.enqueue_many(run)
+                start += len(run)
+                self._not_empty.notify(len(run))
+
+    def get(self, block=True, timeout=None):
+        """
+        Removes and returns the front item, waiting for one if necessary.
+
+        Parameters:
+        - block (bool): If False, fail at once instead of waiting (default: True).
+        - timeout (float): The most seconds to wait; None waits as long as
+          it takes (default: None).
+
+        Raises:
+        - Empty: If there is no item and none arrived in time.
+
+        Returns:
+        - The front item of the queue.
+
+        Post-condition:
+        - The item is removed and one waiting producer is woken.
+        """
+        with self._not_empty:
+            if not len(self._queue):
+                if not self._wait(self._not_empty, lambda: len(self._queue) > 0, block, timeout):
+                    raise Empty("Queue is empty")
+            item = self._queue.dequeue()
+            self._not_full.notify()
+            return item
+
+    def get_batch(self, max_n, block=True, timeout=None):
+        """
+        Removes and returns up to max_n items from the front, waiting only
+        until there is at least one.
+
+        Parameters:
+        - max_n (int): The most items to remove.
+        - block (bool): If False, fail at once instead of waiting (default: True).
+        - timeout (float): The most seconds to wait; None waits as long as
+          it takes (default: None).
+
+        Raises:
+        - Empty: If there is no item and none arrived in time.
+
+        Returns:
+        - (np.ndarray): The removed items, front first.
+
+        Post-condition:
+        - The items are removed, and up to one waiting producer per item is woken.
+        """
+        with self._not_empty:
+            if not self._wait(self._not_empty, lambda: len(self._queue) > 0, block, timeout):
+                raise Empty("Queue is empty")
+            items = self._queue.dequeue_many(max_n)
+            self._not_full.notify(len(items))
+            return items
+
+    def _wait(self, condition, predicate, block, timeout):
+        """
+        Waits on a condition, whose lock is held, until predicate() is true.
+
+        Parameters:
+        - condition (threading.Condition): The condition to wait on.
+        - predicate (callable): Tells whether the caller can go ahead.
+        - block (bool): If False, do not wait at all.
+        - timeout (float): The most seconds to wait, or None.
+
+        Returns:
+        - (bool): Whether predicate() is true, i.e. whether to go ahead.
+        """
+        if predicate():
+            return True
+        if not block:
+            return False
+        return condition.wait_for(predicate, timeout)
+
+    def qsize(self):
+        """
+        Returns the number of items in the queue; only a hint once other
+        threads are running.
+
+        Returns:
+        - (int): The current size of the queue.
+        """
+        with self._lock:
+            return len(self._queue)
+
+    def __len__(self):
+        """
+        Returns the number of items in the queue.
+
+        Returns:
+        - (int): The current size of the queue.
+        """
+        return self.qsize()
+
+    def is_empty(self):
+        """
+        Checks if the queue is empty.
+
+        Returns:
+        - (bool): True if empty, False otherwise.
+        """
+        return self.qsize() == 0
+
+    def is_full(self):
+        """
+        Checks if a bounded queue is full.
+
+        Returns:
+        - (bool): True if full, False otherwise.
+        """
+        with self._lock:
+            return self._room() <= 0
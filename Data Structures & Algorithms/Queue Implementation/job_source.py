@@ -0,0 +1,171 @@
+"""
+job_source.py
+Author: Dele Osuma
+
+Streams jobs for the banking simulation from text, writes them back out as
+a replay log, and generates synthetic workloads.
+
+A job is a (job, value) pair, one per line of text:
+
+    call <number of tellers>
+    add <service time> <service time> ...
+    service <duration of the service cycle>
+    status
+    quit
+
+Blank lines and lines starting with "#" are skipped. "add" values are
+parsed straight into an int64 array, ready for Queue.enqueue_many().
+"""
+
+import sys
+import numpy as np
+
+JOBS = ("call", "add", "service", "status", "quit")
+
+
+def parse_service_times(text):
+    """
+    Parses whitespace-separated service times into an int64 array.
+
+    Parameters:
+    - text (str): The service times, e.g. "5 3 12".
+
+    Raises:
+    - ValueError: If the text holds anything but integers, an integer
+      that does not fit in int64, or a negative service time.
+
+    Returns:
+    - (np.ndarray): The service times as int64.
+    """
+    try:
+        times = np.array(text.split(), dtype=np.int64)
+    except (ValueError, OverflowError):
+        raise ValueError(f"invalid service times: {text.strip()!r}") from None
+    if (times < 0).any():
+        raise ValueError(f"service times must not be negative: {text.strip()!r}")
+    return times
+
+
+def read_jobs(stream=None):
+    """
+    Yields jobs from a text stream, one line at a time, so that a trace of
+    any length is parsed as the simulation consumes it.
+
+    Parameters:
+    - stream (iterable of str): The lines to read, e.g. an open file
+      (default: sys.stdin).
+
+    Raises:
+    - ValueError: If a line does not hold a valid job, e.g. a negative
+      service time or fewer than 1 teller or cycle; the message gives the
+      line number.
+
+    Returns:
+    - (generator): (job, value) pairs. The value is an int for "call" and
+      "service", an int64 array for "add" and None for "status" and "quit".
+    """
+    if stream is None:
+        stream = sys.stdin
+    for line_number, line in enumerate(stream, 1):
+        parts = line.split(None, 1)
+        if not parts or parts[0].startswith("#"):
+            continue
+        job, rest = parts[0], parts[1] if len(parts) > 1 else ""
+        try:
+            if job == "add":
+                yield job, parse_service_times(rest)
+            elif job in ("call", "service"):
+                value = int(rest)
+                if value < 1:
+                    raise ValueError(f"{job} needs a value of at least 1, not {value}")
+                yield job, value
+            elif job in ("status", "quit") and not rest.strip():
+                yield job, None
+            else:
+                raise ValueError(f"unknown job {line.strip()!r}")
+        except ValueError as error:
+            raise ValueError(f"line {line_number}: {error}") from None
+
+
+def format_job(job, value):
+    """
+    Formats a job as one line of the text read_jobs() reads.
+
+    Parameters:
+    - job (str): One of JOBS.
+    - value: The job's value, as read_jobs() yields it.
+
+    Returns:
+    - (str): The line, ending in a newline.
+    """
+    if job == "add":
+        return "add " + " ".join(map(str, np.asarray(value).tolist())) + "\n"
+    if value is None:
+        return job + "\n"
+    return f"{job} {value}\n"
+
+
+def log_jobs(jobs, stream):
+    """
+    Passes jobs through while writing each one to a replay log that
+    read_jobs() can play back.
+
+    Parameters:
+    - jobs (iterable): (job, value) pairs.
+    - stream (file): The text stream to write to.
+
+    Returns:
+    - (generator): The same (job, value) pairs.
+    """
+    for job, value in jobs:
+        stream.write(format_job(job, value))
+        yield job, value
+
+
+def write_jobs(jobs, stream):
+    """
+    Writes jobs to a text stream in the format read_jobs() reads.
+
+    Parameters:
+    - jobs (iterable): (job, value) pairs.
+    - stream (file): The text stream to write to.
+
+    Returns:
+    - (int): The number of jobs written.
+    """
+    count = 0
+    for _ in log_jobs(jobs, stream):
+        count += 1
+    return count
+
+
+def synthetic_jobs(num_customers, num_tellers=100, batch_size=1000, max_service_time=20,
+                   service_time=5, cycles_per_batch=10, status_every=0, seed=0):
+    """
+    Yields a reproducible synthetic workload: open the tellers, then add
+    customers in batches with a run of service cycles after each, then quit.
+
+    Parameters:
+    - num_customers (int): The total number of customers.
+    - num_tellers (int): The number of tellers (default: 100).
+    - batch_size (int): Customers per "add" job (default: 1000).
+    - max_service_time (int): Service times are drawn uniformly from 1 to
+      this (default: 20).
+    - service_time (int): The duration of each service cycle (default: 5).
+    - cycles_per_batch (int): "service" jobs after each "add" (default: 10).
+    - status_every (int): A "status" job after every this many batches;
+      0 for none (default: 0).
+    - seed (int): The random seed (default: 0).
+
+    Returns:
+    - (generator): (job, value) pairs, as read_jobs() yields them.
+    """
+    rng = np.random.default_rng(seed)
+    yield "call", num_tellers
+    for batch, start in enumerate(range(0, num_customers, batch_size), 1):
+        yield "add", rng.integers(1, max_service_time + 1, size=min(batch_size, num_customers - start))
+        for _ in range(cycles_per_batch):
+            yield "service", service_time
+        if status_every and batch % status_every == 0:
+            yield "status", None
+    yield "quit", None
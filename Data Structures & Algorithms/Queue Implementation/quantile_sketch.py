@@ -0,0 +1,217 @@
+"""
+quantile_sketch.py
+Author: Dele Osuma
+
+A streaming quantile sketch for latencies: percentiles of any number of
+values in bounded memory.
+"""
+
+import math
+import numpy as np
+
+# Values added in smaller batches are buffered and binned together, since
+# binning costs a dozen NumPy calls however few values there are.
+_BATCH = 4096
+
+
+class QuantileSketch:
+    """
+    Estimates quantiles of a stream of non-negative numbers to within a
+    relative error, in the style of DDSketch.
+
+    Each value x >= 1 is counted in bucket ceil(log(x) / log(gamma)), where
+    gamma = (1 + relative_error) / (1 - relative_error), so every value in a
+    bucket is within relative_error of the bucket's estimate. Values below 1
+    share one bucket reported as 0, which suits integer times. The number of
+    buckets grows only with the logarithm of the largest value, about 1,400
+    for values up to 10**12 at 1% error, however many values are added.
+    The count, sum, minimum and maximum are kept exactly. Small batches are
+    buffered, up to _BATCH values, and binned together.
+    """
+
+    def __init__(self, relative_error=0.01):
+        """
+        Initializes an empty sketch.
+
+        Parameters:
+        - relative_error (float): The relative accuracy of quantile
+          estimates, between 0 and 1 (default: 0.01).
+
+        Raises:
+        - ValueError: If relative_error is not between 0 and 1.
+        """
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error must be between 0 and 1")
+        self.relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._bins = np.zeros(0, dtype=np.int64)  # Counts of values >= 1, by bucket
+        self._zeros = 0  # Count of values below 1
+        self._count = 0
+        self._sum = 0
+        self._min = math.inf
+        self._max = -math.inf
+        self._pending = []  # Arrays of values not binned yet
+        self._pending_count = 0
+
+    def add(self, value):
+        """
+        Adds one value to the sketch.
+
+        Parameters:
+        - value (float): The value, which must not be negative.
+        """
+        self.add_many(np.array([value]))
+
+    def add_many(self, values):
+        """
+        Adds many values to the sketch at once.
+
+        Parameters:
+        - values (array-like): The values, which must not be negative.
+
+        Raises:
+        - ValueError: If a value is negative.
+
+        Post-condition:
+        - Each value is counted in its bucket, or buffered to be.
+        """
+        values = np.array(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        if values.min() < 0:
+            raise ValueError("values must not be negative")
+        self._pending.append(values)
+        self._pending_count += values.size
+        if self._pending_count >= _BATCH:
+            self._flush()
+
+    def _flush(self):
+        """
+        Counts the buffered values in their buckets.
+        """
+        if not self._pending:
+            return
+        values = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        self._pending = []
+        self._pending_count = 0
+        low, high = values.min(), values.max()
+        ones = values[values >= 1]
+        self._zeros += values.size - ones.size
+        if ones.size:
+            keys = np.ceil(np.log(ones) / self._log_gamma).astype(np.int64)
+            counts = np.bincount(keys)
+            if len(counts) > len(self._bins):
+                self._bins = np.concatenate((self._bins, np.zeros(len(counts) - len(self._bins), dtype=np.int64)))
+            self._bins[:len(counts)] += counts
+        self._count += values.size
+        self._sum += values.sum().item()
+        self._min = min(self._min, low.item())
+        self._max = max(self._max, high.item())
+
+    def merge(self, other):
+        """
+        Adds the values counted by another sketch with the same relative error.
+
+        Parameters:
+        - other (QuantileSketch): The sketch to merge in.
+
+        Raises:
+        - ValueError: If the sketches have different relative errors.
+        """
+        if other.relative_error != self.relative_error:
+            raise ValueError("can only merge sketches with the same relative error")
+        self._flush()
+        other._flush()
+        if len(other._bins) > len(self._bins):
+            self._bins = np.concatenate((self._bins, np.zeros(len(other._bins) - len(self._bins), dtype=np.int64)))
+        self._bins[:len(other._bins)] += other._bins
+        self._zeros += other._zeros
+        self._count += other._count
+        self._sum += other._sum
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+
+    def __len__(self):
+        """
+        Returns the number of values added.
+
+        Returns:
+        - (int): The count.
+        """
+        self._flush()
+        return self._count
+
+    def mean(self):
+        """
+        Returns the exact mean of the values, or 0 if there are none.
+
+        Returns:
+        - (float): The mean.
+        """
+        self._flush()
+        return self._sum / self._count if self._count else 0.0
+
+    def quantiles(self, qs):
+        """
+        Estimates several quantiles at once.
+
+        Parameters:
+        - qs (iterable): The quantiles, each between 0 and 1.
+
+        Raises:
+        - ValueError: If the sketch is empty or a quantile is out of range.
+
+        Returns:
+        - (list): The estimates, each within the relative error of a value
+          whose rank is the quantile's.
+        """
+        qs = np.asarray(list(qs), dtype=np.float64)
+        self._flush()
+        if not self._count:
+            raise ValueError("quantile of an empty sketch")
+        if ((qs < 0) | (qs > 1)).any():
+            raise ValueError("quantiles must be between 0 and 1")
+        ranks = np.floor(qs * (self._count - 1))
+        cumulative = self._zeros + np.cumsum(self._bins)
+        keys = np.searchsorted(cumulative, ranks, side="right")
+        estimates = 2 * self._gamma ** keys / (self._gamma + 1)
+        estimates = np.where(ranks < self._zeros, 0.0, estimates)
+        estimates = np.clip(estimates, self._min, self._max)
+        estimates[ranks == 0] = self._min  # The extremes are known exactly
+        estimates[ranks == self._count - 1] = self._max
+        return estimates.tolist()
+
+    def quantile(self, q):
+        """
+        Estimates one quantile.
+
+        Parameters:
+        - q (float): The quantile, between 0 and 1 (e.g. 0.99 for the 99th percentile).
+
+        Raises:
+        - ValueError: If the sketch is empty or q is out of range.
+
+        Returns:
+        - (float): The estimate.
+        """
+        return self.quantiles([q])[0]
+
+    def summary(self, percentiles=(50, 90, 99, 99.9)):
+        """
+        Summarizes the values: count, mean, minimum, maximum and percentiles.
+
+        Parameters:
+        - percentiles (tuple): The percentiles to estimate (default: 50, 90, 99, 99.9).
+
+        Returns:
+        - (dict): "count", "mean", "min", "max" and one "p<percentile>"
+          entry each, e.g. "p99" or "p99.9"; only "count" if empty.
+        """
+        self._flush()
+        if not self._count:
+            return {"count": 0}
+        summary = {"count": self._count, "mean": self.mean(), "min": self._min, "max": self._max}
+        for p, estimate in zip(percentiles, self.quantiles(p / 100 for p in percentiles)):
+            summary[f"p{p:g}"] = estimate
+        return summary
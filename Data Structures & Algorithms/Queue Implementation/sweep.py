@@ -0,0 +1,198 @@
+"""
+sweep.py
+Author: Dele Osuma
+
+Runs the banking simulation over many configurations at once, for capacity
+planning: every combination of teller count, service cycle duration and
+arrival trace, spread over worker processes.
+"""
+
+import itertools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from banking import BankingSimulation
+from job_source import parse_service_times, synthetic_jobs
+
+Trace = namedtuple("Trace", ["name", "arrival_times", "offsets", "service_times", "duration"])
+Trace.__doc__ = """
+Customer arrivals in compact form: batch k arrives at arrival_times[k] and
+holds the customers service_times[offsets[k]:offsets[k + 1]]. The trace
+runs until time duration. All arrays are int64, so a trace pickles as a few
+flat buffers.
+"""
+
+
+def trace_from_jobs(jobs, name="trace"):
+    """
+    Records the arrivals in a stream of jobs as a Trace, timed by the
+    durations of the "service" jobs. "call" and "status" jobs are ignored,
+    and a "quit" job ends the trace.
+
+    Parameters:
+    - jobs (iterable): (job, value) pairs, as read by job_source.read_jobs().
+    - name (str): The name of the trace (default: "trace").
+
+    Returns:
+    - (Trace): The arrivals.
+    """
+    time, arrival_times, batches = 0, [], []
+    for job, value in jobs:
+        if job == "add":
+            if isinstance(value, str):
+                value = parse_service_times(value)
+            arrival_times.append(time)
+            batches.append(np.asarray(value, dtype=np.int64))
+        elif job == "service":
+            time += value
+        elif job == "quit":
+            break
+    offsets = np.zeros(len(batches) + 1, dtype=np.int64)
+    np.cumsum([len(batch) for batch in batches], out=offsets[1:])
+    service_times = np.concatenate(batches) if batches else np.empty(0, dtype=np.int64)
+    return Trace(name, np.array(arrival_times, dtype=np.int64), offsets, service_times, time)
+
+
+def synthetic_trace(num_customers, batch_size=1000, max_service_time=20, interval=50, seed=0, name=None):
+    """
+    Makes a reproducible Trace of batches of customers arriving at a fixed interval.
+
+    Parameters:
+    - num_customers (int): The total number of customers.
+    - batch_size (int): Customers per batch (default: 1000).
+    - max_service_time (int): Service times are drawn uniformly from 1 to
+      this (default: 20).
+    - interval (int): The time between batches (default: 50).
+    - seed (int): The random seed (default: 0).
+    - name (str): The name of the trace (default: one made from the parameters).
+
+    Returns:
+    - (Trace): The arrivals.
+    """
+    if name is None:
+        name = f"{num_customers}x{max_service_time}/{batch_size}@{interval}#{seed}"
+    jobs = synthetic_jobs(num_customers, batch_size=batch_size, max_service_time=max_service_time,
+                          service_time=interval, cycles_per_batch=1, seed=seed)
+    return trace_from_jobs(jobs, name)
+
+
+def simulate(trace, num_tellers, service_time, engine="cycle", pool=True):
+    """
+    Replays a trace through a banking simulation. Each batch is added at the
+    end of the first service cycle that reaches its arrival time, and the
+    simulation then runs until the trace's duration.
+
+    Parameters:
+    - trace (Trace): The arrivals.
+    - num_tellers (int): The number of tellers.
+    - service_time (int): The duration of each service cycle.
+    - engine (str): The BankingSimulation engine (default: "cycle").
+    - pool (bool): Whether to keep the tellers in a TellerPool (default: True).
+
+    Raises:
+    - ValueError: If num_tellers or service_time is not positive.
+
+    Returns:
+    - (dict): The summary statistics: the configuration, the simulated
+      time, customers added and left in the queue, the mean teller idle
+      percentage, the mean number of customers waiting, the queue length
+      just before each arrival (queue_lengths) and its maximum, the
+      mean time a customer waited in the queue, and the summary of
+      customer latencies from BankingSimulation.metrics().
+    """
+    if num_tellers <= 0 or service_time <= 0:
+        raise ValueError("num_tellers and service_time must be positive")
+    simulation = BankingSimulation(engine, pool, track_latency=True)
+    simulation.create_tellers(num_tellers)
+    queue_lengths = np.empty(len(trace.arrival_times), dtype=np.int64)
+    for k, arrival_time in enumerate(trace.arrival_times.tolist()):
+        if arrival_time > simulation.total_simulation_time:
+            cycles = -(-(arrival_time - simulation.total_simulation_time) // service_time)
+            simulation.process_service_cycles(service_time, cycles)
+        queue_lengths[k] = len(simulation.customer_queue)
+        simulation.add_customers(trace.service_times[trace.offsets[k]:trace.offsets[k + 1]])
+    if trace.duration > simulation.total_simulation_time:
+        cycles = -(-(trace.duration - simulation.total_simulation_time) // service_time)
+        simulation.process_service_cycles(service_time, cycles)
+
+    time = simulation.total_simulation_time
+    busy = sum(simulation.get_teller_service_times())
+    return {
+        "trace": trace.name,
+        "tellers": num_tellers,
+        "service_time": service_time,
+        "time": time,
+        "customers": simulation.customers_added,
+        "left_in_queue": len(simulation.customer_queue),
+        "idle_percentage": 100 * (1 - busy / (num_tellers * time)) if time else 0.0,
+        "mean_queue_length": simulation.total_wait_time / time if time else 0.0,
+        "max_queue_length": int(queue_lengths.max(initial=0)),
+        "mean_wait": simulation.get_mean_wait_time(),
+        "latency": simulation.metrics()["latency"],
+        "queue_lengths": queue_lengths,
+    }
+
+
+_traces = None  # The traces of a sweep, set once in each worker process
+
+
+def _init_worker(traces):
+    """Keeps the traces in a worker process, so that tasks only name one."""
+    global _traces
+    _traces = traces
+
+
+def _run(task):
+    """Runs one configuration of a sweep: (trace index, tellers, service time, engine, pool)."""
+    index, num_tellers, service_time, engine, pool = task
+    return simulate(_traces[index], num_tellers, service_time, engine, pool)
+
+
+def sweep(traces, teller_counts, service_times, engine="cycle", pool=True, max_workers=None):
+    """
+    Simulates every combination of trace, teller count and service cycle
+    duration, each in its own worker process. The traces are sent to each
+    worker once, when it starts; a task is then a tuple of small numbers.
+
+    Parameters:
+    - traces (list): The Trace objects to replay.
+    - teller_counts (iterable): The numbers of tellers to try.
+    - service_times (iterable): The service cycle durations to try.
+    - engine (str): The BankingSimulation engine (default: "cycle").
+    - pool (bool): Whether to keep the tellers in a TellerPool (default: True).
+    - max_workers (int): The number of worker processes; 1 runs everything
+      in this process (default: one per CPU).
+
+    Returns:
+    - (list): One summary dict per configuration, as returned by simulate(),
+      ordered by trace, then teller count, then service time.
+    """
+    traces = list(traces)
+    tasks = [(index, num_tellers, service_time, engine, pool)
+             for index, num_tellers, service_time
+             in itertools.product(range(len(traces)), teller_counts, service_times)]
+    if max_workers == 1:
+        _init_worker(traces)
+        return [_run(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(traces,)) as executor:
+        return list(executor.map(_run, tasks))
+
+
+def format_table(rows):
+    """
+    Formats sweep results as a text table, one configuration per line.
+
+    Parameters:
+    - rows (list): Summary dicts, as returned by sweep().
+
+    Returns:
+    - (str): The table.
+    """
+    lines = [f"{'trace':>24} {'tellers':>8} {'cycle':>6} {'idle %':>7} {'mean queue':>11} "
+             f"{'max queue':>10} {'mean wait':>10} {'p99 latency':>12} {'left':>8}"]
+    for row in rows:
+        lines.append(f"{row['trace']:>24} {row['tellers']:>8} {row['service_time']:>6} "
+                     f"{row['idle_percentage']:>7.2f} {row['mean_queue_length']:>11.1f} "
+                     f"{row['max_queue_length']:>10} {row['mean_wait']:>10.1f} "
+                     f"{row['latency'].get('p99', 0):>12.1f} {row['left_in_queue']:>8}")
+    return "\n".join(lines)
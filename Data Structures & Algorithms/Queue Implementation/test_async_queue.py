@@ -0,0 +1,104 @@
+"""
+
+Author: Dele Osuma
+AsyncQueue Testing
+unit tests for the AsyncQueue class.
+"""
+
+import asyncio
+import unittest
+from async_queue import AsyncQueue, Empty, Full
+
+class TestAsyncQueue(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit tests for the AsyncQueue class.
+    """
+
+    async def test_fifo(self):
+        """
+        Tests that items come out in order, singly and in batches.
+        """
+        queue = AsyncQueue()
+        for i in range(20):
+            await queue.put(i)
+        self.assertEqual(len(queue), 20)
+        self.assertEqual(await queue.get(), 0)
+        self.assertEqual(queue.get_nowait(), 1)
+        self.assertEqual(list(queue.get_nowait_batch(3)), [2, 3, 4])
+        self.assertEqual(list(queue.get_nowait_batch(100)), list(range(5, 20)))
+        self.assertTrue(queue.is_empty())
+        self.assertRaises(Empty, queue.get_nowait)
+        self.assertRaises(Empty, queue.get_nowait_batch, 1)
+
+    async def test_bounded(self):
+        """
+        Tests that a full queue makes put() wait until a get() makes room.
+        """
+        queue = AsyncQueue(maxsize=2)
+        queue.put_nowait(1)
+        queue.put_nowait(2)
+        self.assertTrue(queue.is_full())
+        self.assertRaises(Full, queue.put_nowait, 3)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(queue.put(3), 0.01)
+        putter = asyncio.create_task(queue.put(3))
+        await asyncio.sleep(0)
+        self.assertFalse(putter.done())
+        self.assertEqual(list(queue.get_nowait_batch(2)), [1, 2])
+        await putter
+        self.assertEqual(queue.get_nowait(), 3)
+
+    async def test_waiting_getters(self):
+        """
+        Tests that thousands of waiting getters are each woken by one item, in order.
+        """
+        queue = AsyncQueue()
+        getters = [asyncio.create_task(queue.get()) for _ in range(2000)]
+        await asyncio.sleep(0)
+        for i in range(2000):
+            queue.put_nowait(i)
+        self.assertEqual(await asyncio.gather(*getters), list(range(2000)))
+
+    async def test_cancelled_getter(self):
+        """
+        Tests that an item is not lost when its woken getter is cancelled.
+        """
+        queue = AsyncQueue()
+        first = asyncio.create_task(queue.get())
+        second = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        queue.put_nowait('item')
+        first.cancel()
+        self.assertEqual(await second, 'item')
+        self.assertTrue(first.cancelled())
+
+    async def test_producers_consumers(self):
+        """
+        Tests that every item arrives exactly once through a small bounded queue.
+        """
+        queue = AsyncQueue(maxsize=8)
+        n_producers, per_producer = 10, 500
+        received = []
+
+        async def produce(p):
+            for i in range(per_producer):
+                await queue.put(p * per_producer + i)
+
+        async def consume():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                received.append(item)
+                if not queue.is_empty():
+                    received.extend(x for x in queue.get_nowait_batch(4) if x is not None)
+
+        consumers = [asyncio.create_task(consume()) for _ in range(50)]
+        await asyncio.gather(*(produce(p) for p in range(n_producers)))
+        for _ in consumers:
+            await queue.put(None)
+        await asyncio.wait_for(asyncio.gather(*consumers), 5)
+        self.assertEqual(sorted(received), list(range(n_producers * per_producer)))
+
+if __name__ == '__main__':
+    unittest.main()
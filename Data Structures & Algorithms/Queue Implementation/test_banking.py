@@ -0,0 +1,219 @@
+"""
+
+Author: Dele Osuma
+BankingSimulation Testing
+unit tests for the BankingSimulation class.
+"""
+
+import contextlib
+import io
+import random
+import unittest
+import numpy as np
+from banking import BankingSimulation, TellerPool
+from job_source import synthetic_jobs
+
+class TestBankingSimulation(unittest.TestCase):
+    """
+    Unit tests for the BankingSimulation class.
+    """
+
+    def state(self, simulation):
+        """
+        Returns what a status report shows: the time, every teller's total
+        service time and the remaining service times in queue order, and the
+        total time customers have waited.
+        """
+        return (simulation.total_simulation_time,
+                simulation.get_teller_service_times(),
+                simulation.customer_queue.to_array().tolist(),
+                simulation.total_wait_time)
+
+    def all_metrics(self, simulation):
+        """
+        Returns the state together with the metrics and each queued customer's times.
+        """
+        return (self.state(simulation), simulation.metrics(),
+                simulation._customer_times.to_array().tolist())
+
+    def test_round_robin(self):
+        """
+        Tests one cycle-based round-robin run by hand, with and without a teller pool.
+        """
+        for pool in (False, True):
+            simulation = BankingSimulation(pool=pool)
+            simulation.create_tellers(2)
+            simulation.add_customers([5, 1, 3])
+            simulation.process_service_cycle(2)
+            self.assertEqual(self.state(simulation), (2, [2, 1], [3, 3], 2))
+            simulation.process_service_cycle(2)
+            self.assertEqual(self.state(simulation), (4, [4, 3], [1, 1], 2))
+            simulation.process_service_cycles(2, 3)
+            self.assertEqual(self.state(simulation), (10, [5, 4], [], 2))
+            self.assertAlmostEqual(simulation.get_mean_wait_time(), 2 / 3)
+        self.assertRaises(ValueError, BankingSimulation, engine="batch")
+
+    def test_add_customers_checks(self):
+        """
+        Tests that service times the int64 queue cannot hold unchanged are refused.
+        """
+        simulation = BankingSimulation()
+        self.assertRaises(ValueError, simulation.add_customers, [2.5, 1.9])
+        self.assertRaises(ValueError, simulation.add_customers, ["7"])
+        self.assertEqual((len(simulation.customer_queue), simulation.customers_added), (0, 0))
+        simulation.add_customers([2, 1])
+        self.assertEqual(simulation.customer_queue.to_array().tolist(), [2, 1])
+
+    def test_negative_service_times(self):
+        """
+        Tests that negative service times are refused up front, whatever the engine and tracking.
+        """
+        for engine in BankingSimulation.ENGINES:
+            for track_latency in (False, True):
+                simulation = BankingSimulation(engine, track_latency=track_latency)
+                simulation.create_tellers(1)
+                for times in ([3, -4, 2], [-1] * 10, np.array([5, -2])):
+                    with self.assertRaisesRegex(ValueError, "must not be negative"):
+                        simulation.add_customers(times)
+                self.assertEqual((len(simulation.customer_queue), simulation.customers_added), (0, 0))
+                self.assertTrue(simulation._customer_times.is_empty())
+                simulation.add_customers([3, 0, 2])
+                simulation.process_service_cycles(2, 5)
+                self.assertEqual(simulation.metrics()["completed"], 3)
+
+    def test_teller_pool(self):
+        """
+        Tests assigning, serving and releasing customers in a teller pool.
+        """
+        pool = TellerPool(4)
+        pool.accept_customers([3, 0, 7])
+        self.assertEqual(pool.num_available(), 1)
+        pool.service_customers(4)
+        self.assertEqual(pool.get_total_service_times(), [3, 0, 4, 0])
+        self.assertEqual(pool.num_available(), 3)
+        self.assertEqual(pool.release_customers().tolist(), [3])
+        self.assertEqual(pool.num_available(), 4)
+        pool.record_service([1, 1])
+        self.assertEqual(pool.get_total_service_times(), [4, 1, 4, 0])
+        self.assertEqual(pool.get_names(), ['0', '1', '2', '3'])
+
+    def test_engines_agree(self):
+        """
+        Tests that the event engine and teller pools match the cycle engine under random jobs.
+        """
+        rng = random.Random(21)
+        for trial in range(200):
+            engine, pool = [("event", False), ("cycle", True), ("event", True)][trial % 3]
+            cycle, other = BankingSimulation(track_latency=True), BankingSimulation(engine, pool, True)
+            num_tellers = rng.choice([0, 1, 3, 8, 40])
+            for simulation in (cycle, other):
+                simulation.create_tellers(num_tellers)
+            for _ in range(rng.randrange(1, 12)):
+                if rng.random() < 0.4:
+                    times = [rng.randrange(0, 30) for _ in range(rng.randrange(0, 60))]
+                    cycle.add_customers(times)
+                    other.add_customers(times)
+                else:
+                    service_time, cycles = rng.randrange(0, 8), rng.randrange(0, 15)
+                    cycle.process_service_cycles(service_time, cycles)
+                    if rng.random() < 0.5:
+                        other.process_service_cycles(service_time, cycles)
+                    else:
+                        for _ in range(cycles):
+                            other.process_service_cycle(service_time)
+                self.assertEqual(self.all_metrics(cycle), self.all_metrics(other), f"trial {trial}")
+
+    def test_long_run(self):
+        """
+        Tests that the event engine jumps over a day of cycles with many tellers.
+        """
+        simulation = BankingSimulation(engine="event")
+        simulation.create_tellers(5000)
+        simulation.add_customers(range(1, 3001))
+        simulation.process_service_cycles(1, 10**9)
+        self.assertTrue(simulation.customer_queue.is_empty())
+        self.assertEqual(simulation.total_simulation_time, 10**9)
+        self.assertEqual(sum(t.get_total_service_time() for t in simulation.tellers), 3000 * 3001 // 2)
+        # Teller i serves the i-th customer still being served, so it is busy for 3000 - i cycles
+        self.assertEqual([t.get_total_service_time() for t in simulation.tellers[:3001]],
+                         [3000 - i for i in range(3001)])
+
+    def test_run_simulation(self):
+        """
+        Tests running a job stream, including "add" values given as text.
+        """
+        jobs = [("call", 2), ("add", "5 1 3"), ("service", 2), ("service", 2), ("status", None),
+                ("add", "4"), ("quit", None), ("add", "9")]
+        for engine in BankingSimulation.ENGINES:
+            simulation = BankingSimulation(engine)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                simulation.run_simulation(iter(jobs))
+            self.assertEqual(self.state(simulation), (4, [4, 3], [1, 1, 4], 2))
+            self.assertIn("Teller: 1 Total service time: 3 Percentage idle: 25.00%", output.getvalue())
+            self.assertIn("Customers left in queue: 3", output.getvalue())
+
+    def test_synthetic_workload(self):
+        """
+        Tests that every engine ends a synthetic workload in the same state.
+        """
+        states = []
+        for engine in BankingSimulation.ENGINES:
+            for pool in (False, True):
+                simulation = BankingSimulation(engine, pool)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    simulation.run_simulation(synthetic_jobs(5000, num_tellers=30, batch_size=500, seed=5))
+                states.append(self.state(simulation))
+        self.assertEqual(states, [states[0]] * len(states))
+        self.assertGreater(states[0][0], 0)
+
+    def test_metrics(self):
+        """
+        Tests the customer times of a run worked out by hand, on every engine.
+        """
+        for engine in BankingSimulation.ENGINES:
+            for pool in (False, True):
+                simulation = BankingSimulation(engine, pool, track_latency=True)
+                simulation.create_tellers(2)
+                simulation.add_customers([5, 1, 3])
+                simulation.process_service_cycle(2)
+                simulation.add_customers([2])
+                # The last customer arrives at 2, is first served at 4 and finishes at 6
+                simulation.process_service_cycles(2, 4)
+                metrics = simulation.metrics()
+                self.assertEqual((metrics["time"], metrics["customers"], metrics["completed"], metrics["in_queue"]),
+                                 (10, 4, 4, 0))
+                self.assertAlmostEqual(metrics["idle_percentage"], 45)
+                waits, latencies = metrics["first_service_wait"], metrics["latency"]
+                self.assertEqual((waits["count"], waits["min"], waits["max"]), (4, 0, 2))
+                self.assertAlmostEqual(waits["mean"], 1)  # 0, 0, 2, 2
+                self.assertEqual((latencies["count"], latencies["min"], latencies["max"]), (4, 1, 7))
+                self.assertAlmostEqual(latencies["mean"], 4.25)  # 1, 4, 5, 7
+                self.assertAlmostEqual(latencies["p50"], 4, delta=0.04)
+
+                untracked = BankingSimulation(engine, pool)
+                untracked.create_tellers(2)
+                untracked.add_customers([5, 1, 3])
+                untracked.process_service_cycles(2, 2)
+                metrics = untracked.metrics()
+                self.assertEqual((metrics["completed"], metrics["in_queue"]), (1, 2))
+                self.assertEqual((metrics["first_service_wait"], metrics["latency"]), ({"count": 0}, {"count": 0}))
+                self.assertTrue(untracked._customer_times.is_empty())
+
+    def test_status_report(self):
+        """
+        Tests that a status report gives the queue length, not the queue.
+        """
+        simulation = BankingSimulation(track_latency=True)
+        simulation.create_tellers(1)
+        simulation.add_customers(range(1, 1001))
+        simulation.process_service_cycles(1, 10)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            simulation.print_status()
+        self.assertIn("Customers in queue: 999\n", output.getvalue())
+        self.assertIn("Customers finished: 1 Latency p50: 1.0", output.getvalue())
+        self.assertLess(len(output.getvalue()), 300)
+
+if __name__ == '__main__':
+    unittest.main()
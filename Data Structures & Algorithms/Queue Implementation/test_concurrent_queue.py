@@ -0,0 +1,112 @@
+"""
+
+Author: Dele Osuma
+ConcurrentQueue Testing
+unit tests for the ConcurrentQueue class.
+"""
+
+import threading
+import time
+import unittest
+from concurrent_queue import ConcurrentQueue, Empty, Full
+
+class TestConcurrentQueue(unittest.TestCase):
+    """
+    Unit tests for the ConcurrentQueue class.
+    """
+
+    def test_fifo(self):
+        """
+        Tests that items come out in order, singly and in batches.
+        """
+        queue = ConcurrentQueue()
+        for i in range(5):
+            queue.put(i)
+        queue.put_many(range(5, 20))
+        self.assertEqual(len(queue), 20)
+        self.assertEqual(queue.get(), 0)
+        self.assertEqual(list(queue.get_batch(4)), [1, 2, 3, 4])
+        self.assertEqual(list(queue.get_batch(100)), list(range(5, 20)))
+        self.assertTrue(queue.is_empty())
+
+    def test_timeouts(self):
+        """
+        Tests that get and put give up when nothing changes in time.
+        """
+        queue = ConcurrentQueue(maxsize=2)
+        with self.assertRaises(Empty):
+            queue.get(block=False)
+        start = time.perf_counter()
+        with self.assertRaises(Empty):
+            queue.get_batch(10, timeout=0.05)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+        queue.put_many([1, 2])
+        self.assertTrue(queue.is_full())
+        with self.assertRaises(Full):
+            queue.put(3, timeout=0.05)
+        with self.assertRaises(Full):
+            queue.put_many([3, 4], block=False)
+        self.assertEqual(list(queue.get_batch(10)), [1, 2])
+
+        # Without blocking, the items that fit are added before Full is raised
+        queue.put(1)
+        with self.assertRaises(Full):
+            queue.put_many([2, 3, 4], block=False)
+        with self.assertRaises(Full):
+            queue.put_many([5], timeout=0.01)
+        self.assertEqual(list(queue.get_batch(10)), [1, 2])
+
+    def test_blocking_handoff(self):
+        """
+        Tests that a blocked get is woken by a put from another thread.
+        """
+        queue = ConcurrentQueue()
+        result = []
+        consumer = threading.Thread(target=lambda: result.append(queue.get(timeout=5)))
+        consumer.start()
+        time.sleep(0.05)
+        queue.put('item')
+        consumer.join()
+        self.assertEqual(result, ['item'])
+
+    def test_producers_consumers(self):
+        """
+        Tests that every item reaches exactly one consumer through a bounded queue.
+        """
+        queue = ConcurrentQueue(maxsize=16)
+        n_producers, n_consumers, per_producer = 4, 3, 3000
+        received = [[] for _ in range(n_consumers)]
+        quota = n_producers * per_producer // n_consumers
+
+        def produce(p):
+            items = range(p * per_producer, (p + 1) * per_producer)
+            if p % 2:
+                for item in items:
+                    queue.put(item)
+            else:
+                queue.put_many(items)
+
+        def consume(c):
+            while len(received[c]) < quota:
+                if c % 2:
+                    received[c].append(queue.get())
+                else:
+                    received[c].extend(queue.get_batch(quota - len(received[c])))
+
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(n_producers)]
+        threads += [threading.Thread(target=consume, args=(c,)) for c in range(n_consumers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(sum(received, [])), list(range(n_producers * per_producer)))
+        for items in received:  # Items from one producer stay in order
+            for p in range(n_producers):
+                mine = [i for i in items if i // per_producer == p]
+                self.assertEqual(mine, sorted(mine))
+        self.assertTrue(queue.is_empty())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+
+Author: Dele Osuma
+Job Source Testing
+unit tests for reading, writing and generating banking simulation jobs.
+"""
+
+import io
+import unittest
+import numpy as np
+from job_source import parse_service_times, read_jobs, log_jobs, write_jobs, synthetic_jobs
+
+class TestJobSource(unittest.TestCase):
+    """
+    Unit tests for the job_source module.
+    """
+
+    def test_parse_service_times(self):
+        """
+        Tests parsing service times into an int64 array.
+        """
+        times = parse_service_times("5 3\t12 ")
+        self.assertEqual(times.dtype, np.int64)
+        self.assertEqual(times.tolist(), [5, 3, 12])
+        self.assertEqual(parse_service_times("  ").tolist(), [])
+        self.assertRaises(ValueError, parse_service_times, "5 x 3")
+        self.assertRaises(ValueError, parse_service_times, "1.5")
+        self.assertRaises(ValueError, parse_service_times, "1 99999999999999999999")
+        self.assertRaises(ValueError, parse_service_times, "3 -4 2")
+        self.assertEqual(parse_service_times("0 2").tolist(), [0, 2])
+
+    def test_read_jobs(self):
+        """
+        Tests reading every kind of job, skipping blank and comment lines.
+        """
+        text = "# a trace\ncall 3\n\nadd 5 1 4\nservice\t2\nstatus\nquit\n"
+        jobs = [(job, value.tolist() if job == "add" else value) for job, value in read_jobs(io.StringIO(text))]
+        self.assertEqual(jobs, [("call", 3), ("add", [5, 1, 4]), ("service", 2), ("status", None), ("quit", None)])
+        for line in ("hire 3", "call", "service x", "add 1 2b", "status 4",
+                     "add 3 -4 2", "call -2", "call 0", "service -5", "service 0"):
+            with self.assertRaisesRegex(ValueError, "^line 2: "):
+                list(read_jobs(io.StringIO("call 1\n" + line + "\n")))
+
+    def test_read_lazily(self):
+        """
+        Tests that lines are read only as jobs are consumed.
+        """
+        lines = iter(["call 1\n", "add 1\n", "bad job\n"])
+        jobs = read_jobs(lines)
+        self.assertEqual(next(jobs), ("call", 1))
+        self.assertEqual(next(lines), "add 1\n")  # Not read yet
+
+    def test_replay(self):
+        """
+        Tests that a written or logged workload reads back as the same jobs.
+        """
+        jobs = list(synthetic_jobs(2500, num_tellers=7, batch_size=1000, cycles_per_batch=2, status_every=2, seed=3))
+        log = io.StringIO()
+        self.assertEqual(list(log_jobs(jobs, log)), jobs)
+        stream = io.StringIO()
+        self.assertEqual(write_jobs(jobs, stream), len(jobs))
+        self.assertEqual(stream.getvalue(), log.getvalue())
+        replayed = list(read_jobs(io.StringIO(stream.getvalue())))
+        self.assertEqual([job for job, _ in replayed], [job for job, _ in jobs])
+        for (_, value), (_, expected) in zip(replayed, jobs):
+            if isinstance(expected, np.ndarray):
+                self.assertEqual(value.tolist(), expected.tolist())
+            else:
+                self.assertEqual(value, expected)
+
+    def test_synthetic_jobs(self):
+        """
+        Tests the shape and reproducibility of a synthetic workload.
+        """
+        jobs = list(synthetic_jobs(2500, num_tellers=7, batch_size=1000, max_service_time=4, cycles_per_batch=2, status_every=2))
+        self.assertEqual([job for job, _ in jobs],
+                         ["call"] + ["add", "service", "service"] * 2 + ["status"] + ["add", "service", "service", "quit"])
+        added = np.concatenate([value for job, value in jobs if job == "add"])
+        self.assertEqual(len(added), 2500)
+        self.assertTrue(((added >= 1) & (added <= 4)).all())
+        again = np.concatenate([value for job, value in synthetic_jobs(2500, batch_size=1000, max_service_time=4) if job == "add"])
+        self.assertEqual(added.tolist(), again.tolist())
+
+if __name__ == '__main__':
+    unittest.main()
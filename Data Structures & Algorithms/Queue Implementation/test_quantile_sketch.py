@@ -0,0 +1,77 @@
+"""
+
+Author: Dele Osuma
+QuantileSketch Testing
+unit tests for the QuantileSketch class.
+"""
+
+import unittest
+import numpy as np
+from quantile_sketch import QuantileSketch
+
+class TestQuantileSketch(unittest.TestCase):
+    """
+    Unit tests for the QuantileSketch class.
+    """
+
+    def test_accuracy(self):
+        """
+        Tests that percentiles are within the relative error of the exact ones.
+        """
+        values = np.random.default_rng(4).lognormal(5, 2, size=200_000).round()
+        sketch = QuantileSketch(0.01)
+        for chunk in np.array_split(values, 7):
+            sketch.add_many(chunk)
+        self.assertEqual(len(sketch), len(values))
+        self.assertAlmostEqual(sketch.mean(), values.mean())
+        qs = [0, 0.1, 0.5, 0.9, 0.99, 0.999, 1]
+        exact = np.quantile(values, qs, method="lower")
+        for q, estimate, expected in zip(qs, sketch.quantiles(qs), exact):
+            self.assertLessEqual(abs(estimate - expected), 0.01 * expected + 1e-9, f"q={q}")
+        self.assertEqual(sketch.quantile(0), values.min())
+        self.assertEqual(sketch.quantile(1), values.max())
+
+    def test_bounded_memory(self):
+        """
+        Tests that the number of buckets depends on the range of values, not their count.
+        """
+        sketch = QuantileSketch(0.01)
+        for _ in range(20):
+            sketch.add_many(np.random.default_rng().integers(0, 10**12, size=50_000))
+        self.assertLess(len(sketch._bins), 1500)
+        self.assertEqual(len(sketch), 10**6)
+
+    def test_small_values(self):
+        """
+        Tests zeros, single values and the summary.
+        """
+        sketch = QuantileSketch()
+        self.assertEqual(sketch.summary(), {"count": 0})
+        self.assertRaises(ValueError, sketch.quantile, 0.5)
+        for value in (0, 0, 1, 5, 5):
+            sketch.add(value)
+        summary = sketch.summary((50, 99.9))
+        self.assertEqual(set(summary), {"count", "mean", "min", "max", "p50", "p99.9"})
+        self.assertEqual((summary["count"], summary["min"], summary["max"]), (5, 0, 5))
+        self.assertAlmostEqual(summary["mean"], 2.2)
+        self.assertAlmostEqual(summary["p50"], 1, delta=0.01)
+        self.assertEqual(sketch.quantile(0.2), 0)
+        self.assertRaises(ValueError, sketch.quantile, 1.5)
+        self.assertRaises(ValueError, sketch.add, -1)
+        self.assertRaises(ValueError, QuantileSketch, 0)
+
+    def test_merge(self):
+        """
+        Tests that merging two sketches equals sketching all their values.
+        """
+        values = np.random.default_rng(9).integers(0, 10**6, size=10_000)
+        a, b, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        a.add_many(values[:3000])
+        b.add_many(values[3000:])
+        both.add_many(values)
+        a.merge(b)
+        self.assertEqual(a.summary(), both.summary())
+        self.assertRaises(ValueError, a.merge, QuantileSketch(0.05))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@ unit tests for the Queue class.
 
 import unittest
 import numpy as np
-from queue import Queue, Empty
+from Queue import Queue, Empty
 
 class TestQueue(unittest.TestCase):
     """
@@ -100,3 +100,194 @@ class TestQueue(unittest.TestCase):
 
         self.assertTrue(self.queue.is_empty())
 
+    def test_enqueue_many(self):
+        """
+        Tests that enqueue_many adds items in order, wrapping around and resizing.
+        """
+        self.queue.enqueue(0)
+        self.queue.enqueue(1)
+        self.queue.dequeue()
+        self.queue.enqueue_many(np.array([2, 3], dtype=object))  # Wraps around the end of the array
+        self.queue.enqueue_many(range(4, 20))  # Resizes once
+        self.queue.enqueue_many([])
+        self.queue.enqueue_many([(20, 'a')])  # Tuples stay whole
+
+        self.assertEqual(len(self.queue), 20)
+        for i in range(1, 20):
+            self.assertEqual(self.queue.dequeue(), i)
+        self.assertEqual(self.queue.dequeue(), (20, 'a'))
+        self.assertTrue(self.queue.is_empty())
+
+    def test_dequeue_many(self):
+        """
+        Tests that dequeue_many removes items in order across the wrap point.
+        """
+        self.queue.enqueue_many([1, 2, 3])
+        self.queue.dequeue()
+        self.queue.dequeue()
+        self.queue.enqueue_many([4, 5])  # Rear wraps to the front of the array
+
+        self.assertEqual(list(self.queue.dequeue_many(3)), [3, 4, 5])
+        self.assertTrue(self.queue.is_empty())
+        self.queue.enqueue_many([6, 7])
+        self.assertEqual(list(self.queue.dequeue_many(10)), [6, 7])
+        with self.assertRaises(Empty):
+            self.queue.dequeue_many(1)
+        with self.assertRaises(ValueError):
+            self.queue.dequeue_many(-1)
+
+    def test_resize_wrapped(self):
+        """
+        Tests that resizing keeps the order of items that wrap around the array.
+        """
+        for i in range(3):
+            self.queue.enqueue(i)
+        self.queue.dequeue()
+        self.queue.dequeue()
+        for i in range(3, 10):  # Resizes with the front near the end
+            self.queue.enqueue(i)
+
+        self.assertEqual(repr(self.queue), f"Queue: {list(range(2, 10))}")
+        for i in range(2, 10):
+            self.assertEqual(self.queue.dequeue(), i)
+
+    def test_typed_queue(self):
+        """
+        Tests a queue of int64 items, including batches, wrapping and resizing.
+        """
+        queue = Queue(3, dtype=np.int64)
+        queue.enqueue(1)
+        queue.enqueue(2)
+        self.assertEqual(queue.dequeue(), 1)
+        self.assertIs(type(queue.peek()), int)
+        queue.enqueue_many(range(3, 20))
+        queue.enqueue_many(np.arange(20, 40))
+
+        self.assertEqual(queue.to_array().dtype, np.int64)
+        self.assertEqual(list(queue.to_array()), list(range(2, 40)))
+        batch = queue.dequeue_many(8)
+        self.assertEqual(batch.dtype, np.int64)
+        self.assertEqual(list(batch), list(range(2, 10)))
+        self.assertEqual(repr(queue), f"Queue: {list(range(10, 40))}")
+        with self.assertRaises(ValueError):
+            queue.enqueue('not a number')
+
+    def test_typed_queue_refuses_lossy_items(self):
+        """
+        Tests that a numeric queue refuses items its dtype would change, one by one and in batches.
+        """
+        queue = Queue(dtype=np.int64)
+        for item in (2.9, 2.0, "7", np.float64(1.0)):
+            self.assertRaises(ValueError, queue.enqueue, item)
+        for items in ([2.5, 1.9], [2.5] * 10, ["7"] * 10, np.array([1.0, 2.0])):
+            self.assertRaises(ValueError, queue.enqueue_many, items)
+        self.assertTrue(queue.is_empty())
+        queue.enqueue(True)
+        queue.enqueue(np.int32(3))
+        queue.enqueue_many(np.arange(3, dtype=np.int32))
+        self.assertEqual(list(queue.to_array()), [1, 3, 0, 1, 2])
+
+        narrow = Queue(dtype=np.int32)
+        narrow.enqueue_many(list(range(10)))
+        self.assertRaises(ValueError, narrow.enqueue_many, [2 ** 40] * 10)
+        self.assertEqual(len(narrow), 10)
+
+        floats = Queue(dtype=np.float64)
+        floats.enqueue(3)
+        floats.enqueue_many([1, 2.5] * 5)
+        self.assertEqual(floats.dequeue(), 3.0)
+        self.assertRaises(ValueError, floats.enqueue, "7")
+
+    def test_segments(self):
+        """
+        Tests vectorized updates of wrapped contents through segments().
+        """
+        queue = Queue(4, dtype=np.float64)
+        queue.enqueue_many([1.5, 2.5, 3.5, 4.5])
+        queue.dequeue()
+        queue.dequeue()
+        queue.enqueue(5.5)  # Wraps around to the start of the buffer
+
+        front, wrapped = queue.segments()
+        self.assertEqual((len(front), len(wrapped)), (2, 1))
+        self.assertEqual(sum(part.sum() for part in queue.segments()), 13.5)
+        for part in queue.segments():
+            part -= 0.5
+        self.assertEqual([queue.dequeue() for _ in range(3)], [3.0, 4.0, 5.0])
+
+    def test_shrink(self):
+        """
+        Tests that a drained queue gives memory back, but not below its initial capacity.
+        """
+        queue = Queue(4)
+        queue.enqueue_many(range(1000))
+        self.assertGreaterEqual(queue.capacity(), 1000)
+        for i in range(900):
+            self.assertEqual(queue.dequeue(), i)
+        self.assertLess(queue.capacity(), 1000)
+        self.assertEqual(list(queue.dequeue_many(90)), list(range(900, 990)))
+        self.assertLessEqual(queue.capacity(), 40)
+        self.assertEqual(list(queue.dequeue_many(10)), list(range(990, 1000)))
+        self.assertEqual(queue.capacity(), 4)
+
+    def test_shrink_hysteresis(self):
+        """
+        Tests that going back and forth across a resize boundary does not resize every time.
+        """
+        queue = Queue(4)
+        queue.enqueue_many(range(64))
+        queue.dequeue_many(49)  # Below 1/4 full: shrinks to twice the size
+        self.assertEqual(queue.capacity(), 30)
+        capacity = queue.capacity()
+        resizes = 0
+        for i in range(100):
+            queue.enqueue(i)
+            queue.dequeue()
+            queue.dequeue()
+            queue.enqueue(i)
+            if queue.capacity() != capacity:
+                resizes += 1
+                capacity = queue.capacity()
+        self.assertEqual(resizes, 0)
+
+    def test_shrink_disabled(self):
+        """
+        Tests that shrink_below=0 keeps the capacity, and that bad values are rejected.
+        """
+        queue = Queue(4, shrink_below=0)
+        queue.enqueue_many(range(100))
+        capacity = queue.capacity()
+        queue.dequeue_many(100)
+        self.assertEqual(queue.capacity(), capacity)
+        with self.assertRaises(ValueError):
+            Queue(4, shrink_below=1/2)
+
+    def test_reserve_and_shrink_to_fit(self):
+        """
+        Tests that reserve() prevents resizes, also after the queue drains, and
+        that shrink_to_fit() drops spare capacity.
+        """
+        self.queue.enqueue(0)
+        self.queue.reserve(100)
+        capacity = self.queue.capacity()
+        self.assertGreaterEqual(capacity, 101)
+        for i in range(1, 101):
+            self.queue.enqueue(i)
+        self.assertEqual(self.queue.capacity(), capacity)
+
+        self.queue.dequeue_many(95)  # Sparse, but the reserved room is kept
+        self.assertEqual(self.queue.capacity(), capacity)
+        self.queue.enqueue_many(range(101, 146))
+        self.assertEqual(self.queue.capacity(), capacity)
+        self.queue.shrink_to_fit()
+        self.assertEqual(self.queue.capacity(), 51)
+        self.assertEqual(list(self.queue.to_array()), list(range(95, 146)))
+        self.queue.enqueue_many(range(146, 246))
+        self.queue.dequeue_many(140)  # shrink_to_fit() dropped the reserved room
+        self.assertLess(self.queue.capacity(), 101)
+        self.queue.dequeue_many(11)
+        self.queue.shrink_to_fit()
+        self.assertEqual(self.queue.capacity(), 1)
+        self.queue.enqueue(7)
+        self.assertEqual(self.queue.dequeue(), 7)
+
@@ -0,0 +1,72 @@
+"""
+
+Author: Dele Osuma
+Sweep Testing
+unit tests for the parallel parameter sweep.
+"""
+
+import contextlib
+import io
+import unittest
+from banking import BankingSimulation
+from job_source import synthetic_jobs
+from sweep import trace_from_jobs, synthetic_trace, simulate, sweep, format_table
+
+class TestSweep(unittest.TestCase):
+    """
+    Unit tests for the sweep module.
+    """
+
+    def test_trace_from_jobs(self):
+        """
+        Tests recording the arrivals in a job stream.
+        """
+        jobs = [("call", 3), ("add", "4 2"), ("service", 5), ("status", None), ("service", 5),
+                ("add", [7]), ("add", []), ("service", 3), ("quit", None), ("add", [9])]
+        trace = trace_from_jobs(jobs, "t")
+        self.assertEqual(trace.name, "t")
+        self.assertEqual(trace.arrival_times.tolist(), [0, 10, 10])
+        self.assertEqual(trace.offsets.tolist(), [0, 2, 3, 3])
+        self.assertEqual(trace.service_times.tolist(), [4, 2, 7])
+        self.assertEqual(trace.duration, 13)
+        self.assertEqual(trace_from_jobs([]).service_times.tolist(), [])
+
+    def test_simulate(self):
+        """
+        Tests that replaying a trace matches running the jobs it came from.
+        """
+        jobs = list(synthetic_jobs(3000, num_tellers=12, batch_size=300, service_time=4, cycles_per_batch=6, seed=2))
+        simulation = BankingSimulation()
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation.run_simulation(jobs)
+        for engine in BankingSimulation.ENGINES:
+            row = simulate(trace_from_jobs(jobs), 12, 4, engine=engine)
+            self.assertEqual(row["time"], simulation.total_simulation_time)
+            self.assertEqual(row["customers"], 3000)
+            self.assertEqual(row["left_in_queue"], len(simulation.customer_queue))
+            self.assertAlmostEqual(row["mean_wait"], simulation.get_mean_wait_time())
+            busy = sum(simulation.get_teller_service_times())
+            self.assertAlmostEqual(row["idle_percentage"], 100 * (1 - busy / (12 * row["time"])))
+            self.assertEqual(len(row["queue_lengths"]), 10)
+            self.assertEqual(row["queue_lengths"][0], 0)
+        self.assertRaises(ValueError, simulate, trace_from_jobs(jobs), 0, 4)
+
+    def test_sweep(self):
+        """
+        Tests that a sweep over worker processes matches one run in-process.
+        """
+        traces = [synthetic_trace(2000, batch_size=200, interval=20, seed=seed) for seed in range(2)]
+        parallel = sweep(traces, [5, 10], [2, 3], max_workers=2)
+        serial = sweep(traces, [5, 10], [2, 3], max_workers=1)
+        self.assertEqual([(row["trace"], row["tellers"], row["service_time"]) for row in parallel],
+                         [(trace.name, t, q) for trace in traces for t in (5, 10) for q in (2, 3)])
+        for a, b in zip(parallel, serial):
+            self.assertEqual(a["queue_lengths"].tolist(), b["queue_lengths"].tolist())
+            self.assertEqual({k: v for k, v in a.items() if k != "queue_lengths"},
+                             {k: v for k, v in b.items() if k != "queue_lengths"})
+        # More tellers never make customers wait longer
+        self.assertLessEqual(parallel[2]["mean_wait"], parallel[0]["mean_wait"])
+        self.assertEqual(len(format_table(parallel).splitlines()), len(parallel) + 1)
+
+if __name__ == '__main__':
+    unittest.main()